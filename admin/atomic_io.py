@@ -0,0 +1,85 @@
+"""
+Atomares Schreiben von Dateien
+
+Schreibt zuerst in eine temporäre Datei im selben Ordner, synchronisiert sie
+auf die Platte (fsync), prüft die Prüfsumme der geschriebenen Bytes und ersetzt
+erst dann das Original per rename. Ein Absturz mitten im Schreiben hinterlässt
+so nie eine halbe Datei - entweder der alte oder der neue Stand ist vollständig da.
+"""
+
+import hashlib
+import os
+import stat
+import tempfile
+
+
+class ChecksumMismatchError(IOError):
+    """Die auf die Platte geschriebenen Bytes stimmen nicht mit den serialisierten überein."""
+
+
+def _fsync_directory(directory: str) -> None:
+    """Macht das rename selbst crash-sicher (nur POSIX, unter Windows nicht nötig)."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write_bytes(path: str, data: bytes, fsync: bool = True) -> str:
+    """Schreibt Bytes atomar und verifiziert sie per SHA-256.
+
+    Args:
+        path: Zieldatei
+        data: Zu schreibende Bytes
+        fsync: Daten vor dem rename auf die Platte zwingen
+
+    Returns:
+        str: SHA-256 der geschriebenen Bytes
+
+    Raises:
+        ChecksumMismatchError: Wenn die Temp-Datei nicht den erwarteten Inhalt hat
+            (das Original bleibt dann unverändert)
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    expected = hashlib.sha256(data).hexdigest()
+
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+
+        # Verifizieren: Prüfsumme der Bytes statt erneutem JSON-Parse
+        with open(tmp_path, "rb") as f:
+            actual = hashlib.sha256(f.read()).hexdigest()
+        if actual != expected:
+            raise ChecksumMismatchError(
+                f"Prüfsumme stimmt nicht ({actual[:12]} statt {expected[:12]})"
+            )
+
+        # mkstemp legt 0600 an - Rechte des Originals übernehmen (sonst 0644)
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except OSError:
+            mode = 0o644
+        os.chmod(tmp_path, mode)
+
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    if fsync:
+        _fsync_directory(directory)
+    return expected
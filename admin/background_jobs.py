@@ -0,0 +1,127 @@
+"""
+Hintergrund-Jobs für den Admin (Git-Commit, Sitemap, ...)
+
+Langsame Nebenarbeiten nach dem Speichern laufen nicht mehr im Streamlit-Rerun,
+sondern in einem Worker-Thread. Jobs mit gleichem Namen werden zusammengefasst
+(der neueste gewinnt) und erst ausgeführt, wenn seit dem letzten Speichern
+`debounce_seconds` lang Ruhe war - zehn schnelle Klicks ergeben so nur einen
+Commit und einen Sitemap-Lauf.
+"""
+
+import atexit
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+
+class BackgroundJobQueue:
+    """Entprellte Job-Queue mit einem Worker-Thread (thread-safe)."""
+
+    def __init__(self, debounce_seconds: float = 3.0):
+        """
+        Args:
+            debounce_seconds: Ruhezeit nach dem letzten submit() bis zur Ausführung
+        """
+        self.debounce_seconds = debounce_seconds
+        self._pending: "OrderedDict[str, tuple]" = OrderedDict()
+        self._deadline = 0.0
+        self._running: Optional[str] = None
+        self._last_run: Dict[str, Dict[str, Any]] = {}
+        self._submitted = 0
+        self._coalesced = 0
+        self._executed = 0
+        self._cond = threading.Condition()
+        # Immer nur ein Job gleichzeitig - auch wenn flush() im Haupt-Thread läuft
+        self._execution_lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="admin-background-jobs", daemon=True)
+        self._worker.start()
+        # Beim Beenden des Prozesses nichts verlieren
+        atexit.register(self.flush)
+
+    def submit(self, name: str, func: Callable[..., Any], *args, **kwargs) -> None:
+        """Reiht einen Job ein; ein wartender Job gleichen Namens wird ersetzt.
+
+        Args:
+            name: Job-Name (Schlüssel fürs Zusammenfassen, z.B. "git_commit")
+            func: Auszuführende Funktion (darf kein st.* aufrufen)
+        """
+        with self._cond:
+            if name in self._pending:
+                self._coalesced += 1
+                del self._pending[name]  # ans Ende, Reihenfolge = letzte Anforderung
+            self._pending[name] = (func, args, kwargs)
+            self._submitted += 1
+            self._deadline = time.monotonic() + self.debounce_seconds
+            self._cond.notify()
+
+    def flush(self) -> None:
+        """Führt alle wartenden Jobs sofort im aufrufenden Thread aus.
+
+        Läuft gerade ein Job im Worker, wird erst dessen Ende abgewartet.
+        """
+        with self._cond:
+            self._deadline = 0.0
+        self._execute_pending()
+
+    def status(self) -> Dict[str, Any]:
+        """Momentaufnahme für das Dashboard.
+
+        Returns:
+            dict mit pending, running, seconds_until_run, last_run, submitted, coalesced, executed
+        """
+        with self._cond:
+            return {
+                "pending": list(self._pending.keys()),
+                "running": self._running,
+                "seconds_until_run": max(0.0, self._deadline - time.monotonic()) if self._pending else 0.0,
+                "last_run": {name: dict(info) for name, info in self._last_run.items()},
+                "submitted": self._submitted,
+                "coalesced": self._coalesced,
+                "executed": self._executed,
+            }
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                # Entprellen: warten bis keine neuen Jobs mehr nachkommen
+                while self._pending and time.monotonic() < self._deadline:
+                    self._cond.wait(timeout=self._deadline - time.monotonic())
+            self._execute_pending()
+
+    def _execute_pending(self) -> None:
+        while True:
+            with self._execution_lock:
+                if not self._execute_next():
+                    return
+
+    def _execute_next(self) -> bool:
+        """Führt den ältesten wartenden Job aus (nur mit _execution_lock).
+
+        Returns:
+            False wenn nichts mehr wartet
+        """
+        with self._cond:
+            if not self._pending:
+                return False
+            name, (func, args, kwargs) = self._pending.popitem(last=False)
+            self._running = name
+
+        ok, error = False, None
+        try:
+            result = func(*args, **kwargs)
+            ok = result is not False
+        except Exception as e:
+            error = str(e)
+            print(f"⚠️ Hintergrund-Job '{name}' fehlgeschlagen: {e}")
+            traceback.print_exc()
+
+        with self._cond:
+            self._running = None
+            self._executed += 1
+            self._last_run[name] = {"finished_at": datetime.now(), "ok": ok, "error": error}
+        return True
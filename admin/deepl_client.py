@@ -0,0 +1,275 @@
+"""
+DeepL-Client mit Batches und adaptivem Rate-Limit
+
+DeepL nimmt bis zu 50 Texte pro Request an. Statt jeden String einzeln zu
+schicken und danach fix zu schlafen, bündelt DeepLClient die Texte. Alle
+Requests laufen durch einen gemeinsamen Token-Bucket: bremst DeepL (429),
+pausieren alle Threads bis Retry-After und die Rate halbiert sich, bei
+Erfolg steigt sie wieder.
+
+    client = DeepLClient()
+    client.translate(["Salz", "Pfeffer"], "EN")   # → ["Salt", "Pepper"]
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Iterator, List, Optional, Sequence
+
+try:
+    import requests
+except ImportError:  # pragma: no cover - nur für Umgebungen ohne requests
+    requests = None
+
+DEEPL_BATCH_SIZE = 50                 # max. Texte pro Request laut DeepL
+DEEPL_MAX_REQUEST_BYTES = 120 * 1024  # DeepL erlaubt 128 KiB pro Request, etwas Reserve
+API_TIMEOUT = 30                      # Sekunden
+MAX_RETRIES = 3
+RETRY_DELAY = 2                       # Sekunden, wächst linear pro Versuch
+
+RATE_REQUESTS_PER_SECOND = 10.0       # Obergrenze, solange DeepL nicht bremst
+RATE_BURST = 10                       # so viele Requests dürfen sofort raus
+RATE_MIN_REQUESTS_PER_SECOND = 0.2
+RATE_RECOVERY_FACTOR = 1.1            # pro erfolgreichem Request
+
+
+class DeepLError(Exception):
+    """DeepL nicht erreichbar oder Antwort unbrauchbar."""
+
+
+class DeepLQuotaExceeded(DeepLError):
+    """Zeichen-Kontingent aufgebraucht (HTTP 456)."""
+
+
+def deepl_base_url(api_key: str) -> str:
+    """Free-Keys enden auf ':fx' und haben einen eigenen Endpunkt."""
+    if api_key.endswith(":fx"):
+        return "https://api-free.deepl.com/v2"
+    return "https://api.deepl.com/v2"
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """Retry-After-Header in Sekunden (nur die Sekunden-Variante)."""
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucketLimiter:
+    """Token-Bucket für alle Requests eines Prozesses.
+
+    Bis zu `capacity` Requests gehen sofort raus, danach `rate` pro Sekunde.
+    Bei 429 halbiert sich die Rate und alle Threads pausieren gemeinsam bis
+    Retry-After abgelaufen ist; jeder Erfolg hebt die Rate wieder an.
+    Thread-safe, damit sich alle Sprachen einen Limiter teilen.
+    """
+
+    def __init__(self, rate: float = RATE_REQUESTS_PER_SECOND, capacity: int = RATE_BURST,
+                 min_rate: float = RATE_MIN_REQUESTS_PER_SECOND):
+        self.max_rate = rate
+        self.min_rate = min_rate
+        self.rate = rate
+        self.capacity = capacity
+        self.throttled = 0
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait(self) -> None:
+        """Blockiert bis ein Token frei ist und keine 429-Pause läuft."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    delay = self._blocked_until - now
+                else:
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate * RATE_RECOVERY_FACTOR)
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> float:
+        """DeepL hat gebremst: Rate halbieren, alle Threads pausieren lassen.
+
+        Returns:
+            Pause in Sekunden
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.throttled += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            delay = retry_after if retry_after is not None else 1 / self.rate
+            self._blocked_until = max(self._blocked_until, now + delay)
+            self._tokens = 0.0
+            return delay
+
+
+def iter_batches(texts: Sequence[str], batch_size: int = DEEPL_BATCH_SIZE,
+                 max_bytes: int = DEEPL_MAX_REQUEST_BYTES) -> Iterator[List[int]]:
+    """Teilt Texte in Requests auf (max. batch_size Texte und max_bytes).
+
+    Yields:
+        Liste der Indizes pro Request
+    """
+    batch, size = [], 0
+    for idx, text in enumerate(texts):
+        length = len(text.encode("utf-8"))
+        if batch and (len(batch) >= batch_size or size + length > max_bytes):
+            yield batch
+            batch, size = [], 0
+        batch.append(idx)
+        size += length
+    if batch:
+        yield batch
+
+
+class DeepLClient:
+    """Übersetzt Listen von Texten in möglichst wenigen Requests."""
+
+    def __init__(self, api_key: Optional[str] = None, session=None,
+                 limiter: Optional[TokenBucketLimiter] = None,
+                 batch_size: int = DEEPL_BATCH_SIZE, memory=None, journal=None):
+        """
+        Args:
+            api_key: DeepL-Key (Standard: DEEPL_API_KEY aus der Umgebung)
+            session: requests.Session für Keep-Alive (wird sonst angelegt)
+            limiter: geteilter Rate-Limiter (wird sonst angelegt)
+            batch_size: Texte pro Request
+            memory: TranslationMemory, die vor DeepL gefragt wird (None = keine)
+            journal: TranslationJournal - jeder fertige Batch wird sofort angehängt
+        """
+        if requests is None:
+            raise DeepLError("requests ist nicht installiert")
+        self.api_key = api_key or os.environ.get("DEEPL_API_KEY", "")
+        if not self.api_key:
+            raise DeepLError("DEEPL_API_KEY nicht gefunden!")
+        self.base_url = deepl_base_url(self.api_key)
+        self.session = session or requests.Session()
+        self.session.headers.update({"Authorization": f"DeepL-Auth-Key {self.api_key}"})
+        self.limiter = limiter or TokenBucketLimiter()
+        self.batch_size = batch_size
+        self.memory = memory
+        self.journal = journal
+        self.requests_sent = 0
+        self.characters_sent = 0
+        self._stats_lock = threading.Lock()
+
+    def _post_batch(self, texts: List[str], target_lang: str, source_lang: str) -> List[str]:
+        payload = {"text": texts, "target_lang": target_lang.upper(), "source_lang": source_lang.upper()}
+        for attempt in range(1, MAX_RETRIES + 1):
+            self.limiter.wait()
+            try:
+                response = self.session.post(f"{self.base_url}/translate", json=payload, timeout=API_TIMEOUT)
+            except requests.exceptions.RequestException as e:
+                if attempt == MAX_RETRIES:
+                    raise DeepLError(f"DeepL nicht erreichbar: {e}") from e
+                time.sleep(attempt * RETRY_DELAY)
+                continue
+
+            if response.status_code == 200:
+                self.limiter.on_success()
+                translations = response.json().get("translations") or []
+                if len(translations) != len(texts):
+                    raise DeepLError(f"DeepL lieferte {len(translations)} statt {len(texts)} Übersetzungen")
+                with self._stats_lock:
+                    self.requests_sent += 1
+                    self.characters_sent += sum(len(t) for t in texts)
+                return [t["text"] for t in translations]
+            if response.status_code == 456:
+                raise DeepLQuotaExceeded("DeepL Quota überschritten!")
+            if response.status_code == 429 or response.status_code >= 500:
+                # Die Pause macht limiter.wait() vor dem nächsten Versuch - für alle Threads
+                self.limiter.on_throttle(parse_retry_after(response.headers.get("Retry-After")))
+                if attempt < MAX_RETRIES:
+                    continue
+            raise DeepLError(f"DeepL Fehler: {response.status_code}")
+        raise DeepLError("DeepL: zu viele Wiederholungen")
+
+    def translate(self, texts: Sequence[str], target_lang: str, source_lang: str = "DE",
+                  fallback_on_error: bool = False,
+                  on_batch: Optional[Callable[[int, int], None]] = None) -> List[str]:
+        """Übersetzt Texte, Reihenfolge bleibt erhalten.
+
+        Leere Texte werden nicht geschickt, gleiche Texte nur einmal, Texte aus
+        Checkpoint-Journal oder Translation Memory gar nicht.
+
+        Args:
+            texts: Quelltexte
+            target_lang, source_lang: DeepL-Sprachcodes ("EN", "DE", ...)
+            fallback_on_error: bei Fehlern (außer Quota) den Originaltext behalten statt abzubrechen
+            on_batch: (fertig, gesamt) nach jedem Request, gezählt in Texten
+
+        Returns:
+            Übersetzungen in derselben Reihenfolge
+
+        Raises:
+            DeepLQuotaExceeded: immer, auch mit fallback_on_error
+            DeepLError: wenn fallback_on_error False ist
+        """
+        results = list(texts)
+        unique: List[str] = []
+        positions = {}
+        for idx, text in enumerate(texts):
+            if not isinstance(text, str) or not text.strip():
+                continue
+            if text not in positions:
+                positions[text] = []
+                unique.append(text)
+            positions[text].append(idx)
+
+        def apply(source: str, text: str) -> None:
+            for idx in positions[source]:
+                results[idx] = text
+
+        # Zuerst Checkpoint-Journal und Translation Memory - was dort steht, kostet keine Zeichen
+        done, total = 0, len(unique)
+        for store in (self.journal, self.memory):
+            if store is None or not unique:
+                continue
+            if store is self.journal:
+                remembered = store.lookup(unique, target_lang, source_lang)
+            else:
+                remembered = store.get_many(unique, target_lang, source_lang)
+            for source, text in remembered.items():
+                apply(source, text)
+            unique = [text for text in unique if text not in remembered]
+            done += len(remembered)
+        if on_batch and done:
+            on_batch(done, total)
+
+        for batch in iter_batches(unique, self.batch_size):
+            sources = [unique[i] for i in batch]
+            try:
+                translated = self._post_batch(sources, target_lang, source_lang)
+            except DeepLQuotaExceeded:
+                raise
+            except DeepLError as e:
+                if not fallback_on_error:
+                    raise
+                print(f"⚠️ {e} – {len(sources)} Text(e) bleiben unübersetzt")
+                translated = sources
+            else:
+                batch_result = dict(zip(sources, translated))
+                if self.journal is not None:
+                    self.journal.record(batch_result, target_lang, source_lang)
+                if self.memory is not None:
+                    self.memory.set_many(batch_result, target_lang, source_lang)
+            for source, text in zip(sources, translated):
+                apply(source, text)
+            done += len(sources)
+            if on_batch:
+                on_batch(done, total)
+        return results
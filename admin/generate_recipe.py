@@ -1,4 +1,5 @@
 import streamlit as st
+import copy
 import json
 import base64
 import os
@@ -10,6 +11,26 @@ from typing import Dict, List, Optional, Union
 from datetime import datetime
 from pathlib import Path
 
+from image_store import (
+    IMAGES_DIR, STORAGE_FILES, get_storage_mode, is_inline_image, externalize_recipes,
+    split_data_url, store_image_bytes, set_image_reference, resolve_image_path
+)
+from background_jobs import BackgroundJobQueue
+from git_status import GitStatusPoller, STATE_CLEAN, STATE_DIRTY, STATE_UNKNOWN, STATE_UNPUSHED
+from generate_sitemap import generate_sitemap
+from atomic_io import ChecksumMismatchError
+from recipe_history import list_snapshots, load_snapshot, snapshot_info
+from nutrition_cache import NutritionCache
+from translation_memory import TranslationMemory
+from nutrition_db import LocalNutritionDB
+from nutrition_sources import create_http_session
+from nutrition_engine import (
+    STATUS_ESTIMATE, STATUS_INVALID, StaticResolver, compute_nutrition, recipe_items,
+)
+from nutrition_batch import resolve_ingredients, recompute_catalog, apply_diffs, format_diff
+from recipe_store import RecipeStore, ensure_recipe_ids, save_catalog
+from recipe_search import RecipeSearchIndex
+
 # Load environment variables
 def load_env():
     """Lädt .env Datei aus dem aktuellen Verzeichnis"""
@@ -24,6 +45,10 @@ def load_env():
 
 load_env()
 
+# Projekt-Root (eins über admin/) und die Dateien, die der Admin committet
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GIT_TRACKED_FILES = ["admin/recipes.json", "admin/templates.json", "admin/categories.json"]
+
 # Git Auto-Commit Helper
 def git_commit_changes(commit_message: str) -> bool:
     """Automatischer Git-Commit nach Speicherung.
@@ -35,13 +60,10 @@ def git_commit_changes(commit_message: str) -> bool:
         bool: True wenn erfolgreich, False bei Fehler
     """
     try:
-        # Gehe zum Projekt-Root (eins über admin/)
-        repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        
-        # Git add (nur admin/recipes.json und templates.json)
+        # Git add (nur admin/recipes.json, templates.json und categories.json)
         subprocess.run(
-            ["git", "add", "admin/recipes.json", "admin/templates.json", "admin/categories.json"],
-            cwd=repo_root,
+            ["git", "add", *GIT_TRACKED_FILES],
+            cwd=REPO_ROOT,
             capture_output=True,
             timeout=5
         )
@@ -49,7 +71,7 @@ def git_commit_changes(commit_message: str) -> bool:
         # Git commit
         result = subprocess.run(
             ["git", "commit", "-m", commit_message],
-            cwd=repo_root,
+            cwd=REPO_ROOT,
             capture_output=True,
             timeout=5,
             text=True
@@ -67,6 +89,40 @@ def git_commit_changes(commit_message: str) -> bool:
         # Fehler beim Git-Commit sind nicht kritisch - speichern war ja erfolgreich
         return False
 
+# Hintergrund-Jobs: Git-Commit & Sitemap laufen entprellt außerhalb des Reruns
+JOB_DEBOUNCE_SECONDS = 3.0
+
+@st.cache_resource
+def get_job_queue():
+    """Prozessweite Job-Queue (überlebt Streamlit-Reruns und Sessions)."""
+    return BackgroundJobQueue(debounce_seconds=JOB_DEBOUNCE_SECONDS)
+
+@st.cache_resource
+def get_git_status():
+    """Prozessweiter Git-Status-Poller - die Sidebar wartet nie auf Git."""
+    return GitStatusPoller(REPO_ROOT, GIT_TRACKED_FILES)
+
+def commit_and_refresh_status(commit_message: str, git_status: GitStatusPoller) -> bool:
+    """Git-Commit im Hintergrund, danach den Sidebar-Status neu abfragen lassen."""
+    try:
+        return git_commit_changes(commit_message)
+    finally:
+        git_status.invalidate()
+
+def queue_git_commit(commit_message: str):
+    """Plant einen Git-Commit ein; mehrere Saves kurz hintereinander ergeben einen Commit."""
+    git_status = get_git_status()
+    git_status.invalidate()  # Dateien wurden gerade geändert
+    get_job_queue().submit("git_commit", commit_and_refresh_status, commit_message, git_status)
+
+def regenerate_sitemap(recipes) -> bool:
+    """Regeneriert die Sitemap im selben Prozess (läuft als Hintergrund-Job).
+    
+    Args:
+        recipes: Rezeptliste aus dem Speicher - recipes.json wird nicht neu gelesen
+    """
+    return generate_sitemap(recipes)
+
 # Small helper to safely request a rerun across Streamlit versions
 def safe_rerun():
     try:
@@ -95,8 +151,8 @@ def safe_rerun():
             pass
 
 # Initialize session state
-if 'edit_index' not in st.session_state:
-    st.session_state['edit_index'] = None
+if 'edit_recipe_id' not in st.session_state:
+    st.session_state['edit_recipe_id'] = None
 if 'preview_recipe' not in st.session_state:
     st.session_state['preview_recipe'] = None
 if 'auto_save_enabled' not in st.session_state:
@@ -351,7 +407,14 @@ def get_image_display(recipe_dict, width=200):
     image_data = recipe_dict.get("image", "")
     if image_data and image_data.strip():  # Prüfe auf nicht-leeren String
         # Base64-kodiertes Bild
+        if image_data.startswith("data:"):
+            return image_data
         return "data:image/png;base64," + image_data
+    
+    # Ausgelagertes Bild im Bildspeicher (public/recipe-images/)
+    stored_path = resolve_image_path(recipe_dict)
+    if stored_path:
+        return stored_path
     else:
         # Fallback auf foto-folgt.png
         script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -394,12 +457,22 @@ def load_api_key():
     return None
 
 # ====== Hilfsfunktionen ======
-@st.cache_data(ttl=10)  # Cache für 10 Sekunden
-def load_recipes():
-    if os.path.exists(RECIPES_FILE):
-        with open(RECIPES_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+@st.cache_resource
+def get_recipe_store():
+    """Prozessweiter Rezept-Katalog - recipes.json wird nur bei Änderungen neu gelesen."""
+    return RecipeStore(RECIPES_FILE, assign_ids=True)
+
+def load_recipes(editable=False):
+    """Lädt die Rezepte aus dem Store (ohne JSON-Parsing, solange die Datei unverändert ist).
+    
+    Args:
+        editable: True für Screens, die Rezepte ändern und speichern
+    
+    Returns:
+        Tupel der geteilten Rezepte (nur lesen) oder Liste flacher Kopien
+    """
+    store = get_recipe_store()
+    return store.editable() if editable else store.recipes()
 
 @st.cache_data(ttl=10)
 def load_templates():
@@ -422,7 +495,7 @@ def save_templates(templates):
             json.dump(templates, f, ensure_ascii=False, indent=2)
         
         # Git Auto-Commit
-        git_commit_changes(f"Admin: Vorlagen aktualisiert ({len(templates)} Vorlagen)")
+        queue_git_commit(f"Admin: Vorlagen aktualisiert ({len(templates)} Vorlagen)")
         return True
     except Exception as e:
         st.error(f"❌ Fehler beim Speichern der Vorlagen: {e}")
@@ -454,7 +527,7 @@ def save_categories(categories):
             json.dump(categories, f, ensure_ascii=False, indent=2)
         
         # Git Auto-Commit
-        git_commit_changes(f"Admin: Kategorien aktualisiert ({len(categories)} Kategorien)")
+        queue_git_commit(f"Admin: Kategorien aktualisiert ({len(categories)} Kategorien)")
         return True
     except Exception as e:
         st.error(f"❌ Fehler beim Speichern der Kategorien: {e}")
@@ -474,53 +547,34 @@ def save_recipes(recipes, force_save=False):
         return False  # Stillschweigend nicht speichern
         
     try:
-        # Backup erstellen (für Version History)
-        if os.path.exists(RECIPES_FILE):
-            # recipes_history ist jetzt im gleichen Ordner (admin/)
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            backup_dir = os.path.join(script_dir, "recipes_history")
-            os.makedirs(backup_dir, exist_ok=True)
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_file = os.path.join(backup_dir, f"recipes_{timestamp}.json")
-            
-            import shutil
-            shutil.copy2(RECIPES_FILE, backup_file)
-            
-            # Halte nur die letzten 10 Backups
-            backups = sorted([f for f in os.listdir(backup_dir) if f.startswith("recipes_")])
-            if len(backups) > 10:
-                for old_backup in backups[:-10]:
-                    try:
-                        os.remove(os.path.join(backup_dir, old_backup))
-                    except:
-                        pass
+        # Stabile IDs (Übersetzungen finden ihr Rezept darüber wieder)
+        ensure_recipe_ids(recipes)
         
-        # Speichern
-        with open(RECIPES_FILE, "w", encoding="utf-8") as f:
-            json.dump(recipes, f, ensure_ascii=False, indent=2)
+        # Bild-Speichermodus "files": Base64-Bilder in den Bildspeicher auslagern
+        if get_storage_mode() == STORAGE_FILES:
+            externalize_recipes(recipes)
         
-        # Verifizieren
-        with open(RECIPES_FILE, "r", encoding="utf-8") as f:
-            saved_data = json.load(f)
-            if len(saved_data) == len(recipes):
-                # ✨ GIT AUTO-COMMIT ✨
-                git_commit_changes(f"Admin: Rezepte aktualisiert ({len(recipes)} Rezepte)")
-                
-                # 🗺️ SITEMAP REGENERIEREN
-                try:
-                    import subprocess
-                    sitemap_script = os.path.join(os.path.dirname(__file__), "generate_sitemap.py")
-                    if os.path.exists(sitemap_script):
-                        subprocess.run([sys.executable, sitemap_script], check=True, capture_output=True)
-                except Exception as e:
-                    # Sitemap-Fehler sollten nicht das Speichern verhindern
-                    print(f"⚠️ Sitemap-Generierung fehlgeschlagen: {e}")
-                
-                return True
-            else:
-                st.error(f"⚠️ Verifizierung fehlgeschlagen: {len(saved_data)} statt {len(recipes)} Rezepte")
-                return False
+        # Atomar speichern, inkl. Version History (nur geänderte Rezepte werden neu abgelegt)
+        try:
+            save_catalog(recipes, RECIPES_FILE)
+        except ChecksumMismatchError as e:
+            st.error(f"⚠️ Verifizierung fehlgeschlagen: {e} - recipes.json wurde nicht verändert")
+            return False
+        
+        # Store direkt aktualisieren - der nächste Rerun parst nichts
+        get_recipe_store().replace(recipes)
+        
+        # ✨ GIT AUTO-COMMIT & 🗺️ SITEMAP (im Hintergrund, entprellt)
+        # Fehler dort verhindern das Speichern nicht mehr
+        queue_git_commit(f"Admin: Rezepte aktualisiert ({len(recipes)} Rezepte)")
+        # Nur die Felder, die die Sitemap braucht (hält keine Bilddaten im Job fest)
+        sitemap_recipes = [
+            {key: r.get(key) for key in ("title", "updated_at", "created_at")}
+            for r in recipes
+        ]
+        get_job_queue().submit("sitemap", regenerate_sitemap, sitemap_recipes)
+        
+        return True
                 
     except PermissionError:
         st.error(f"❌ Keine Schreibberechtigung für {RECIPES_FILE}")
@@ -687,6 +741,40 @@ def decode_image(base64_str):
     return base64.b64decode(base64_str)
 
 # ----- Bilder-Verwaltung -----
+def encode_recipe_webp(image_file):
+    """Lädt ein Bild und kodiert es als WebP (RGB, max. 1200px breit).
+    
+    Args:
+        image_file: Streamlit UploadedFile oder File-Like Object
+        
+    Returns:
+        bytes: WebP-Daten
+    """
+    from PIL import Image
+    import io
+    
+    # Bild laden
+    image = Image.open(image_file)
+    
+    # Konvertiere zu RGB (wichtig für WebP)
+    if image.mode in ('RGBA', 'LA', 'P'):
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        if image.mode == 'P':
+            image = image.convert('RGBA')
+        background.paste(image, mask=image.split()[-1] if image.mode in ('RGBA', 'LA') else None)
+        image = background
+    
+    # Skaliere auf max 1200px Breite (für Performance)
+    max_width = 1200
+    if image.width > max_width:
+        ratio = max_width / image.width
+        new_height = int(image.height * ratio)
+        image = image.resize((max_width, new_height), Image.Resampling.LANCZOS)
+    
+    buffer = io.BytesIO()
+    image.save(buffer, 'WEBP', quality=85, optimize=True)
+    return buffer.getvalue()
+
 def save_recipe_image(image_file, recipe_slug):
     """Speichert Bild als Datei im public/recipe-images/ Ordner.
     
@@ -698,40 +786,22 @@ def save_recipe_image(image_file, recipe_slug):
         str: Dateiname des gespeicherten Bildes (z.B. "kaesespaetzle-vegan-1234.jpg")
     """
     try:
-        from PIL import Image
-        import io
         from datetime import datetime
         
-        # Projekt-Root ermitteln (eins über admin/)
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        images_dir = os.path.join(project_root, "public", "recipe-images")
-        os.makedirs(images_dir, exist_ok=True)
-        
-        # Bild laden
-        image = Image.open(image_file)
-        
-        # Konvertiere zu RGB (wichtig für WebP)
-        if image.mode in ('RGBA', 'LA', 'P'):
-            background = Image.new('RGB', image.size, (255, 255, 255))
-            if image.mode == 'P':
-                image = image.convert('RGBA')
-            background.paste(image, mask=image.split()[-1] if image.mode in ('RGBA', 'LA') else None)
-            image = background
+        os.makedirs(IMAGES_DIR, exist_ok=True)
+        data = encode_recipe_webp(image_file)
         
-        # Skaliere auf max 1200px Breite (für Performance)
-        max_width = 1200
-        if image.width > max_width:
-            ratio = max_width / image.width
-            new_height = int(image.height * ratio)
-            image = image.resize((max_width, new_height), Image.Resampling.LANCZOS)
+        # Content-adressierter Speicher: Bytes nur einmal unter Hash-Namen ablegen
+        if get_storage_mode() == STORAGE_FILES:
+            return store_image_bytes(data, "webp", IMAGES_DIR)
         
         # Generiere Dateinamen
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{recipe_slug}_{timestamp}.webp"
-        filepath = os.path.join(images_dir, filename)
         
         # Speichere als WebP (bessere Kompression)
-        image.save(filepath, 'WEBP', quality=85, optimize=True)
+        with open(os.path.join(IMAGES_DIR, filename), 'wb') as f:
+            f.write(data)
         
         return filename
         
@@ -842,6 +912,38 @@ def extract_images_from_recipes():
         st.error(f"❌ Fehler beim Extrahieren der Bilder: {e}")
         return []
 
+def migrate_inline_images_to_files(recipes):
+    """Einmalige Migration: Base64-Bilder → WebP-Dateien in public/recipe-images/.
+    
+    Unabhängig von IMAGE_STORAGE_MODE content-adressiert wie
+    `python image_store.py` (gleiches Bild = eine Datei <hash>.webp, auch bei
+    wiederholten Läufen); das Base64-Feld wird durch die Referenz ersetzt.
+    
+    Args:
+        recipes: Liste der Rezepte (wird direkt verändert)
+        
+    Returns:
+        int: Anzahl migrierter Bilder
+    """
+    import io
+    
+    migrated = 0
+    for recipe in recipes:
+        image = recipe.get('image', '')
+        if not is_inline_image(image):
+            continue
+        
+        _, base64_data = split_data_url(image)
+        try:
+            data = encode_recipe_webp(io.BytesIO(base64.b64decode(base64_data)))
+        except Exception as e:
+            st.error(f"❌ Bild von '{recipe.get('title', 'Unbekannt')}' nicht lesbar: {e}")
+            continue
+        set_image_reference(recipe, store_image_bytes(data, "webp", IMAGES_DIR))
+        migrated += 1
+    
+    return migrated
+
 
 # ----- Web Scraping -----
 def fetch_url_text(url, timeout=6):
@@ -1396,6 +1498,11 @@ def call_gemini(prompt):
     st.error(f"Letzter Fehler: {last_error}")
     return None
 
+@st.cache_resource
+def get_translation_memory():
+    """Prozessweite Translation Memory (SQLite, geteilt mit den Übersetzungsskripten)."""
+    return TranslationMemory()
+
 def translate_with_deepl(text: str, target_lang: str = "EN", source_lang: str = "DE") -> Optional[str]:
     """Übersetzt Text mit DeepL API.
     
@@ -1407,6 +1514,15 @@ def translate_with_deepl(text: str, target_lang: str = "EN", source_lang: str =
     Returns:
         Übersetzter Text oder None bei Fehler
     """
+    if not text or not text.strip():
+        return text
+    
+    # Gemeinsame Translation Memory mit den Übersetzungsskripten
+    memory = get_translation_memory()
+    remembered = memory.get(text, target_lang, source_lang or "DE")
+    if remembered is not None:
+        return remembered
+    
     api_key = os.environ.get("DEEPL_API_KEY")
     if not api_key:
         st.error("🔑 DeepL API-Key fehlt! Bitte in .env eintragen: DEEPL_API_KEY=...")
@@ -1436,7 +1552,9 @@ def translate_with_deepl(text: str, target_lang: str = "EN", source_lang: str =
         if response.status_code == 200:
             result = response.json()
             if result.get("translations") and len(result["translations"]) > 0:
-                return result["translations"][0]["text"]
+                translated = result["translations"][0]["text"]
+                memory.set(text, translated, target_lang, source_lang or "DE")
+                return translated
             else:
                 st.error("❌ DeepL: Keine Übersetzung erhalten")
                 return None
@@ -1459,615 +1577,111 @@ def translate_with_deepl(text: str, target_lang: str = "EN", source_lang: str =
         st.error(f"❌ DeepL Fehler: {str(e)}")
         return None
 
-def search_swiss_food_api(name):
-    """Suche in Swiss Food Database. Returns nutrition dict or None."""
-    try:
-        base_url = "https://api.webapp.prod.blv.foodcase-services.com/BLV_WebApp_WS/webresources/BLV-api"
-        
-        # 1. Suche nach Lebensmittel
-        search_url = f"{base_url}/foods"
-        params = {"search": name, "lang": "de", "limit": 3}
-        response = requests.get(search_url, params=params, timeout=8)
-        
-        if response.status_code != 200:
-            return None
-            
-        foods = response.json()
-        if not foods or len(foods) == 0:
-            return None
-        
-        # 2. Hole DBID
-        food = foods[0]
-        food_id = food.get("id")
-        if not food_id:
-            return None
-            
-        dbid_url = f"{base_url}/fooddbid/{food_id}"
-        dbid_resp = requests.get(dbid_url, timeout=8)
-        if dbid_resp.status_code != 200:
-            return None
-            
-        dbid_data = dbid_resp.json()
-        if not isinstance(dbid_data, list) or len(dbid_data) == 0:
-            return None
-        food_dbid = dbid_data[0]
-        
-        # 3. Hole Nährwerte
-        values_url = f"{base_url}/values"
-        values_params = {"DBID": food_dbid, "componentsetid": 1, "lang": "de"}
-        values_resp = requests.get(values_url, params=values_params, timeout=8)
-        
-        if values_resp.status_code != 200:
-            return None
-            
-        values = values_resp.json()
-        
-        # Parse Nährwerte
-        component_map = {
-            "ENER1": "kcal", "PROT": "protein", "CHO": "carbs",
-            "FAT": "fat", "FIBC": "fiber"
-        }
-        
-        result = {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0}
-        matched_name = food.get("names", [{}])[0].get("term", name) if "names" in food else name
-        
-        for value in values:
-            component = value.get("component", {})
-            component_code = component.get("code", "")
-            
-            if component_code in component_map:
-                key = component_map[component_code]
-                value_str = value.get("value", "0")
-                try:
-                    if isinstance(value_str, str):
-                        value_str = value_str.replace(',', '.')
-                    result[key] = float(value_str)
-                except:
-                    pass
-        
-        return {"nutrition": result, "matched_name": matched_name, "source": "Swiss Food DB 🇨🇭"}
-        
-    except:
-        return None
-
-def search_openfoodfacts_api(name):
-    """Suche in Open Food Facts. Returns nutrition dict or None."""
-    try:
-        # Open Food Facts API (weltweit, crowdsourced)
-        search_url = "https://world.openfoodfacts.org/cgi/search.pl"
-        params = {
-            "search_terms": name,
-            "search_simple": 1,
-            "action": "process",
-            "json": 1,
-            "page_size": 3,
-            "fields": "product_name,nutriments"
-        }
-        
-        response = requests.get(search_url, params=params, timeout=8)
-        if response.status_code != 200:
-            return None
+# NUTRITION_OFFLINE=1 in .env: nur Offline-DB + eingebaute Liste, keine API-Abfragen
+NUTRITION_OFFLINE = os.environ.get("NUTRITION_OFFLINE", "").strip().lower() in ("1", "true", "yes")
+
+@st.cache_resource
+def get_local_nutrition_db():
+    """Offline-Nährwertdatenbank (nutrition_db.sqlite3), einmal pro Prozess geöffnet."""
+    return LocalNutritionDB()
+
+@st.cache_resource
+def get_nutrition_cache():
+    """Prozessweiter Nährwert-Cache (SQLite, überlebt Neustarts)."""
+    return NutritionCache()
+
+@st.cache_resource
+def get_nutrition_http():
+    """Geteilte HTTP-Session (Keep-Alive) und Semaphoren pro API."""
+    return create_http_session()
+
+def render_nutrition_trace(result):
+    """Zeigt die Spur einer Nährwertberechnung (nutrition_engine.compute_nutrition) an."""
+    for g_idx, group_name in enumerate(result.groups):
+        st.write(f"  **Gruppe {g_idx+1}: {group_name}**")
+        
+        for trace in (t for t in result.items if t.group_index == g_idx):
+            if trace.amount_note:
+                st.write(f"    📊 {trace.name}: {trace.amount_note}")
+            if trace.status == STATUS_INVALID:
+                st.write(f"    ⚠️ {trace.name}: Menge ungültig ({trace.amount_raw})")
+                continue
             
-        data = response.json()
-        products = data.get("products", [])
-        
-        if not products:
-            return None
-        
-        # Nehme ersten Treffer
-        product = products[0]
-        nutriments = product.get("nutriments", {})
-        matched_name = product.get("product_name", name)
-        
-        # Extrahiere Nährwerte (pro 100g)
-        result = {
-            "kcal": nutriments.get("energy-kcal_100g", 0) or 0,
-            "protein": nutriments.get("proteins_100g", 0) or 0,
-            "carbs": nutriments.get("carbohydrates_100g", 0) or 0,
-            "fat": nutriments.get("fat_100g", 0) or 0,
-            "fiber": nutriments.get("fiber_100g", 0) or 0
-        }
-        
-        # Nur zurückgeben wenn mindestens kcal vorhanden
-        if result["kcal"] > 0:
-            return {"nutrition": result, "matched_name": matched_name, "source": "Open Food Facts 🌍"}
-        
-        return None
-        
-    except:
-        return None
-
-def search_usda_api(name):
-    """Suche in USDA FoodData Central (kostenlos, kein Key nötig für Basis-Suche). Returns nutrition dict or None."""
-    try:
-        # USDA FoodData Central - Foundation Foods (öffentlich)
-        search_url = "https://api.nal.usda.gov/fdc/v1/foods/search"
-        params = {
-            "query": name,
-            "pageSize": 3,
-            "api_key": "DEMO_KEY"  # DEMO_KEY erlaubt 30 requests/hour/IP
-        }
-        
-        response = requests.get(search_url, params=params, timeout=8)
-        if response.status_code != 200:
-            return None
+            added = trace.added
+            if trace.status == STATUS_ESTIMATE:
+                st.write(f"    ⚠️ {trace.amount}{trace.unit} {trace.name} → {added['kcal']} kcal (Schätzwert)")
+                continue
             
-        data = response.json()
-        foods = data.get("foods", [])
-        
-        if not foods:
-            return None
-        
-        # Nehme ersten Treffer
-        food = foods[0]
-        matched_name = food.get("description", name)
-        nutrients = food.get("foodNutrients", [])
-        
-        # USDA Nutrient IDs
-        nutrient_map = {
-            1008: "kcal",      # Energy
-            1003: "protein",   # Protein
-            1005: "carbs",     # Carbohydrate
-            1004: "fat",       # Total lipid (fat)
-            1079: "fiber"      # Fiber, total dietary
-        }
-        
-        result = {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0}
-        
-        for nutrient in nutrients:
-            nutrient_id = nutrient.get("nutrientId")
-            if nutrient_id in nutrient_map:
-                key = nutrient_map[nutrient_id]
-                value = nutrient.get("value", 0)
-                result[key] = float(value) if value else 0
-        
-        # Nur zurückgeben wenn mindestens kcal vorhanden
-        if result["kcal"] > 0:
-            return {"nutrition": result, "matched_name": matched_name, "source": "USDA FoodData 🇺🇸"}
-        
-        return None
-        
-    except:
-        return None
+            if trace.fallback_method:
+                st.write(f"    💾 Fallback: {trace.name} → {trace.matched_name} ({trace.confidence:.0%} {trace.fallback_method})")
+            else:
+                cache_hint = " 🗄️" if trace.from_cache else ""
+                confidence = f" ({trace.confidence:.0%})" if trace.confidence is not None else ""
+                st.write(f"    ✅ {trace.source}{cache_hint}: {trace.name} → {trace.matched_name}{confidence}")
+            if trace.conversion_note:
+                st.write(f"      {trace.conversion_note}")
+            st.write(f"      → {added['kcal']} kcal, {added['protein']}g Protein, {added['carbs']}g KH, {added['fat']}g Fett")
+    
+    total = result.total
+    if result.portions > 1:
+        st.write(f"\n**📊 Gesamtrezept ({result.portions} Portionen):** {total['kcal']} kcal | {total['protein']}g Protein | {total['carbs']}g KH | {total['fat']}g Fett | {total['fiber']}g Ballaststoffe")
+        per_portion = result.per_portion
+        st.success(f"**🎯 Pro Portion (1/{result.portions}):** {per_portion['kcal']} kcal | {per_portion['protein']}g Protein | {per_portion['carbs']}g KH | {per_portion['fat']}g Fett | {per_portion['fiber']}g Ballaststoffe")
+    else:
+        st.success(f"**🎯 Gesamt:** {total['kcal']} kcal | {total['protein']}g Protein | {total['carbs']}g KH | {total['fat']}g Fett | {total['fiber']}g Ballaststoffe")
 
 def compute_nutrition_from_swiss(ingredients, portions=1):
     """Calculate nutrition using multiple free APIs with fallback chain:
+    0. Offline database (nutrition_db.sqlite3, see nutrition_db.py)
     1. Swiss Food Database (BLV)
     2. Open Food Facts (global)
     3. USDA FoodData Central
     4. Local database
     5. Estimates
     
+    Nachschlagen passiert hier, gerechnet wird in nutrition_engine.py (ohne
+    Streamlit); die Spur wird danach mit render_nutrition_trace() angezeigt.
+    
     Args:
         ingredients: List of ingredient groups
         portions: Number of servings (default 1). Result will be per portion.
     
     Returns dict with keys kcal, protein, carbs, fat, fiber (ints) - per portion.
     """
-    # Lokale Fallback-Datenbank für häufige vegane Zutaten (pro 100g)
-    nutrition_db = {
-        # Getreide & Mehl
-        "mehl": {"kcal": 364, "protein": 10, "carbs": 76, "fat": 1, "fiber": 3},
-        "weizenmehl": {"kcal": 364, "protein": 10, "carbs": 76, "fat": 1, "fiber": 3},
-        "dinkelmehl": {"kcal": 338, "protein": 15, "carbs": 70, "fat": 2, "fiber": 9},
-        "vollkornmehl": {"kcal": 340, "protein": 13, "carbs": 72, "fat": 2, "fiber": 10},
-        "haferflocken": {"kcal": 379, "protein": 13, "carbs": 58, "fat": 7, "fiber": 10},
-        "reis": {"kcal": 130, "protein": 3, "carbs": 28, "fat": 0, "fiber": 0},
-        "nudeln": {"kcal": 371, "protein": 13, "carbs": 74, "fat": 1, "fiber": 3},
-        "pasta": {"kcal": 371, "protein": 13, "carbs": 74, "fat": 1, "fiber": 3},
-        "brot": {"kcal": 265, "protein": 9, "carbs": 49, "fat": 3, "fiber": 4},
-        
-        # Hülsenfrüchte
-        "linsen": {"kcal": 116, "protein": 9, "carbs": 20, "fat": 0, "fiber": 8},
-        "kichererbsen": {"kcal": 164, "protein": 9, "carbs": 27, "fat": 3, "fiber": 7},
-        "bohnen": {"kcal": 127, "protein": 9, "carbs": 23, "fat": 0, "fiber": 7},
-        "kidneybohnen": {"kcal": 127, "protein": 9, "carbs": 23, "fat": 0, "fiber": 7},
-        "schwarze bohnen": {"kcal": 132, "protein": 9, "carbs": 24, "fat": 1, "fiber": 9},
-        "erbsen": {"kcal": 81, "protein": 5, "carbs": 14, "fat": 0, "fiber": 5},
-        "tofu": {"kcal": 76, "protein": 8, "carbs": 2, "fat": 5, "fiber": 1},
-        "räuchertofu": {"kcal": 150, "protein": 15, "carbs": 3, "fat": 9, "fiber": 2},
-        "tempeh": {"kcal": 193, "protein": 19, "carbs": 9, "fat": 11, "fiber": 9},
-        
-        # Gemüse
-        "tomate": {"kcal": 18, "protein": 1, "carbs": 4, "fat": 0, "fiber": 1},
-        "tomaten": {"kcal": 18, "protein": 1, "carbs": 4, "fat": 0, "fiber": 1},
-        "zwiebel": {"kcal": 40, "protein": 1, "carbs": 9, "fat": 0, "fiber": 2},
-        "zwiebeln": {"kcal": 40, "protein": 1, "carbs": 9, "fat": 0, "fiber": 2},
-        "knoblauch": {"kcal": 149, "protein": 6, "carbs": 33, "fat": 1, "fiber": 2},
-        "karotte": {"kcal": 41, "protein": 1, "carbs": 10, "fat": 0, "fiber": 3},
-        "karotten": {"kcal": 41, "protein": 1, "carbs": 10, "fat": 0, "fiber": 3},
-        "möhre": {"kcal": 41, "protein": 1, "carbs": 10, "fat": 0, "fiber": 3},
-        "möhren": {"kcal": 41, "protein": 1, "carbs": 10, "fat": 0, "fiber": 3},
-        "paprika": {"kcal": 31, "protein": 1, "carbs": 6, "fat": 0, "fiber": 2},
-        "zucchini": {"kcal": 17, "protein": 1, "carbs": 3, "fat": 0, "fiber": 1},
-        "aubergine": {"kcal": 25, "protein": 1, "carbs": 6, "fat": 0, "fiber": 3},
-        "brokkoli": {"kcal": 34, "protein": 3, "carbs": 7, "fat": 0, "fiber": 3},
-        "blumenkohl": {"kcal": 25, "protein": 2, "carbs": 5, "fat": 0, "fiber": 2},
-        "spinat": {"kcal": 23, "protein": 3, "carbs": 4, "fat": 0, "fiber": 2},
-        "salat": {"kcal": 15, "protein": 1, "carbs": 3, "fat": 0, "fiber": 1},
-        "gurke": {"kcal": 15, "protein": 1, "carbs": 4, "fat": 0, "fiber": 1},
-        "lauch": {"kcal": 61, "protein": 1, "carbs": 14, "fat": 0, "fiber": 2},
-        
-        # Nüsse & Samen
-        "mandel": {"kcal": 579, "protein": 21, "carbs": 22, "fat": 50, "fiber": 12},
-        "mandeln": {"kcal": 579, "protein": 21, "carbs": 22, "fat": 50, "fiber": 12},
-        "walnuss": {"kcal": 654, "protein": 15, "carbs": 14, "fat": 65, "fiber": 7},
-        "walnüsse": {"kcal": 654, "protein": 15, "carbs": 14, "fat": 65, "fiber": 7},
-        "cashew": {"kcal": 553, "protein": 18, "carbs": 30, "fat": 44, "fiber": 3},
-        "cashews": {"kcal": 553, "protein": 18, "carbs": 30, "fat": 44, "fiber": 3},
-        "erdnuss": {"kcal": 567, "protein": 26, "carbs": 16, "fat": 49, "fiber": 8},
-        "erdnüsse": {"kcal": 567, "protein": 26, "carbs": 16, "fat": 49, "fiber": 8},
-        "sonnenblumenkerne": {"kcal": 584, "protein": 21, "carbs": 20, "fat": 51, "fiber": 9},
-        "kürbiskerne": {"kcal": 559, "protein": 30, "carbs": 11, "fat": 49, "fiber": 6},
-        "sesam": {"kcal": 573, "protein": 18, "carbs": 23, "fat": 50, "fiber": 12},
-        "leinsamen": {"kcal": 534, "protein": 18, "carbs": 29, "fat": 42, "fiber": 27},
-        "chiasamen": {"kcal": 486, "protein": 17, "carbs": 42, "fat": 31, "fiber": 34},
-        
-        # Öle & Fette
-        "öl": {"kcal": 884, "protein": 0, "carbs": 0, "fat": 100, "fiber": 0},
-        "olivenöl": {"kcal": 884, "protein": 0, "carbs": 0, "fat": 100, "fiber": 0},
-        "rapsöl": {"kcal": 884, "protein": 0, "carbs": 0, "fat": 100, "fiber": 0},
-        "sonnenblumenöl": {"kcal": 884, "protein": 0, "carbs": 0, "fat": 100, "fiber": 0},
-        "kokosöl": {"kcal": 862, "protein": 0, "carbs": 0, "fat": 100, "fiber": 0},
-        
-        # Milchalternativen
-        "hafermilch": {"kcal": 47, "protein": 1, "carbs": 7, "fat": 2, "fiber": 1},
-        "sojamilch": {"kcal": 54, "protein": 3, "carbs": 6, "fat": 2, "fiber": 1},
-        "mandelmilch": {"kcal": 24, "protein": 1, "carbs": 3, "fat": 1, "fiber": 0},
-        "kokosmilch": {"kcal": 230, "protein": 2, "carbs": 6, "fat": 24, "fiber": 2},
-        
-        # Süßungsmittel
-        "zucker": {"kcal": 387, "protein": 0, "carbs": 100, "fat": 0, "fiber": 0},
-        "ahornsirup": {"kcal": 260, "protein": 0, "carbs": 67, "fat": 0, "fiber": 0},
-        "agavendicksaft": {"kcal": 310, "protein": 0, "carbs": 76, "fat": 0, "fiber": 0},
-        "honig": {"kcal": 304, "protein": 0, "carbs": 82, "fat": 0, "fiber": 0},
-        
-        # Gewürze & Würze (geringe Mengen, daher Nullwerte)
-        "salz": {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0},
-        "pfeffer": {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0},
-        "paprikapulver": {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0},
-        "curry": {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0},
-        "kurkuma": {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0},
-        "kreuzkümmel": {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0},
-        "zimt": {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0},
-        "muskat": {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0},
-        "ingwer": {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0},
-        "petersilie": {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0},
-        "basilikum": {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0},
-        "oregano": {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0},
-        "thymian": {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0},
-        "rosmarin": {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0},
-        "sojasauce": {"kcal": 53, "protein": 5, "carbs": 5, "fat": 0, "fiber": 0},
-        "essig": {"kcal": 19, "protein": 0, "carbs": 1, "fat": 0, "fiber": 0},
-        "senf": {"kcal": 66, "protein": 4, "carbs": 6, "fat": 3, "fiber": 3},
-        "tomatenmark": {"kcal": 82, "protein": 4, "carbs": 18, "fat": 0, "fiber": 3},
-        
-        # Kartoffeln & Stärke
-        "kartoffel": {"kcal": 77, "protein": 2, "carbs": 17, "fat": 0, "fiber": 2},
-        "kartoffeln": {"kcal": 77, "protein": 2, "carbs": 17, "fat": 0, "fiber": 2},
-        "süßkartoffel": {"kcal": 86, "protein": 2, "carbs": 20, "fat": 0, "fiber": 3},
-        "süßkartoffeln": {"kcal": 86, "protein": 2, "carbs": 20, "fat": 0, "fiber": 3},
-        "stärke": {"kcal": 381, "protein": 0, "carbs": 91, "fat": 0, "fiber": 0},
-        "maisstärke": {"kcal": 381, "protein": 0, "carbs": 91, "fat": 0, "fiber": 0},
-        
-        # Obst
-        "apfel": {"kcal": 52, "protein": 0, "carbs": 14, "fat": 0, "fiber": 2},
-        "banane": {"kcal": 89, "protein": 1, "carbs": 23, "fat": 0, "fiber": 3},
-        "orange": {"kcal": 47, "protein": 1, "carbs": 12, "fat": 0, "fiber": 2},
-        "zitrone": {"kcal": 29, "protein": 1, "carbs": 9, "fat": 0, "fiber": 3},
-        "beeren": {"kcal": 57, "protein": 1, "carbs": 14, "fat": 0, "fiber": 2},
-        "erdbeeren": {"kcal": 32, "protein": 1, "carbs": 8, "fat": 0, "fiber": 2},
-        "heidelbeeren": {"kcal": 57, "protein": 1, "carbs": 14, "fat": 0, "fiber": 2},
-        "himbeeren": {"kcal": 52, "protein": 1, "carbs": 12, "fat": 1, "fiber": 7},
-        "mango": {"kcal": 60, "protein": 1, "carbs": 15, "fat": 0, "fiber": 2},
-        "ananas": {"kcal": 50, "protein": 1, "carbs": 13, "fat": 0, "fiber": 1},
-        "avocado": {"kcal": 160, "protein": 2, "carbs": 9, "fat": 15, "fiber": 7},
-    }
-    
     try:
-        total = {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0}
-        
-        
         st.write("🔍 **Nährwertberechnung (Multi-API mit Fallback)**")
-        st.write("📊 Fallback: Swiss 🇨🇭 → OpenFood 🌍 → USDA 🇺🇸 → Lokal 💾 → Schätzung ⚖️")
+        if NUTRITION_OFFLINE:
+            st.write("📊 Offline-Modus: Offline-DB 📦 → Lokal 💾 → Schätzung ⚖️")
+        else:
+            st.write("📊 Fallback: Offline-DB 📦 → Swiss 🇨🇭 → OpenFood 🌍 → USDA 🇺🇸 → Lokal 💾 → Schätzung ⚖️")
+        cache = get_nutrition_cache()
+        hits_before, misses_before = cache.hits, cache.misses
+        
+        # Alle Zutaten vorab nachschlagen (wie "Nährwerte neu berechnen"),
+        # gerechnet wird danach in Rezept-Reihenfolge
+        names = [name for name, _, _ in recipe_items(ingredients)]
+        session, limits = get_nutrition_http()
+        progress = st.progress(0.0)
+        status = st.empty()
+        
+        def on_progress(done, total, name):
+            progress.progress(done / total)
+            status.caption(f"🔎 {done}/{total} Zutaten nachgeschlagen – zuletzt: {name}")
+        
+        resolved = resolve_ingredients(
+            names, get_local_nutrition_db(), cache,
+            offline=NUTRITION_OFFLINE, session=session, limits=limits, on_progress=on_progress,
+        )
+        progress.empty()
+        status.empty()
         
-        for g_idx, g in enumerate(ingredients):
-            group_name = g.get("group", "Unbekannt")
-            st.write(f"  **Gruppe {g_idx+1}: {group_name}**")
-            
-            for it_idx, it in enumerate(g.get("items", [])):
-                amount = it.get("amount", "0")
-                unit = it.get("unit", "")  # Leerer String als default, nicht "g"
-                name = it.get("name", "").strip()
-                
-                # Sicherheit: unit kann None sein
-                if unit is None:
-                    unit = ""
-                
-                if not name or not amount:
-                    continue
-                
-                # Extrahiere Zahl aus Menge
-                try:
-                    # Behandle Bereichsangaben wie "50-100" → nimm Durchschnitt
-                    amount_str = str(amount).strip()
-                    
-                    # Check für Bereiche (z.B. "50-100", "1-2")
-                    if '-' in amount_str and not amount_str.startswith('-'):
-                        parts = amount_str.split('-')
-                        if len(parts) == 2:
-                            try:
-                                num1 = float(parts[0].replace(',', '.').strip())
-                                num2 = float(parts[1].replace(',', '.').strip())
-                                amt = (num1 + num2) / 2  # Durchschnitt
-                                st.write(f"    📊 {name}: Bereich {amount_str} → Durchschnitt {amt}")
-                            except:
-                                amount_str = parts[0]  # Nehme erste Zahl
-                    
-                    # Normale Zahlenextraktion
-                    amount_clean = ''.join(c for c in amount_str if c.isdigit() or c == '.' or c == ',')
-                    amount_clean = amount_clean.replace(',', '.')
-                    amt = float(amount_clean) if amount_clean else 0
-                    
-                    if amt <= 0:
-                        st.write(f"    ⚠️ {name}: Menge ungültig ({amount})")
-                        continue
-                        
-                except Exception as e:
-                    st.write(f"    ⚠️ {name}: Konnte Menge nicht parsen ({amount}) - Fehler: {e}")
-                    continue
-                
-                # API-Fallback-Kette: Swiss → Open Food Facts → USDA → Lokale DB → Schätzung
-                api_result = None
-                found_nutr = None
-                matched_name = None
-                source = ""
-                
-                # 1. Versuche Swiss Food Database
-                api_result = search_swiss_food_api(name)
-                
-                # 2. Falls nicht gefunden, versuche Open Food Facts
-                if not api_result:
-                    api_result = search_openfoodfacts_api(name)
-                
-                # 3. Falls immer noch nicht gefunden, versuche USDA
-                if not api_result:
-                    api_result = search_usda_api(name)
-                
-                # Wenn API erfolgreich
-                if api_result:
-                    found_nutr = api_result["nutrition"]
-                    matched_name = api_result["matched_name"]
-                    source = api_result["source"]
-                    st.write(f"    ✅ {source}: {name} → {matched_name}")
-                
-                # 4. Fallback zu lokaler Datenbank
-                if not found_nutr:
-                    name_lower = name.lower()
-                    for db_key, db_values in nutrition_db.items():
-                        if db_key in name_lower or name_lower in db_key:
-                            found_nutr = db_values
-                            matched_name = db_key
-                            st.write(f"    💾 Fallback: {name} → {matched_name}")
-                            break
-                
-                if found_nutr:
-                    # Berechne Faktor basierend auf Einheit
-                    factor = amt / 100.0  # Standard: pro 100g
-                    
-                    # Einheitenumrechnung
-                    unit_lower = unit.lower().strip()
-                    
-                    # Gewichtseinheiten
-                    if unit_lower in ['kg', 'kilo', 'kilogramm']:
-                        factor = (amt * 1000) / 100.0
-                    elif unit_lower in ['mg', 'milligramm']:
-                        factor = (amt / 1000) / 100.0
-                    elif unit_lower in ['g', 'gramm', 'gr']:
-                        factor = amt / 100.0
-                    
-                    # Volumeneinheiten
-                    elif unit_lower in ['ml', 'milliliter']:
-                        factor = amt / 100.0
-                    elif unit_lower in ['l', 'liter']:
-                        factor = (amt * 1000) / 100.0
-                    elif unit_lower in ['cl', 'centiliter']:
-                        factor = (amt * 10) / 100.0
-                    elif unit_lower in ['dl', 'deciliter']:
-                        factor = (amt * 100) / 100.0
-                    
-                    # Löffel & Tassen
-                    elif unit_lower in ['el', 'esslöffel', 'essl', 'eßlöffel', 'tbsp', 'essloffel']:
-                        factor = (amt * 15) / 100.0  # ~15g/15ml pro EL
-                        st.write(f"      📏 {amt} EL = ~{amt*15}g")
-                    elif unit_lower in ['tl', 'teelöffel', 'teel', 'tsp', 'teeloffel']:
-                        factor = (amt * 5) / 100.0   # ~5g/5ml pro TL
-                        st.write(f"      📏 {amt} TL = ~{amt*5}g")
-                    elif unit_lower in ['msp', 'messerspitze', 'messerspitzen']:
-                        factor = (amt * 2) / 100.0   # ~2g pro Messerspitze
-                        st.write(f"      📏 {amt} Msp = ~{amt*2}g")
-                    elif unit_lower in ['tasse', 'tassen', 'cup', 'cups', 'becher']:
-                        factor = (amt * 240) / 100.0  # ~240ml pro Tasse
-                        st.write(f"      📏 {amt} Tasse(n) = ~{amt*240}ml")
-                    
-                    # Beschreibende Mengen (geringe/keine Nährwerte)
-                    elif unit_lower in ['prise', 'prisen', 'spritzer', 'schuss', 'etwas', 'wenig', 'nach belieben', 'nach geschmack', 'belieben', 'geschmack']:
-                        factor = 0  # Vernachlässigbar
-                        st.write(f"      💨 {amt} {unit} = vernachlässigbar")
-                    elif unit_lower in ['handvoll', 'hand voll']:
-                        factor = (amt * 40) / 100.0  # ~40g pro Handvoll
-                        st.write(f"      📏 {amt} Handvoll = ~{amt*40}g")
-                    
-                    # Verpackungseinheiten
-                    elif unit_lower in ['dose', 'dosen']:
-                        factor = (amt * 400) / 100.0  # Standard-Dose ~400g
-                        st.write(f"      📏 {amt} Dose(n) = ~{amt*400}g")
-                    elif unit_lower in ['glas', 'gläser']:
-                        factor = (amt * 200) / 100.0  # Standard-Glas ~200ml
-                        st.write(f"      📏 {amt} Glas = ~{amt*200}ml")
-                    elif unit_lower in ['packung', 'pkg', 'pack']:
-                        factor = (amt * 250) / 100.0  # Standard-Packung ~250g
-                        st.write(f"      📏 {amt} Packung(en) = ~{amt*250}g")
-                    elif unit_lower in ['bund', 'bündel']:
-                        factor = (amt * 100) / 100.0  # Bund Petersilie etc ~100g
-                        st.write(f"      📏 {amt} Bund = ~{amt*100}g")
-                    
-                    # Scheiben & Stücke
-                    elif unit_lower in ['scheibe', 'scheiben']:
-                        # Kontext-abhängig
-                        name_lower = name.lower()
-                        if 'brot' in name_lower or 'toast' in name_lower:
-                            factor = (amt * 30) / 100.0  # ~30g pro Brotscheibe
-                            st.write(f"      📏 {amt} Scheibe(n) Brot = ~{amt*30}g")
-                        elif 'käse' in name_lower or 'wurst' in name_lower:
-                            factor = (amt * 20) / 100.0  # ~20g pro Käse/Wurstscheibe
-                            st.write(f"      📏 {amt} Scheibe(n) = ~{amt*20}g")
-                        else:
-                            factor = (amt * 25) / 100.0  # Default ~25g
-                            st.write(f"      📏 {amt} Scheibe(n) = ~{amt*25}g")
-                    
-                    elif unit_lower in ['würfel']:
-                        name_lower = name.lower()
-                        if 'hefe' in name_lower:
-                            factor = (amt * 42) / 100.0  # ~42g pro Hefewürfel
-                            st.write(f"      📏 {amt} Würfel Hefe = ~{amt*42}g")
-                        else:
-                            factor = (amt * 10) / 100.0  # ~10g pro Würfel
-                            st.write(f"      📏 {amt} Würfel = ~{amt*10}g")
-                    
-                    elif unit_lower in ['riegel']:
-                        factor = (amt * 100) / 100.0  # ~100g pro Riegel
-                        st.write(f"      📏 {amt} Riegel = ~{amt*100}g")
-                    
-                    # Spezielle Lebensmittel-Formen
-                    elif unit_lower in ['blatt', 'blätter']:
-                        factor = (amt * 1) / 100.0  # ~1g pro Blatt (Basilikum etc)
-                        st.write(f"      📏 {amt} Blatt/Blätter = ~{amt*1}g")
-                    
-                    elif unit_lower in ['stange', 'stangen']:
-                        name_lower = name.lower()
-                        if 'lauch' in name_lower or 'porree' in name_lower:
-                            factor = (amt * 150) / 100.0  # ~150g pro Stange Lauch
-                            st.write(f"      📏 {amt} Stange(n) Lauch = ~{amt*150}g")
-                        elif 'stangensellerie' in name_lower or 'sellerie' in name_lower:
-                            factor = (amt * 40) / 100.0  # ~40g pro Selleriestange
-                            st.write(f"      📏 {amt} Stange(n) Sellerie = ~{amt*40}g")
-                        else:
-                            factor = (amt * 100) / 100.0
-                            st.write(f"      📏 {amt} Stange(n) = ~{amt*100}g")
-                    
-                    elif unit_lower in ['knolle', 'knollen']:
-                        name_lower = name.lower()
-                        if 'knoblauch' in name_lower:
-                            factor = (amt * 40) / 100.0  # ~40g pro Knoblauchknolle
-                            st.write(f"      📏 {amt} Knolle(n) Knoblauch = ~{amt*40}g")
-                        elif 'ingwer' in name_lower:
-                            factor = (amt * 50) / 100.0  # ~50g pro Ingwerknolle
-                            st.write(f"      📏 {amt} Knolle(n) Ingwer = ~{amt*50}g")
-                        else:
-                            factor = (amt * 100) / 100.0
-                            st.write(f"      📏 {amt} Knolle(n) = ~{amt*100}g")
-                    
-                    elif unit_lower in ['kopf', 'köpfe']:
-                        name_lower = name.lower()
-                        if 'salat' in name_lower:
-                            factor = (amt * 200) / 100.0  # ~200g pro Salatkopf
-                            st.write(f"      📏 {amt} Kopf Salat = ~{amt*200}g")
-                        elif 'kohl' in name_lower or 'blumenkohl' in name_lower:
-                            factor = (amt * 600) / 100.0  # ~600g pro Kohlkopf
-                            st.write(f"      📏 {amt} Kopf Kohl = ~{amt*600}g")
-                        else:
-                            factor = (amt * 300) / 100.0
-                            st.write(f"      📏 {amt} Kopf = ~{amt*300}g")
-                    
-                    # Regionale/Alte Maße
-                    elif unit_lower in ['pfund']:
-                        factor = (amt * 500) / 100.0  # 1 Pfund = 500g
-                        st.write(f"      📏 {amt} Pfund = {amt*500}g")
-                    elif unit_lower in ['oz', 'unze', 'unzen', 'ounce']:
-                        factor = (amt * 28.35) / 100.0  # 1oz ≈ 28.35g
-                        st.write(f"      📏 {amt} oz = ~{amt*28.35:.1f}g")
-                    elif unit_lower in ['lb', 'pound', 'pounds']:
-                        factor = (amt * 453.6) / 100.0  # 1lb ≈ 453.6g
-                        st.write(f"      📏 {amt} lb = ~{amt*453.6:.1f}g")
-                    
-                    # Stückzahlen - verwende realistische Schätzungen
-                    elif unit_lower in ['stück', 'stk', 'st', 'x', '']:
-                        # Schätze Gewicht basierend auf Zutat
-                        name_lower = name.lower()
-                        if 'kartoffel' in name_lower:
-                            factor = (amt * 150) / 100.0  # ~150g pro Kartoffel
-                            st.write(f"      📏 {amt} Kartoffel(n) = ~{amt*150}g")
-                        elif 'zwiebel' in name_lower:
-                            factor = (amt * 100) / 100.0  # ~100g pro Zwiebel
-                            st.write(f"      📏 {amt} Zwiebel(n) = ~{amt*100}g")
-                        elif 'knoblauch' in name_lower or 'zehe' in name_lower:
-                            factor = (amt * 5) / 100.0    # ~5g pro Knoblauchzehe
-                            st.write(f"      📏 {amt} Zehe(n) = ~{amt*5}g")
-                        elif 'tomate' in name_lower:
-                            factor = (amt * 150) / 100.0  # ~150g pro Tomate
-                            st.write(f"      📏 {amt} Tomate(n) = ~{amt*150}g")
-                        elif 'paprika' in name_lower:
-                            factor = (amt * 180) / 100.0  # ~180g pro Paprika
-                            st.write(f"      📏 {amt} Paprika = ~{amt*180}g")
-                        elif 'ei' in name_lower or 'eier' in name_lower:
-                            factor = (amt * 60) / 100.0   # ~60g pro Ei
-                            st.write(f"      📏 {amt} Ei(er) = ~{amt*60}g")
-                        else:
-                            # Fallback: Bei fehlender Einheit, nehme an dass Menge in Gramm ist
-                            factor = amt / 100.0
-                            st.write(f"      ⚠️ Einheit unklar '{unit}' - nehme {amt}g an")
-                    
-                    # Mengenangaben ohne Gewicht
-                    elif unit_lower in ['prise', 'etwas', 'nach geschmack', 'belieben']:
-                        factor = 0
-                    
-                    # Unbekannte Einheit
-                    else:
-                        factor = amt / 100.0
-                        st.write(f"      ⚠️ Unbekannte Einheit '{unit}' - nehme {amt}g an")
-                    
-                    # Berechne Nährwerte
-                    added = {
-                        "kcal": int(found_nutr["kcal"] * factor),
-                        "protein": int(found_nutr["protein"] * factor),
-                        "carbs": int(found_nutr["carbs"] * factor),
-                        "fat": int(found_nutr["fat"] * factor),
-                        "fiber": int(found_nutr["fiber"] * factor)
-                    }
-                    
-                    # Addiere zu Gesamt
-                    for key in total:
-                        total[key] += added[key]
-                    
-                    st.write(f"      → {added['kcal']} kcal, {added['protein']}g Protein, {added['carbs']}g KH, {added['fat']}g Fett")
-                else:
-                    # Nicht gefunden - verwende Durchschnittswert
-                    default_nutr = {"kcal": 50, "protein": 2, "carbs": 10, "fat": 1, "fiber": 1}
-                    factor = amt / 100.0
-                    added = {key: int(val * factor) for key, val in default_nutr.items()}
-                    for key in total:
-                        total[key] += added[key]
-                    st.write(f"    ⚠️ {amt}{unit} {name} → {added['kcal']} kcal (Schätzwert)")
+        result = compute_nutrition(ingredients, portions, StaticResolver(resolved))
         
-        # Berechne Nährwerte pro Portion
-        if portions > 1:
-            st.write(f"\n**📊 Gesamtrezept ({portions} Portionen):** {total['kcal']} kcal | {total['protein']}g Protein | {total['carbs']}g KH | {total['fat']}g Fett | {total['fiber']}g Ballaststoffe")
-            
-            # Teile durch Portionen für pro-Person-Werte
-            per_portion = {
-                "kcal": int(total['kcal'] / portions),
-                "protein": int(total['protein'] / portions),
-                "carbs": int(total['carbs'] / portions),
-                "fat": int(total['fat'] / portions),
-                "fiber": int(total['fiber'] / portions)
-            }
-            
-            st.success(f"**🎯 Pro Portion (1/{portions}):** {per_portion['kcal']} kcal | {per_portion['protein']}g Protein | {per_portion['carbs']}g KH | {per_portion['fat']}g Fett | {per_portion['fiber']}g Ballaststoffe")
-            return per_portion
-        else:
-            st.success(f"**🎯 Gesamt:** {total['kcal']} kcal | {total['protein']}g Protein | {total['carbs']}g KH | {total['fat']}g Fett | {total['fiber']}g Ballaststoffe")
-            return total
+        render_nutrition_trace(result)
+        hits = cache.hits - hits_before
+        misses = cache.misses - misses_before
+        st.caption(f"🗄️ Nährwert-Cache: {hits} Treffer, {misses} API-Abfragen")
+        return result.per_portion
         
     except Exception as e:
         st.error(f"Fehler bei der Nährwertberechnung: {str(e)}")
@@ -3351,7 +2965,7 @@ KRITISCH WICHTIG:
                 seo_data = generate_seo_metadata(recipe_to_save)
                 recipe_to_save["seo"] = seo_data
                 
-                all_recipes = load_recipes()
+                all_recipes = load_recipes(editable=True)
                 all_recipes.append(recipe_to_save)
                 if save_recipes(all_recipes, force_save=True):
                     st.success("✅ Rezept wurde erfolgreich gespeichert!")
@@ -3385,15 +2999,15 @@ KRITISCH WICHTIG:
 # Sicherstellen, dass session_state keys existieren
 if "preview_recipe" not in st.session_state:
     st.session_state["preview_recipe"] = None
-if "edit_index" not in st.session_state:
-    st.session_state["edit_index"] = None
+if "edit_recipe_id" not in st.session_state:
+    st.session_state["edit_recipe_id"] = None
 
 # NOTE: Saving now happens via the dedicated Save buttons inside the create/edit forms
 
 # === Modus: Rezept bearbeiten ===
 if mode == "Rezept bearbeiten":
     st.header("✏️ Rezept bearbeiten")
-    recipes = load_recipes()
+    recipes, positions = get_recipe_store().editable_with_positions()  # positions: ID → Position in recipes
     
     # Nutze gefilterte Rezepte wenn vorhanden
     display_recipes = st.session_state.get("filtered_recipes", recipes)
@@ -3404,46 +3018,41 @@ if mode == "Rezept bearbeiten":
         else:
             st.info("Keine Rezepte vorhanden. Lege zuerst ein neues Rezept an oder importiere eine recipes.json.")
     else:
-        # Zeige nur gefilterte Rezepte mit originalem Index
-        titles = []
-        recipe_map = {}  # Mapping von Titel zu Rezept
-        for r in display_recipes:
-            orig_idx = recipes.index(r) if r in recipes else -1
-            title = f"{orig_idx+1}. {r.get('title','(kein Titel)')}"
-            titles.append(title)
-            recipe_map[title] = r
+        # Zeige nur gefilterte Rezepte mit originalem Index (Auswahl über die ID)
+        display_ids = [r.get("id") for r in display_recipes if r.get("id") in positions]
         
-        # Bestimme Default-Auswahl (falls edit_index gesetzt)
+        # Bestimme Default-Auswahl (falls ein Rezept in Bearbeitung ist)
         default_index = 0  # "---"
-        
-        if "edit_index" in st.session_state and st.session_state["edit_index"] is not None:
+        current_id = st.session_state.get("edit_recipe_id")
+        if current_id in positions:
             try:
-                if 0 <= st.session_state["edit_index"] < len(recipes):
-                    # Finde den Titel des aktuell bearbeiteten Rezepts
-                    current_recipe = recipes[st.session_state["edit_index"]]
-                    
-                    # Finde den Index in display_recipes
-                    for i, r in enumerate(display_recipes):
-                        if r == current_recipe:
-                            default_index = i + 1  # +1 wegen "---" am Anfang
-                            break
-            except:
-                # Falls Fehler, reset
-                st.session_state["edit_index"] = None
+                default_index = display_ids.index(current_id) + 1  # +1 wegen "---" am Anfang
+            except ValueError:
+                pass  # vom Filter ausgeblendet
+        elif current_id is not None:
+            # Rezept existiert nicht mehr (gelöscht/extern geändert)
+            st.session_state["edit_recipe_id"] = None
+        
+        def edit_option_label(recipe_id):
+            if recipe_id == "---":
+                return recipe_id
+            return f"{positions[recipe_id]+1}. {recipes[positions[recipe_id]].get('title','(kein Titel)')}"
         
         # Selectbox OHNE key, damit default_index funktioniert
         sel = st.selectbox(
             "Wähle ein Rezept zum Bearbeiten", 
-            options=["---"] + titles, 
-            index=default_index
+            options=["---"] + display_ids, 
+            index=default_index,
+            format_func=edit_option_label
         )
         
         if sel != "---":
-            # Finde das Original-Rezept in der vollständigen Liste
-            selected_recipe = recipe_map[sel]
-            idx = recipes.index(selected_recipe)
-            st.session_state["edit_index"] = idx
-            r = recipes[idx]
+            # Original-Position über den ID-Index (kein Vergleich ganzer Rezepte)
+            recipe_id = sel
+            idx = positions[recipe_id]
+            st.session_state["edit_recipe_id"] = recipe_id
+            # Die Formulare ändern auch Zutaten/Schritte - nur dieses Rezept tief kopieren
+            r = recipes[idx] = copy.deepcopy(recipes[idx])
             
             # Aktionsbuttons: Duplizieren, Übersetzen & Löschen
             col_dup, col_translate, col_del = st.columns([1, 1, 1])
@@ -3454,6 +3063,7 @@ if mode == "Rezept bearbeiten":
                     new_recipe["title"] = r.get("title", "Rezept") + " (Kopie)"
                     
                     # Entferne IDs/Metadaten für neue Kopie
+                    new_recipe.pop("id", None)
                     new_recipe.pop("created_at", None)
                     new_recipe.pop("updated_at", None)
                     new_recipe.pop("version", None)
@@ -3475,13 +3085,13 @@ if mode == "Rezept bearbeiten":
             with col_del:
                 if st.button("🗑️ Rezept löschen", key="delete_recipe_edit"):
                     # Sicherheitsabfrage via session_state
-                    if st.session_state.get("confirm_delete") == idx:
+                    if st.session_state.get("confirm_delete") == recipe_id:
                         try:
                             recipes.pop(idx)
                             if save_recipes(recipes, force_save=True):
                                 st.success("✅ Rezept gelöscht!")
                                 st.session_state.pop("confirm_delete", None)
-                                st.session_state.pop("edit_index", None)
+                                st.session_state.pop("edit_recipe_id", None)
                                 time.sleep(1)
                                 safe_rerun()
                             else:
@@ -3490,7 +3100,7 @@ if mode == "Rezept bearbeiten":
                             st.error("❌ Fehler: Rezept-Index ungültig. Bitte Seite neu laden.")
                             st.session_state.pop("confirm_delete", None)
                     else:
-                        st.session_state["confirm_delete"] = idx
+                        st.session_state["confirm_delete"] = recipe_id
                         st.warning("⚠️ Nochmal klicken zum Bestätigen!")
 
             # Übersetzungs-Dialog
@@ -3562,6 +3172,7 @@ if mode == "Rezept bearbeiten":
                                 new_recipe['steps'] = translated_steps
                                 new_recipe['language'] = lang_code.lower()  # Sprach-Metadaten
                                 new_recipe['translation_source'] = r.get('title', '')  # Original-Titel
+                                new_recipe.pop('id', None)
                                 new_recipe.pop('created_at', None)
                                 new_recipe.pop('updated_at', None)
                                 new_recipe.pop('version', None)
@@ -3570,6 +3181,7 @@ if mode == "Rezept bearbeiten":
                                 recipes.append(new_recipe)
                                 if save_recipes(recipes, force_save=True):
                                     st.success(f"✅ '{translated_title}' ({lang_code}) wurde erstellt!")
+                                    st.caption(get_translation_memory().summary())
                                     st.session_state.pop('show_translate_options', None)
                                     time.sleep(1)
                                     safe_rerun()
@@ -3785,6 +3397,7 @@ ZUBEREITUNG:
                                         new_recipe["steps"] = parsed["steps"]
                                     
                                     # Entferne Metadaten für neues Rezept
+                                    new_recipe.pop("id", None)
                                     new_recipe.pop("created_at", None)
                                     new_recipe.pop("updated_at", None)
                                     new_recipe.pop("version", None)
@@ -3902,7 +3515,7 @@ ZUBEREITUNG:
             st.markdown("**Bild (optional)**")
             cols_img = st.columns([1,1])
             with cols_img[0]:
-                if r.get("image"):
+                if r.get("image") or resolve_image_path(r):
                     try:
                         st.markdown("**Aktuelles Bild:**")
                         img_src = get_image_display(r, width=200)
@@ -3947,8 +3560,8 @@ ZUBEREITUNG:
                                 r["ingredients"][gi]["items"][ji] = r["ingredients"][gi]["items"][ji-1]
                                 r["ingredients"][gi]["items"][ji-1] = temp
                                 if save_recipes(recipes, force_save=True):
-                                    # Wichtig: edit_index explizit setzen BEVOR rerun
-                                    st.session_state["edit_index"] = idx
+                                    # Wichtig: Auswahl (edit_recipe_id) explizit setzen BEVOR rerun
+                                    st.session_state["edit_recipe_id"] = recipe_id
                                     safe_rerun()
                     
                     with cols[1]:
@@ -3959,7 +3572,7 @@ ZUBEREITUNG:
                                 r["ingredients"][gi]["items"][ji] = r["ingredients"][gi]["items"][ji+1]
                                 r["ingredients"][gi]["items"][ji+1] = temp
                                 if save_recipes(recipes, force_save=True):
-                                    st.session_state["edit_index"] = idx
+                                    st.session_state["edit_recipe_id"] = recipe_id
                                     safe_rerun()
                     
                     with cols[2]:
@@ -4015,7 +3628,7 @@ ZUBEREITUNG:
                             r["steps"][si] = r["steps"][si-1]
                             r["steps"][si-1] = temp
                             if save_recipes(recipes, force_save=True):
-                                st.session_state["edit_index"] = idx
+                                st.session_state["edit_recipe_id"] = recipe_id
                                 safe_rerun()
                 
                 with col_down:
@@ -4025,7 +3638,7 @@ ZUBEREITUNG:
                             r["steps"][si] = r["steps"][si+1]
                             r["steps"][si+1] = temp
                             if save_recipes(recipes, force_save=True):
-                                st.session_state["edit_index"] = idx
+                                st.session_state["edit_recipe_id"] = recipe_id
                                 safe_rerun()
                 
                 with col_time:
@@ -4055,7 +3668,7 @@ ZUBEREITUNG:
                                 r["steps"][si]["needed"][ni] = r["steps"][si]["needed"][ni-1]
                                 r["steps"][si]["needed"][ni-1] = temp
                                 if save_recipes(recipes, force_save=True):
-                                    st.session_state["edit_index"] = idx
+                                    st.session_state["edit_recipe_id"] = recipe_id
                                     safe_rerun()
                     
                     with c_down:
@@ -4065,7 +3678,7 @@ ZUBEREITUNG:
                                 r["steps"][si]["needed"][ni] = r["steps"][si]["needed"][ni+1]
                                 r["steps"][si]["needed"][ni+1] = temp
                                 if save_recipes(recipes, force_save=True):
-                                    st.session_state["edit_index"] = idx
+                                    st.session_state["edit_recipe_id"] = recipe_id
                                     safe_rerun()
                     
                     with c1:
@@ -4118,7 +3731,7 @@ ZUBEREITUNG:
                                 r["steps"][si]["substeps"][subi] = r["steps"][si]["substeps"][subi-1]
                                 r["steps"][si]["substeps"][subi-1] = temp
                                 if save_recipes(recipes, force_save=True):
-                                    st.session_state["edit_index"] = idx
+                                    st.session_state["edit_recipe_id"] = recipe_id
                                     safe_rerun()
                     
                     with cols[1]:
@@ -4128,7 +3741,7 @@ ZUBEREITUNG:
                                 r["steps"][si]["substeps"][subi] = r["steps"][si]["substeps"][subi+1]
                                 r["steps"][si]["substeps"][subi+1] = temp
                                 if save_recipes(recipes, force_save=True):
-                                    st.session_state["edit_index"] = idx
+                                    st.session_state["edit_recipe_id"] = recipe_id
                                     safe_rerun()
                     
                     with cols[2]:
@@ -4192,7 +3805,7 @@ ZUBEREITUNG:
                         try:
                             r["steps"].pop(si)
                             if save_recipes(recipes, force_save=True):
-                                st.session_state["edit_index"] = idx
+                                st.session_state["edit_recipe_id"] = recipe_id
                                 safe_rerun()
                             else:
                                 st.error("❌ Speichern fehlgeschlagen - siehe Fehler oben")
@@ -4332,23 +3945,23 @@ ZUBEREITUNG:
             with colreset:
                 if st.button("↩️ Änderungen verwerfen"):
                     # Lade Rezepte neu um Original-Daten wiederherzustellen
-                    st.session_state["edit_index"] = idx  # Behalte Auswahl
+                    st.session_state["edit_recipe_id"] = recipe_id  # Behalte Auswahl
                     st.success("✅ Alle Änderungen wurden verworfen! Formular wird neu geladen...")
                     safe_rerun()
             
             with coldel:
                 # Delete current recipe (with confirmation)
-                if st.button("🗑️ Rezept löschen", key=f"del_req_{idx}"):
-                    st.session_state["confirm_delete"] = idx
-                if st.session_state.get("confirm_delete") == idx:
+                if st.button("🗑️ Rezept löschen", key=f"del_req_{recipe_id}"):
+                    st.session_state["confirm_delete"] = recipe_id
+                if st.session_state.get("confirm_delete") == recipe_id:
                     st.warning("Klicke nochmals zum Bestätigen des Löschens.")
-                    if st.button("Bestätige endgültiges Löschen", key=f"del_confirm_{idx}"):
+                    if st.button("Bestätige endgültiges Löschen", key=f"del_confirm_{recipe_id}"):
                         recipes.pop(idx)
                         if save_recipes(recipes, force_save=True):
                             st.success("✅ Rezept wurde gelöscht!")
                             # clear state and reload
                             st.session_state["confirm_delete"] = None
-                            st.session_state["edit_index"] = None
+                            st.session_state["edit_recipe_id"] = None
                             recipes = load_recipes()
                             safe_rerun()
                         else:
@@ -4356,7 +3969,7 @@ ZUBEREITUNG:
 # === Modus: Rezept löschen (mit Bulk-Operationen) ===
 if mode == "Rezept löschen":
     st.header("🗑️ Rezepte verwalten (Bulk-Operationen)")
-    recipes = load_recipes()
+    recipes, positions = get_recipe_store().editable_with_positions()  # positions: ID → Position in recipes
     
     # Nutze gefilterte Rezepte wenn vorhanden
     display_recipes = st.session_state.get("filtered_recipes", recipes)
@@ -4372,39 +3985,34 @@ if mode == "Rezept löschen":
         # "Alle auswählen" Checkbox
         select_all = st.checkbox("Alle auswählen/abwählen", key="select_all_bulk")
         
-        # Speichere Auswahl in session_state
+        # Speichere Auswahl (Rezept-IDs) in session_state
         if "bulk_selected" not in st.session_state:
             st.session_state["bulk_selected"] = set()
         
         if select_all:
             # Alle IDs hinzufügen
-            st.session_state["bulk_selected"] = set(range(len(recipes)))
+            st.session_state["bulk_selected"] = set(positions)
         
         # Zeige Rezepte mit Checkboxen
-        selected_indices = []
-        
-        for display_idx, recipe in enumerate(display_recipes):
-            # Finde Original-Index in der vollständigen Liste
-            try:
-                original_idx = recipes.index(recipe)
-            except ValueError:
-                # Falls Rezept nicht in Liste (sollte nicht passieren, aber sicher ist sicher)
-                original_idx = display_idx
+        for recipe in display_recipes:
+            recipe_id = recipe.get("id")
+            if recipe_id not in positions:
+                # Rezept nicht (mehr) im Katalog - z.B. veralteter Filter
+                continue
             
             col_check, col_title, col_cat, col_diff = st.columns([0.5, 4, 2, 1.5])
             
             with col_check:
                 is_selected = st.checkbox(
                     "",
-                    value=original_idx in st.session_state["bulk_selected"],
-                    key=f"bulk_check_{original_idx}",
+                    value=recipe_id in st.session_state["bulk_selected"],
+                    key=f"bulk_check_{recipe_id}",
                     label_visibility="collapsed"
                 )
                 if is_selected:
-                    st.session_state["bulk_selected"].add(original_idx)
-                    selected_indices.append(original_idx)
+                    st.session_state["bulk_selected"].add(recipe_id)
                 else:
-                    st.session_state["bulk_selected"].discard(original_idx)
+                    st.session_state["bulk_selected"].discard(recipe_id)
             
             with col_title:
                 st.write(f"**{recipe.get('title', '(kein Titel)')}**")
@@ -4424,22 +4032,16 @@ if mode == "Rezept löschen":
                 if st.button("🗑️ Ausgewählte löschen", type="primary"):
                     # Sicherheitsabfrage
                     if st.session_state.get("confirm_bulk_delete"):
-                        # Lösche in umgekehrter Reihenfolge (höchste Index zuerst)
-                        deleted_count = 0
-                        errors = 0
-                        for idx in sorted(st.session_state["bulk_selected"], reverse=True):
-                            try:
-                                if 0 <= idx < len(recipes):
-                                    recipes.pop(idx)
-                                    deleted_count += 1
-                                else:
-                                    errors += 1
-                            except IndexError:
-                                errors += 1
+                        # Ein Durchlauf über den Katalog statt pop() pro Index
+                        selected_ids = st.session_state["bulk_selected"]
+                        remaining = [recipe for recipe in recipes if recipe.get("id") not in selected_ids]
+                        deleted_count = len(recipes) - len(remaining)
+                        errors = len(selected_ids) - deleted_count
+                        recipes = remaining
                         
                         if save_recipes(recipes, force_save=True):
                             if errors > 0:
-                                st.warning(f"⚠️ {deleted_count} Rezepte gelöscht, {errors} Fehler (ungültige Indizes)")
+                                st.warning(f"⚠️ {deleted_count} Rezepte gelöscht, {errors} Fehler (Rezepte nicht mehr vorhanden)")
                             else:
                                 st.success(f"✅ {deleted_count} Rezepte gelöscht!")
                             st.session_state["bulk_selected"] = set()
@@ -4460,8 +4062,9 @@ if mode == "Rezept löschen":
                 )
                 
                 if new_category and st.button("✏️ Kategorie ändern"):
-                    for idx in st.session_state["bulk_selected"]:
-                        recipes[idx]["category"] = new_category
+                    for recipe_id in st.session_state["bulk_selected"]:
+                        if recipe_id in positions:
+                            recipes[positions[recipe_id]]["category"] = new_category
                     
                     if save_recipes(recipes, force_save=True):
                         st.success(f"✅ Kategorie für {len(st.session_state['bulk_selected'])} Rezepte geändert!")
@@ -4579,7 +4182,12 @@ if mode == "🏠 Startseiten-Rezepte":
     Jedes Rezept erscheint mit Bild, Titel, Untertitel und deinem Zusatztext auf der Startseite.
     """)
     
-    recipes = load_recipes()
+    recipes, positions = get_recipe_store().editable_with_positions()  # positions: ID → Position in recipes
+    
+    def featured_option_label(recipe_id):
+        if recipe_id is None:
+            return "(Nicht festlegen)"
+        return recipes[positions[recipe_id]].get('title', 'Unbenannt')
     
     if not recipes:
         st.warning("Noch keine Rezepte vorhanden. Erstelle zuerst ein Rezept!")
@@ -4635,15 +4243,15 @@ if mode == "🏠 Startseiten-Rezepte":
             st.markdown("---")
             
             # Neues auswählen
-            published = [(i, r) for i, r in enumerate(recipes) if r.get("published", True)]
+            published = [r["id"] for r in recipes if r.get("published", True) and r.get("id") in positions]
             
             if published:
-                options = ["(Nicht festlegen)"] + [f"{r.get('title', 'Unbenannt')}" for i, r in published]
-                selected = st.selectbox("Neues Rezept der Woche:", options, key="sel_week")
+                selected = st.selectbox("Neues Rezept der Woche:", [None] + published, key="sel_week",
+                                        format_func=featured_option_label)
                 
-                if selected != "(Nicht festlegen)":
-                    idx = options.index(selected) - 1
-                    actual_idx, recipe = published[idx]
+                if selected is not None:
+                    actual_idx = positions[selected]
+                    recipe = recipes[actual_idx]
                     
                     # Vorschau
                     col1, col2 = st.columns([1, 2])
@@ -4725,15 +4333,15 @@ if mode == "🏠 Startseiten-Rezepte":
             st.markdown("---")
             
             # Neues auswählen
-            published = [(i, r) for i, r in enumerate(recipes) if r.get("published", True)]
+            published = [r["id"] for r in recipes if r.get("published", True) and r.get("id") in positions]
             
             if published:
-                options = ["(Nicht festlegen)"] + [f"{r.get('title', 'Unbenannt')}" for i, r in published]
-                selected = st.selectbox("Neues Monatsrezept:", options, key="sel_month")
+                selected = st.selectbox("Neues Monatsrezept:", [None] + published, key="sel_month",
+                                        format_func=featured_option_label)
                 
-                if selected != "(Nicht festlegen)":
-                    idx = options.index(selected) - 1
-                    actual_idx, recipe = published[idx]
+                if selected is not None:
+                    actual_idx = positions[selected]
+                    recipe = recipes[actual_idx]
                     
                     # Vorschau
                     col1, col2 = st.columns([1, 2])
@@ -4815,15 +4423,15 @@ if mode == "🏠 Startseiten-Rezepte":
             st.markdown("---")
             
             # Neues auswählen
-            published = [(i, r) for i, r in enumerate(recipes) if r.get("published", True)]
+            published = [r["id"] for r in recipes if r.get("published", True) and r.get("id") in positions]
             
             if published:
-                options = ["(Nicht festlegen)"] + [f"{r.get('title', 'Unbenannt')}" for i, r in published]
-                selected = st.selectbox("Neues Jahreszeitrezept:", options, key="sel_season")
+                selected = st.selectbox("Neues Jahreszeitrezept:", [None] + published, key="sel_season",
+                                        format_func=featured_option_label)
                 
-                if selected != "(Nicht festlegen)":
-                    idx = options.index(selected) - 1
-                    actual_idx, recipe = published[idx]
+                if selected is not None:
+                    actual_idx = positions[selected]
+                    recipe = recipes[actual_idx]
                     
                     # Vorschau
                     col1, col2 = st.columns([1, 2])
@@ -5074,7 +4682,7 @@ if mode == "📋 Vorlagen verwalten":
                 st.info(f"📋 {len(categories)} Kategorie(n) verfügbar")
                 
                 # Zeige verwendete Kategorien in Rezepten
-                recipes = load_recipes()
+                recipes = load_recipes(editable=True)
                 used_categories = {}
                 for recipe in recipes:
                     cat = recipe.get("category", "")
@@ -5191,73 +4799,71 @@ if mode == "📋 Vorlagen verwalten":
 
 # === Dashboard / Statistiken ===
 st.sidebar.markdown("## 📊 Dashboard")
-recipes_count = len(recipes)
-st.sidebar.metric("Gesamt Rezepte", recipes_count)
-
-# Git Status anzeigen
-try:
-    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    git_status = subprocess.run(
-        ["git", "status", "--short", "admin/recipes.json", "admin/templates.json", "admin/categories.json"],
-        cwd=repo_root,
-        capture_output=True,
-        timeout=2,
-        text=True
+# Aggregate führt der Store beim Speichern nach - hier wird nur gelesen
+catalog_stats = get_recipe_store().stats()
+st.sidebar.metric("Gesamt Rezepte", catalog_stats.total)
+drafts = catalog_stats.counts("published").get(False, 0)
+if drafts:
+    st.sidebar.caption(f"📝 {drafts} Entwurf/Entwürfe (nicht veröffentlicht)")
+
+# Hintergrund-Jobs (Git-Commit / Sitemap)
+job_status = get_job_queue().status()
+job_labels = {"git_commit": "Git-Commit", "sitemap": "Sitemap"}
+if job_status["running"]:
+    st.sidebar.info(f"⚙️ Läuft: {job_labels.get(job_status['running'], job_status['running'])}")
+if job_status["pending"]:
+    pending = ", ".join(job_labels.get(name, name) for name in job_status["pending"])
+    st.sidebar.info(f"⏳ Geplant in {job_status['seconds_until_run']:.0f}s: {pending}")
+failed = [name for name, info in job_status["last_run"].items() if not info["ok"]]
+if failed:
+    st.sidebar.warning(f"⚠️ Hintergrund-Job fehlgeschlagen: {', '.join(job_labels.get(n, n) for n in failed)}")
+if job_status["coalesced"]:
+    st.sidebar.caption(f"🧺 {job_status['executed']} Jobs ausgeführt, {job_status['coalesced']} zusammengefasst")
+
+# Nährwert-Cache & Offline-DB
+offline_counts = get_local_nutrition_db().counts()
+offline_total = sum(n for source, n in offline_counts.items() if source != "builtin")
+if offline_total:
+    st.sidebar.caption(f"📦 Offline-Nährwert-DB: {offline_total} Lebensmittel")
+cache_stats = get_nutrition_cache().stats()
+if cache_stats["entries"]:
+    st.sidebar.caption(
+        f"🗄️ Nährwert-Cache: {cache_stats['entries']} Zutaten ({cache_stats['negatives']} ohne Treffer) · "
+        f"{cache_stats['hits']} Treffer / {cache_stats['misses']} Abfragen ({cache_stats['hit_rate']:.0f}%)"
     )
-    
-    if git_status.returncode == 0:
-        changes = git_status.stdout.strip()
-        if changes:
-            st.sidebar.warning(f"⚠️ Ungespeicherte Git-Änderungen")
-        else:
-            # Prüfe ob Commits vorhanden sind die noch nicht gepusht wurden
-            git_unpushed = subprocess.run(
-                ["git", "log", "@{u}..", "--oneline"],
-                cwd=repo_root,
-                capture_output=True,
-                timeout=2,
-                text=True
-            )
-            if git_unpushed.returncode == 0 and git_unpushed.stdout.strip():
-                unpushed_count = len(git_unpushed.stdout.strip().split("\n"))
-                st.sidebar.info(f"📤 {unpushed_count} Commit(s) bereit zum Push")
-            else:
-                st.sidebar.success("✅ Git: Alles synchronisiert")
-except:
-    pass  # Git-Status nicht kritisch
-
-# Kategorien-Verteilung
-if recipes_count > 0:
-    categories = {}
-    difficulties = {}
-    recent_recipe = None
-    recent_date = None
-    
-    for r in recipes:
-        # Kategorien zählen
-        cat = r.get("category", "Ohne Kategorie")
-        categories[cat] = categories.get(cat, 0) + 1
-        
-        # Schwierigkeit zählen
-        diff = r.get("difficulty", "Unbekannt")
-        difficulties[diff] = difficulties.get(diff, 0) + 1
-        
-        # Zuletzt bearbeitet finden
-        updated = r.get("updated_at") or r.get("created_at")
-        if updated:
-            if recent_date is None or updated > recent_date:
-                recent_date = updated
-                recent_recipe = r.get("title", "Unbekannt")
-    
+
+tm_stats = get_translation_memory().stats()
+if tm_stats["entries"]:
+    st.sidebar.caption(
+        f"🧠 Translation Memory: {tm_stats['entries']} Übersetzungen · "
+        f"{tm_stats['lifetime_characters_saved']:,} Zeichen gespart insgesamt"
+    )
+
+# Git Status anzeigen (letzter bekannter Stand, wird im Hintergrund aktualisiert)
+git_state = get_git_status().snapshot()
+if git_state["state"] == STATE_DIRTY:
+    st.sidebar.warning(f"⚠️ Ungespeicherte Git-Änderungen")
+elif git_state["state"] == STATE_UNPUSHED:
+    st.sidebar.info(f"📤 {git_state['unpushed']} Commit(s) bereit zum Push")
+elif git_state["state"] == STATE_CLEAN:
+    st.sidebar.success("✅ Git: Alles synchronisiert")
+if git_state["checked_at"] is not None and git_state["state"] != STATE_UNKNOWN:
+    checked = "wird aktualisiert…" if git_state["refreshing"] else f"Stand {git_state['checked_at'].strftime('%H:%M:%S')}"
+    st.sidebar.caption(f"🔄 Git-Status: {checked}")
+
+# Kategorien-Verteilung (ohne Durchlauf über alle Rezepte)
+if catalog_stats.total > 0:
     # Kategorien anzeigen
-    if categories:
+    top_categories = catalog_stats.top("category", 5)
+    if top_categories:
         st.sidebar.markdown("**📁 Kategorien:**")
-        for cat, count in sorted(categories.items(), key=lambda x: x[1], reverse=True)[:5]:
+        for cat, count in top_categories:
             st.sidebar.write(f"• {cat}: {count}")
     
     # Zuletzt bearbeitet
-    if recent_recipe:
-        st.sidebar.markdown(f"**🕒 Zuletzt:** {recent_recipe}")
+    recent = catalog_stats.most_recent()
+    if recent:
+        st.sidebar.markdown(f"**🕒 Zuletzt:** {recent[0]}")
 
 # === Suche & Filter ===
 st.sidebar.markdown("---")
@@ -5265,11 +4871,13 @@ st.sidebar.markdown("## 🔍 Suche & Filter")
 
 # Suchfeld
 search_query = st.sidebar.text_input("Suche nach Titel/Zutat", key="search_query", placeholder="z.B. Lasagne oder Tofu")
+search_ranked = st.sidebar.checkbox("Nach Relevanz sortieren", value=True, key="search_ranked",
+                                    disabled=not search_query.strip())
 
 # Filter
 filter_category = st.sidebar.selectbox(
     "Kategorie filtern",
-    ["Alle"] + sorted(list(set(r.get("category", "Ohne Kategorie") for r in recipes)))
+    ["Alle"] + catalog_stats.values("category")
 )
 
 filter_difficulty = st.sidebar.selectbox(
@@ -5278,36 +4886,34 @@ filter_difficulty = st.sidebar.selectbox(
 )
 
 # Funktion zum Filtern der Rezepte
-def filter_recipes(recipes, search="", category="Alle", difficulty="Alle"):
-    """Filtert Rezepte basierend auf Suchkriterien."""
-    filtered = recipes
-    
-    # Textsuche
-    if search and search.strip():
-        search_lower = search.lower().strip()
-        filtered = [r for r in filtered if 
-                   search_lower in r.get("title", "").lower() or
-                   search_lower in r.get("subtitle", "").lower() or
-                   any(search_lower in item.get("name", "").lower() 
-                       for group in r.get("ingredients", []) 
-                       for item in group.get("items", []))]
-    
-    # Kategorie-Filter
-    if category != "Alle":
-        filtered = [r for r in filtered if r.get("category") == category]
-    
-    # Schwierigkeit-Filter
-    if difficulty != "Alle":
-        filtered = [r for r in filtered if r.get("difficulty") == difficulty]
-    
-    return filtered
+def filter_recipes(search="", category="Alle", difficulty="Alle", rank=False):
+    """Filtert Rezepte über den Suchindex (Schnittmenge statt Scan aller Rezepte).
+    
+    Der Index wird pro Katalog-Stand einmal gebaut. Durchsucht werden Titel,
+    Untertitel, Zutaten, Tags und Tipps - auch Wortteile und ohne Umlaute.
+    
+    Args:
+        search: Suchtext
+        category, difficulty: "Alle" oder der gewünschte Wert
+        rank: Treffer nach Relevanz sortieren
+    
+    Returns:
+        Liste der passenden Rezepte (aus dem Store, nur lesen)
+    """
+    index = get_recipe_store().derived("search", RecipeSearchIndex)
+    return index.search(
+        search,
+        category=None if category == "Alle" else category,
+        difficulty=None if difficulty == "Alle" else difficulty,
+        rank=rank,
+    )
 
 # Speichere gefilterte Rezepte in session_state
 st.session_state["filtered_recipes"] = filter_recipes(
-    recipes, 
     search_query, 
     filter_category, 
-    filter_difficulty
+    filter_difficulty,
+    rank=search_ranked
 )
 
 # Zeige Anzahl gefilterter Rezepte
@@ -5346,39 +4952,79 @@ st.sidebar.markdown("---")
 st.sidebar.markdown("**🔧 Wartung**")
 
 # Version History / Restore
-script_dir = os.path.dirname(os.path.abspath(__file__))
-backup_dir = os.path.join(script_dir, "recipes_history")
-if os.path.exists(backup_dir):
-    backups = sorted([f for f in os.listdir(backup_dir) if f.startswith("recipes_")], reverse=True)
-    if backups:
-        with st.sidebar.expander("⏮️ Version History (Restore)"):
-            st.markdown("**Letzte 5 Backups:**")
-            for backup in backups[:5]:
-                # Parse Timestamp
-                timestamp_str = backup.replace("recipes_", "").replace(".json", "")
-                try:
-                    from datetime import datetime
-                    dt = datetime.strptime(timestamp_str, "%Y%m%d_%H%M%S")
-                    display_time = dt.strftime("%d.%m.%Y %H:%M")
-                except:
-                    display_time = timestamp_str
-                
-                col_info, col_restore = st.columns([3, 1])
-                with col_info:
-                    st.text(display_time)
-                with col_restore:
-                    if st.button("↩️", key=f"restore_{backup}"):
-                        # Restore Backup
-                        backup_path = os.path.join(backup_dir, backup)
-                        try:
-                            with open(backup_path, "r", encoding="utf-8") as f:
-                                restored_recipes = json.load(f)
-                            if save_recipes(restored_recipes):
-                                st.success(f"✅ Version von {display_time} wiederhergestellt!")
-                                time.sleep(1)
-                                st.rerun()
-                        except Exception as e:
-                            st.error(f"❌ Restore fehlgeschlagen: {e}")
+snapshots = list_snapshots()
+if snapshots:
+    with st.sidebar.expander("⏮️ Version History (Restore)"):
+        st.markdown(f"**{len(snapshots)} Wiederherstellungspunkte**")
+        
+        def format_snapshot(snap):
+            label = snap["created_at"].strftime("%d.%m.%Y %H:%M:%S")
+            return f"{label} (Vollkopie)" if snap["legacy"] else label
+        
+        selected_snapshot = st.selectbox(
+            "Version wählen",
+            snapshots,
+            format_func=format_snapshot,
+            key="history_snapshot"
+        )
+        
+        info = snapshot_info(selected_snapshot["id"])
+        if info["count"] is not None:
+            st.caption(f"📚 {info['count']} Rezepte · ✏️ {info['changed']} geändert")
+        
+        if st.button("↩️ Wiederherstellen", key="restore_snapshot"):
+            display_time = selected_snapshot["created_at"].strftime("%d.%m.%Y %H:%M")
+            try:
+                restored_recipes = load_snapshot(selected_snapshot["id"])
+                if save_recipes(restored_recipes):
+                    st.success(f"✅ Version von {display_time} wiederhergestellt!")
+                    time.sleep(1)
+                    st.rerun()
+            except Exception as e:
+                st.error(f"❌ Restore fehlgeschlagen: {e}")
+
+# Nährwerte aller Rezepte neu berechnen (z.B. nach Korrektur einer Dichte)
+with st.sidebar.expander("🧮 Nährwerte neu berechnen (alle)"):
+    recompute_offline = st.checkbox("Nur offline (keine APIs)", value=NUTRITION_OFFLINE, key="recompute_offline")
+    if st.button("🔍 Berechnen", key="recompute_nutrition"):
+        all_recipes = load_recipes()
+        names = [name for r in all_recipes for name, _, _ in recipe_items(r.get("ingredients", []))]
+        progress = st.progress(0.0)
+        session, limits = get_nutrition_http()
+        resolved = resolve_ingredients(
+            names, get_local_nutrition_db(), get_nutrition_cache(),
+            offline=recompute_offline, session=session, limits=limits,
+            on_progress=lambda done, total, name: progress.progress(done / total),
+        )
+        progress.empty()
+        # Nur die Unterschiede merken - übernommen wird in den dann aktuellen Katalog
+        st.session_state["nutrition_recompute"] = recompute_catalog(all_recipes, resolved)
+
+    pending_diffs = st.session_state.get("nutrition_recompute")
+    if pending_diffs is not None:
+        reliable = [diff for diff in pending_diffs if not diff["estimated"]]
+        skipped = [diff for diff in pending_diffs if diff["estimated"]]
+        if not pending_diffs:
+            st.success("✅ Alle Nährwerte sind aktuell")
+        if reliable:
+            st.caption(f"✏️ {len(reliable)} Rezept(e) ändern sich:")
+            for diff in reliable:
+                st.caption(format_diff(diff))
+        if skipped:
+            st.caption(f"⚠️ {len(skipped)} Rezept(e) bleiben unverändert (Zutat nur geschätzt):")
+            for diff in skipped:
+                st.caption(format_diff(diff))
+        if reliable and st.button("💾 Übernehmen", key="apply_recompute"):
+            all_recipes = load_recipes(editable=True)
+            applied = apply_diffs(all_recipes, pending_diffs)
+            if applied and save_recipes(all_recipes, force_save=True):
+                st.session_state.pop("nutrition_recompute", None)
+                st.success(f"✅ Nährwerte von {applied} Rezept(en) gespeichert!")
+                time.sleep(1)
+                st.rerun()
+            elif not applied:
+                st.session_state.pop("nutrition_recompute", None)
+                st.warning("⚠️ Inzwischen bearbeitet - bitte neu berechnen")
 
 if st.sidebar.button("🔄 Auf Updates prüfen"):
     st.session_state.pop('update_check_done', None)  # Erlaube neue Prüfung
@@ -5418,6 +5064,19 @@ if mode == "📸 Bilder verwalten":
         else:
             st.success(f"✅ {len(recipe_images)} Bild(er) in Rezepten")
             
+            # Einmalige Migration aller Base64-Bilder in den Bildspeicher
+            base64_count = sum(1 for img in recipe_images if img['image_type'] == 'base64')
+            if base64_count:
+                st.warning(f"⚠️ {base64_count} Bild(er) liegen noch als Base64 in recipes.json")
+                if st.button("🗃️ Alle Base64-Bilder als WebP auslagern", key="migrate_base64_images"):
+                    with st.spinner("Lagere Bilder aus..."):
+                        all_recipes = load_recipes(editable=True)
+                        migrated = migrate_inline_images_to_files(all_recipes)
+                        if migrated and save_recipes(all_recipes, force_save=True):
+                            st.success(f"✅ {migrated} Bild(er) ausgelagert!")
+                            time.sleep(1)
+                            safe_rerun()
+            
             # Suche
             search_recipe = st.text_input("🔍 Suche nach Rezeptname", placeholder="z.B. Käsespätzle", key="search_recipe")
             
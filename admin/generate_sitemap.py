@@ -2,12 +2,26 @@
 """
 Sitemap Generator für vegantalia.de
 Generiert sitemap.xml aus recipes.json
+
+    python generate_sitemap.py          → public/sitemap.xml
+    python generate_sitemap.py --index  → public/sitemap-index.xml + sitemap-{lang}-N.xml.gz
+
+Der Index ist nur auf Anfrage (--index) gedacht: solange das Frontend keine
+Sprach-Routen hat (LANGUAGE_ROUTES leer), enthält er dieselben deutschen
+URLs wie sitemap.xml - nur gesplittet und komprimiert.
 """
 
+import gzip
 import json
 import os
+import re
 from datetime import datetime
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+from atomic_io import atomic_write_bytes
 
 def generate_slug(title: str) -> str:
     """Erstellt URL-freundlichen Slug aus Titel"""
@@ -20,33 +34,98 @@ def generate_slug(title: str) -> str:
     for old, new in replacements.items():
         slug = slug.replace(old, new)
     
-    # Nur a-z, 0-9 und Bindestriche
-    slug = ''.join(c if c.isalnum() else '-' for c in slug)
-    slug = '-'.join(filter(None, slug.split('-')))  # Doppelte Bindestriche entfernen
+    # Nur a-z, 0-9 und Bindestriche - wie das Frontend (/[^a-z0-9]+/g),
+    # sonst zeigen Slugs mit é, ç oder nicht-lateinischer Schrift ins Leere
+    slug = re.sub(r'[^a-z0-9]+', '-', slug)
     
-    return slug
+    return slug.strip('-')
 
-def generate_sitemap(base_url: str = "https://vegantalia.de"):
-    """Generiert sitemap.xml"""
-    
-    # Lade Rezepte
-    recipes_path = Path(__file__).parent / "recipes.json"
-    
-    if not recipes_path.exists():
-        print(f"❌ recipes.json nicht gefunden: {recipes_path}")
-        return False
-    
-    with open(recipes_path, 'r', encoding='utf-8') as f:
-        recipes = json.load(f)
+# Statische Seiten
+STATIC_PAGES = [
+    {"loc": "/", "priority": "1.0", "changefreq": "daily"},
+    {"loc": "/rezepte", "priority": "0.9", "changefreq": "daily"},
+    {"loc": "/ueber-mich", "priority": "0.7", "changefreq": "monthly"},
+    {"loc": "/kontakt", "priority": "0.6", "changefreq": "monthly"},
+    {"loc": "/impressum", "priority": "0.5", "changefreq": "yearly"},
+]
+
+SITEMAP_PATH = Path(__file__).parent.parent / "public" / "sitemap.xml"
+
+# Ein <url>-Block inkl. Einrückung, so wie er in die Datei geschrieben wird
+URL_BLOCK_PATTERN = re.compile(
+    r"  <url>\n    <loc>(?P<loc>[^<]*)</loc>\n(?:    <lastmod>(?P<lastmod>[^<]*)</lastmod>\n)?.*?  </url>",
+    re.DOTALL
+)
+
+def render_url(loc: str, changefreq: str, priority: str, lastmod: Optional[str] = None) -> str:
+    """Rendert einen <url>-Block."""
+    lines = ['  <url>', f'    <loc>{loc}</loc>']
+    if lastmod:
+        lines.append(f'    <lastmod>{lastmod}</lastmod>')
+    lines.append(f'    <changefreq>{changefreq}</changefreq>')
+    lines.append(f'    <priority>{priority}</priority>')
+    lines.append('  </url>')
+    return '\n'.join(lines)
+
+def read_existing_entries(sitemap_path: Path) -> Dict[str, Tuple[Optional[str], str]]:
+    """Liest die <url>-Blöcke einer bestehenden Sitemap.
+
+    Returns:
+        Dict loc → (lastmod, unveränderter Block-Text)
+    """
+    if not sitemap_path.exists():
+        return {}
+    try:
+        content = sitemap_path.read_text(encoding='utf-8')
+    except Exception:
+        return {}
+    return {
+        m.group('loc'): (m.group('lastmod'), m.group(0))
+        for m in URL_BLOCK_PATTERN.finditer(content)
+    }
+
+def recipe_lastmod(recipe: dict) -> Optional[str]:
+    """Datum der letzten Änderung als YYYY-MM-DD (None wenn unbekannt)."""
+    updated_at = recipe.get('updated_at') or recipe.get('created_at')
+    if not updated_at:
+        return None
+    try:
+        date_obj = datetime.fromisoformat(updated_at.replace('Z', '+00:00'))
+        return date_obj.strftime('%Y-%m-%d')
+    except Exception:
+        return None
+
+def generate_sitemap(recipes: Optional[List[dict]] = None,
+                     base_url: str = "https://vegantalia.de",
+                     sitemap_path: Path = SITEMAP_PATH) -> bool:
+    """Generiert sitemap.xml (inkrementell).
+
+    Kann direkt aus dem Admin mit der Rezeptliste im Speicher aufgerufen werden.
+    Unveränderte <url>-Einträge werden byte-genau aus der bestehenden Sitemap
+    übernommen; nur Einträge mit neuem Slug oder neuem lastmod werden neu
+    gerendert. Sind die Bytes am Ende identisch, wird gar nicht geschrieben
+    (kein unnötiger Git-Diff).
+
+    Args:
+        recipes: Rezeptliste; None = recipes.json laden
+        base_url: Basis-URL der Website
+        sitemap_path: Zieldatei
+
+    Returns:
+        bool: True bei Erfolg
+    """
+    if recipes is None:
+        recipes_path = Path(__file__).parent / "recipes.json"
+        
+        if not recipes_path.exists():
+            print(f"❌ recipes.json nicht gefunden: {recipes_path}")
+            return False
+        
+        with open(recipes_path, 'r', encoding='utf-8') as f:
+            recipes = json.load(f)
     
-    # Statische Seiten
-    static_pages = [
-        {"loc": "/", "priority": "1.0", "changefreq": "daily"},
-        {"loc": "/rezepte", "priority": "0.9", "changefreq": "daily"},
-        {"loc": "/ueber-mich", "priority": "0.7", "changefreq": "monthly"},
-        {"loc": "/kontakt", "priority": "0.6", "changefreq": "monthly"},
-        {"loc": "/impressum", "priority": "0.5", "changefreq": "yearly"},
-    ]
+    existing = read_existing_entries(sitemap_path)
+    today = datetime.now().strftime('%Y-%m-%d')
     
     # XML Header
     xml_lines = [
@@ -55,49 +134,259 @@ def generate_sitemap(base_url: str = "https://vegantalia.de"):
     ]
     
     # Statische Seiten hinzufügen
-    for page in static_pages:
-        xml_lines.append('  <url>')
-        xml_lines.append(f'    <loc>{base_url}{page["loc"]}</loc>')
-        xml_lines.append(f'    <changefreq>{page["changefreq"]}</changefreq>')
-        xml_lines.append(f'    <priority>{page["priority"]}</priority>')
-        xml_lines.append('  </url>')
+    for page in STATIC_PAGES:
+        xml_lines.append(render_url(f'{base_url}{page["loc"]}', page["changefreq"], page["priority"]))
     
     # Rezept-Seiten hinzufügen
+    recipe_count = 0
+    rendered = 0
     for recipe in recipes:
-        title = recipe.get('title', '')
-        if not title:
+        slug = generate_slug(recipe.get('title', ''))
+        if not slug:
             continue
         
-        slug = generate_slug(title)
-        updated_at = recipe.get('updated_at', recipe.get('created_at', datetime.now().isoformat()))
+        loc = f'{base_url}/rezept/{slug}'
+        previous = existing.get(loc)
         
-        # ISO-Datum zu YYYY-MM-DD konvertieren
-        try:
-            date_obj = datetime.fromisoformat(updated_at.replace('Z', '+00:00'))
-            lastmod = date_obj.strftime('%Y-%m-%d')
-        except:
-            lastmod = datetime.now().strftime('%Y-%m-%d')
+        # Ohne Zeitstempel: bisheriges lastmod behalten statt täglich "heute"
+        lastmod = recipe_lastmod(recipe) or (previous[0] if previous and previous[0] else today)
         
-        xml_lines.append('  <url>')
-        xml_lines.append(f'    <loc>{base_url}/rezept/{slug}</loc>')
-        xml_lines.append(f'    <lastmod>{lastmod}</lastmod>')
-        xml_lines.append(f'    <changefreq>weekly</changefreq>')
-        xml_lines.append(f'    <priority>0.8</priority>')
-        xml_lines.append('  </url>')
+        if previous and previous[0] == lastmod:
+            xml_lines.append(previous[1])  # Unverändert übernehmen
+        else:
+            xml_lines.append(render_url(loc, 'weekly', '0.8', lastmod))
+            rendered += 1
+        recipe_count += 1
     
     xml_lines.append('</urlset>')
     
+    data = '\n'.join(xml_lines).encode('utf-8')
+    
+    # Nichts geändert → nicht schreiben
+    if sitemap_path.exists() and sitemap_path.read_bytes() == data:
+        print(f"♻️ Sitemap unverändert: {sitemap_path}")
+        return True
+    
     # Sitemap schreiben
-    sitemap_path = Path(__file__).parent.parent / "public" / "sitemap.xml"
     sitemap_path.parent.mkdir(exist_ok=True)
-    
-    with open(sitemap_path, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(xml_lines))
+    atomic_write_bytes(str(sitemap_path), data, fsync=False)
     
     print(f"✅ Sitemap generiert: {sitemap_path}")
-    print(f"📊 {len(static_pages)} statische Seiten + {len(recipes)} Rezepte = {len(static_pages) + len(recipes)} URLs")
+    print(f"📊 {len(STATIC_PAGES)} statische Seiten + {recipe_count} Rezepte = {len(STATIC_PAGES) + recipe_count} URLs ({rendered} neu/geändert)")
+    
+    return True
+
+# ====== Mehrsprachiger Sitemap-Index ======
+DEFAULT_LANGUAGE = "de"
+# Sprache → Pfad-Präfix, unter dem das Frontend die Seiten in dieser Sprache
+# ausliefert (z.B. "en": "/en"). Derzeit wählt die SPA die Sprache nur
+# clientseitig und kennt keine Sprach-Route - deshalb leer: es gibt nur die
+# deutschen URLs und keine hreflang-Alternativen. Übersetzte Slugs oder
+# ?lang=xx routet das Frontend nicht.
+LANGUAGE_ROUTES: Dict[str, str] = {}
+MAX_URLS_PER_SITEMAP = 50000  # Limit des Sitemap-Protokolls
+SITEMAP_OUTPUT_DIR = Path(__file__).parent.parent / "public"
+SITEMAP_INDEX_NAME = "sitemap-index.xml"
+
+def language_url(base_url: str, path: str, lang: str) -> str:
+    """URL einer Seite in einer Sprache (Deutsch ohne Präfix)."""
+    return f"{base_url}{LANGUAGE_ROUTES.get(lang, '')}{quote(path)}"
+
+def _load_recipe_heads(json_path: Path) -> List[dict]:
+    """Lädt nur die Felder, die die Sitemap braucht (Bilder etc. werden verworfen)."""
+    with open(json_path, 'r', encoding='utf-8') as f:
+        recipes = json.load(f)
+    return [
+        {key: r.get(key) for key in ("title", "updated_at", "created_at")}
+        for r in recipes
+    ]
+
+def collect_pages(admin_dir: Path = Path(__file__).parent) -> Tuple[List[dict], List[str]]:
+    """Sammelt alle Seiten mit ihren Sprachvarianten.
+
+    Jede Sprachvariante nutzt den deutschen Slug - das Frontend löst Rezepte
+    nur darüber auf; die Sprache steckt allein im Präfix aus LANGUAGE_ROUTES.
+
+    Returns:
+        Tuple (pages, languages) - jede Page ist
+        {"changefreq", "priority", "variants": {lang: (path, lastmod)}}
+    """
+    base = _load_recipe_heads(admin_dir / "recipes.json")
+    languages = [DEFAULT_LANGUAGE] + [lang for lang in LANGUAGE_ROUTES if lang != DEFAULT_LANGUAGE]
+    
+    pages = []
+    for page in STATIC_PAGES:
+        pages.append({
+            "changefreq": page["changefreq"],
+            "priority": page["priority"],
+            "variants": {lang: (page["loc"], None) for lang in languages},
+        })
+    
+    for recipe in base:
+        slug = generate_slug(recipe.get("title") or "")
+        if not slug:
+            continue
+        lastmod = recipe_lastmod(recipe)
+        path = f"/rezept/{slug}"
+        pages.append({
+            "changefreq": "weekly",
+            "priority": "0.8",
+            "variants": {lang: (path, lastmod) for lang in languages},
+        })
+    
+    return pages, languages
+
+def render_alternate_url(base_url: str, page: dict, lang: str) -> Tuple[str, Optional[str]]:
+    """Rendert einen <url>-Block, bei mehreren Sprachen mit xhtml:link hreflang-Alternativen."""
+    path, lastmod = page["variants"][lang]
+    lines = ['  <url>', f'    <loc>{escape(language_url(base_url, path, lang))}</loc>']
+    if lastmod:
+        lines.append(f'    <lastmod>{lastmod}</lastmod>')
+    if len(page["variants"]) > 1:
+        for alt_lang, (alt_path, _) in page["variants"].items():
+            href = escape(language_url(base_url, alt_path, alt_lang))
+            lines.append(f'    <xhtml:link rel="alternate" hreflang="{alt_lang}" href="{href}"/>')
+        if DEFAULT_LANGUAGE in page["variants"]:
+            href = escape(language_url(base_url, page["variants"][DEFAULT_LANGUAGE][0], DEFAULT_LANGUAGE))
+            lines.append(f'    <xhtml:link rel="alternate" hreflang="x-default" href="{href}"/>')
+    lines.append(f'    <changefreq>{page["changefreq"]}</changefreq>')
+    lines.append(f'    <priority>{page["priority"]}</priority>')
+    lines.append('  </url>')
+    return '\n'.join(lines), lastmod
+
+class ShardWriter:
+    """Schreibt <url>-Blöcke direkt auf die Platte und beginnt beim
+    URL-Limit automatisch eine neue Datei (sitemap-de-1.xml.gz, -2, ...)."""
+    
+    HEADER = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+              '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" '
+              'xmlns:xhtml="http://www.w3.org/1999/xhtml">\n')
+    FOOTER = '</urlset>\n'
+    
+    def __init__(self, output_dir: Path, prefix: str, max_urls: int = MAX_URLS_PER_SITEMAP, compress: bool = True):
+        self.output_dir = output_dir
+        self.prefix = prefix
+        self.max_urls = max_urls
+        self.compress = compress
+        self.shards: List[Tuple[str, Optional[str]]] = []  # (Dateiname, lastmod)
+        self._file = None
+        self._raw = None
+        self._count = 0
+        self._lastmod = None
+    
+    def _open(self) -> None:
+        suffix = ".xml.gz" if self.compress else ".xml"
+        self._name = f"{self.prefix}-{len(self.shards) + 1}{suffix}"
+        self._tmp_path = self.output_dir / f".{self._name}.tmp"
+        self._raw = open(self._tmp_path, 'wb')
+        # mtime=0: gleiche Inhalte ergeben gleiche Bytes (kein Git-Diff)
+        self._file = gzip.GzipFile(filename='', mode='wb', fileobj=self._raw, mtime=0) if self.compress else self._raw
+        self._file.write(self.HEADER.encode('utf-8'))
+        self._count = 0
+        self._lastmod = None
+    
+    def write(self, block: str, lastmod: Optional[str] = None) -> None:
+        if self._file is None or self._count >= self.max_urls:
+            self._finish()
+            self._open()
+        self._file.write(block.encode('utf-8'))
+        self._file.write(b'\n')
+        self._count += 1
+        if lastmod and (self._lastmod is None or lastmod > self._lastmod):
+            self._lastmod = lastmod
+    
+    def _finish(self) -> None:
+        if self._file is None:
+            return
+        self._file.write(self.FOOTER.encode('utf-8'))
+        if self.compress:
+            self._file.close()
+        self._raw.close()
+        
+        target = self.output_dir / self._name
+        if target.exists() and target.read_bytes() == self._tmp_path.read_bytes():
+            self._tmp_path.unlink()  # Unverändert → nicht ersetzen
+        else:
+            os.replace(self._tmp_path, target)
+        self.shards.append((self._name, self._lastmod))
+        self._file = None
+    
+    def close(self) -> List[Tuple[str, Optional[str]]]:
+        self._finish()
+        return self.shards
+
+def generate_sitemap_index(base_url: str = "https://vegantalia.de",
+                           output_dir: Path = SITEMAP_OUTPUT_DIR,
+                           max_urls: int = MAX_URLS_PER_SITEMAP,
+                           compress: bool = True) -> bool:
+    """Generiert pro gerouteter Sprache eine (ggf. gesplittete) Sitemap -
+    bei mehreren Sprachen mit hreflang-Alternativen - und einen
+    Sitemap-Index darüber.
+
+    Die <url>-Blöcke werden direkt in die (gzip-)Dateien gestreamt, statt
+    die ganze Sitemap als Liste im Speicher aufzubauen.
+
+    Args:
+        base_url: Basis-URL der Website
+        output_dir: Zielordner (public/)
+        max_urls: URLs pro Datei (Protokoll-Limit 50.000)
+        compress: .xml.gz statt .xml schreiben
+
+    Returns:
+        bool: True bei Erfolg
+    """
+    if not (Path(__file__).parent / "recipes.json").exists():
+        print("❌ recipes.json nicht gefunden")
+        return False
+    
+    pages, languages = collect_pages()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    index_entries = []
+    for lang in languages:
+        writer = ShardWriter(output_dir, f"sitemap-{lang}", max_urls, compress)
+        url_count = 0
+        for page in pages:
+            if lang not in page["variants"]:
+                continue
+            block, lastmod = render_alternate_url(base_url, page, lang)
+            writer.write(block, lastmod)
+            url_count += 1
+        shards = writer.close()
+        index_entries.extend(shards)
+        
+        print(f"  🌐 {lang}: {url_count} URLs in {len(shards)} Datei(en)")
+    
+    # Veraltete Shards (geschrumpfter Katalog, nicht mehr geroutete Sprache) entfernen
+    current = {name for name, _ in index_entries}
+    for stale in output_dir.glob("sitemap-*-*.xml*"):
+        if stale.name not in current:
+            stale.unlink()
+    
+    # Sitemap-Index
+    index_lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+    ]
+    for name, lastmod in index_entries:
+        index_lines.append('  <sitemap>')
+        index_lines.append(f'    <loc>{base_url}/{name}</loc>')
+        if lastmod:
+            index_lines.append(f'    <lastmod>{lastmod}</lastmod>')
+        index_lines.append('  </sitemap>')
+    index_lines.append('</sitemapindex>')
+    
+    index_path = output_dir / SITEMAP_INDEX_NAME
+    data = '\n'.join(index_lines).encode('utf-8')
+    if not (index_path.exists() and index_path.read_bytes() == data):
+        atomic_write_bytes(str(index_path), data, fsync=False)
     
+    print(f"✅ Sitemap-Index generiert: {index_path} ({len(index_entries)} Sitemaps, {len(languages)} Sprachen)")
     return True
 
 if __name__ == "__main__":
-    generate_sitemap()
+    import sys
+    if "--index" in sys.argv:
+        generate_sitemap_index()
+    else:
+        generate_sitemap()
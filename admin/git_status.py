@@ -0,0 +1,101 @@
+"""
+Git-Status für die Sidebar, im Hintergrund ermittelt
+
+Bisher liefen bei jedem Rerun (= jeder Klick) `git status` und `git log`
+blockierend mit je 2 s Timeout. GitStatusPoller fragt Git stattdessen in
+einem eigenen Thread ab - regelmäßig und sofort nach invalidate() (eigene
+Saves und Commits). Die Sidebar zeigt nur den zuletzt bekannten Stand.
+"""
+
+import subprocess
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence
+
+GIT_TIMEOUT = 2            # Sekunden pro Git-Aufruf
+POLL_INTERVAL = 30.0       # Sekunden zwischen zwei Abfragen ohne Anlass
+
+STATE_UNKNOWN = "unknown"    # noch nicht geprüft oder Git nicht verfügbar
+STATE_DIRTY = "dirty"        # Änderungen noch nicht committet
+STATE_UNPUSHED = "unpushed"  # Commits noch nicht gepusht
+STATE_CLEAN = "clean"
+
+
+def read_git_status(repo_root: str, paths: Sequence[str]) -> Dict[str, Any]:
+    """Fragt Git einmal ab (blockierend - nur im Hintergrund aufrufen).
+
+    Returns:
+        dict mit state, unpushed (Anzahl Commits) und error
+    """
+    try:
+        status = subprocess.run(
+            ["git", "status", "--short", *paths],
+            cwd=repo_root, capture_output=True, timeout=GIT_TIMEOUT, text=True,
+        )
+        if status.returncode != 0:
+            return {"state": STATE_UNKNOWN, "unpushed": 0, "error": status.stderr.strip()}
+        if status.stdout.strip():
+            return {"state": STATE_DIRTY, "unpushed": 0, "error": None}
+
+        # Prüfe ob Commits vorhanden sind die noch nicht gepusht wurden
+        unpushed = subprocess.run(
+            ["git", "log", "@{u}..", "--oneline"],
+            cwd=repo_root, capture_output=True, timeout=GIT_TIMEOUT, text=True,
+        )
+        if unpushed.returncode == 0 and unpushed.stdout.strip():
+            count = len(unpushed.stdout.strip().split("\n"))
+            return {"state": STATE_UNPUSHED, "unpushed": count, "error": None}
+        return {"state": STATE_CLEAN, "unpushed": 0, "error": None}
+    except (OSError, subprocess.SubprocessError) as e:
+        return {"state": STATE_UNKNOWN, "unpushed": 0, "error": str(e)}
+
+
+class GitStatusPoller:
+    """Hält den zuletzt bekannten Git-Status aktuell (thread-safe)."""
+
+    def __init__(self, repo_root: str, paths: Sequence[str], interval: float = POLL_INTERVAL):
+        """
+        Args:
+            repo_root: Projekt-Root (enthält .git)
+            paths: Dateien, deren Status interessiert
+            interval: Sekunden zwischen zwei Abfragen ohne invalidate()
+        """
+        self.repo_root = repo_root
+        self.paths = list(paths)
+        self.interval = interval
+        self.checks = 0
+        self._status: Dict[str, Any] = {"state": STATE_UNKNOWN, "unpushed": 0, "error": None}
+        self._checked_at: Optional[datetime] = None
+        self._checking = False  # read_git_status() läuft gerade
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="admin-git-status", daemon=True)
+        self._worker.start()
+
+    def invalidate(self) -> None:
+        """Stand ist veraltet (z.B. nach Speichern oder Commit) - sofort neu abfragen."""
+        self._wake.set()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Zuletzt bekannter Stand, ohne zu warten.
+
+        Returns:
+            dict mit state, unpushed, error, checked_at (datetime oder None) und refreshing
+            (Abfrage läuft oder steht an - der Stand ist dann womöglich veraltet)
+        """
+        with self._lock:
+            refreshing = self._checking or self._wake.is_set()
+            return {**self._status, "checked_at": self._checked_at, "refreshing": refreshing}
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                self._checking = True
+                self._wake.clear()
+            status = read_git_status(self.repo_root, self.paths)
+            with self._lock:
+                self._checking = False
+                self._status = status
+                self._checked_at = datetime.now()
+                self.checks += 1
+            self._wake.wait(timeout=self.interval)
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Content-adressierter Bildspeicher für Rezeptbilder.
+
+Bilder werden genau einmal unter public/recipe-images/<hash>.<ext> abgelegt.
+In recipes.json (und damit in recipes_history/ und recipes_{lang}.json) steht
+danach nur noch die Referenz (image_filename / image_url) statt Base64.
+
+Einmalige Migration bestehender Base64-Bilder:
+    python image_store.py
+"""
+
+import base64
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Projekt-Root ist eins über admin/
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMAGES_DIR = os.path.join(PROJECT_ROOT, "public", "recipe-images")
+IMAGES_URL_PREFIX = "/recipe-images/"
+HASH_LENGTH = 16  # Hex-Zeichen des SHA-256 im Dateinamen
+
+# Speicher-Modi für Rezeptbilder
+STORAGE_INLINE = "inline"  # Base64 direkt in recipes.json (bisheriges Verhalten)
+STORAGE_FILES = "files"    # Content-adressierte Dateien in public/recipe-images/
+
+MIME_EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/jpg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+    "image/gif": "gif",
+}
+
+
+def get_storage_mode() -> str:
+    """Liest den Bild-Speichermodus aus IMAGE_STORAGE_MODE (.env).
+
+    Returns:
+        str: STORAGE_FILES oder STORAGE_INLINE (Default)
+    """
+    mode = os.environ.get("IMAGE_STORAGE_MODE", STORAGE_INLINE).strip().lower()
+    return STORAGE_FILES if mode == STORAGE_FILES else STORAGE_INLINE
+
+
+def is_inline_image(value) -> bool:
+    """Prüft ob ein image-Feld Base64-Daten (mit oder ohne data:-Präfix) enthält."""
+    if not isinstance(value, str) or not value.strip():
+        return False
+    if value.startswith("data:image"):
+        return True
+    # Referenzen (URLs, Pfade, Dateinamen) sind kurz - Base64-Bilder nicht
+    return len(value) > 256 and not value.startswith(("http", "/"))
+
+
+def split_data_url(image_data: str) -> Tuple[Optional[str], str]:
+    """Trennt eine data:-URL in MIME-Typ und Base64-Nutzdaten.
+
+    Returns:
+        Tuple (mime_type oder None, base64_string)
+    """
+    if image_data.startswith("data:") and "," in image_data:
+        header, payload = image_data.split(",", 1)
+        mime = header[5:].split(";", 1)[0].lower() or None
+        return mime, payload
+    return None, image_data
+
+
+def guess_extension(data: bytes) -> str:
+    """Erkennt das Bildformat anhand der Magic Bytes."""
+    if data.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    if data.startswith(b"\x89PNG"):
+        return "png"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    return "jpg"
+
+
+def content_filename(data: bytes, ext: str) -> str:
+    """Dateiname aus dem Inhalts-Hash, z.B. '3f2a9c0d1e4b5a6f.webp'."""
+    digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+    return f"{digest}.{ext.lstrip('.').lower()}"
+
+
+def store_image_bytes(data: bytes, ext: Optional[str] = None, images_dir: str = IMAGES_DIR) -> str:
+    """Legt Bildbytes content-adressiert ab (identische Bilder nur einmal).
+
+    Args:
+        data: Rohdaten des Bildes
+        ext: Dateiendung (ohne Punkt), sonst per Magic Bytes erkannt
+        images_dir: Zielordner
+
+    Returns:
+        str: Dateiname im Bildspeicher
+    """
+    filename = content_filename(data, ext or guess_extension(data))
+    filepath = os.path.join(images_dir, filename)
+
+    if not os.path.exists(filepath):
+        os.makedirs(images_dir, exist_ok=True)
+        tmp_path = f"{filepath}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, filepath)
+
+    return filename
+
+
+def image_url(filename: str) -> str:
+    """Öffentliche URL eines Bildes aus dem Bildspeicher."""
+    return f"{IMAGES_URL_PREFIX}{filename}" if filename else ""
+
+
+def resolve_image_path(recipe: dict, images_dir: str = IMAGES_DIR) -> Optional[str]:
+    """Lokaler Pfad des ausgelagerten Rezeptbildes (falls vorhanden)."""
+    url = recipe.get("image_url", "") or ""
+    filename = recipe.get("image_filename", "") or ""
+    if url.startswith(IMAGES_URL_PREFIX):
+        filename = url[len(IMAGES_URL_PREFIX):]
+    if not filename:
+        return None
+    path = os.path.join(images_dir, filename)
+    return path if os.path.exists(path) else None
+
+
+def set_image_reference(recipe: dict, filename: str) -> None:
+    """Ersetzt das Inline-Bild eines Rezepts durch die Referenz auf den Bildspeicher."""
+    recipe["image"] = ""
+    recipe["image_filename"] = filename
+    recipe["image_url"] = image_url(filename)
+
+
+def externalize_recipe_image(recipe: dict, images_dir: str = IMAGES_DIR) -> bool:
+    """Lagert ein Base64-Bild eines Rezepts in den Bildspeicher aus.
+
+    Die Bytes werden unverändert übernommen (kein Re-Encoding), damit der
+    Speicher-Pfad ohne PIL auskommt.
+
+    Returns:
+        bool: True wenn das Rezept verändert wurde
+    """
+    image = recipe.get("image", "")
+    if not is_inline_image(image):
+        return False
+
+    mime, payload = split_data_url(image)
+    data = base64.b64decode(payload)
+    filename = store_image_bytes(data, MIME_EXTENSIONS.get(mime), images_dir)
+    set_image_reference(recipe, filename)
+    return True
+
+
+def externalize_recipes(recipes: List[dict], images_dir: str = IMAGES_DIR) -> int:
+    """Lagert alle Base64-Bilder einer Rezeptliste aus.
+
+    Returns:
+        int: Anzahl der ausgelagerten Bilder
+    """
+    return sum(1 for recipe in recipes if externalize_recipe_image(recipe, images_dir))
+
+
+def migrate_file(json_path: Path) -> Dict[str, int]:
+    """Migriert eine Rezept-JSON-Datei (recipes.json / recipes_{lang}.json)."""
+    with open(json_path, "r", encoding="utf-8") as f:
+        recipes = json.load(f)
+
+    size_before = json_path.stat().st_size
+    migrated = externalize_recipes(recipes)
+
+    if migrated:
+        tmp_path = json_path.with_suffix(json_path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(recipes, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, json_path)
+
+    return {"migrated": migrated, "size_before": size_before, "size_after": json_path.stat().st_size}
+
+
+def main() -> None:
+    """Einmalige Migration aller Base64-Bilder in den Bildspeicher."""
+    print("🖼️ Base64 → Bildspeicher Migration")
+    print("=" * 50)
+
+    admin_dir = Path(__file__).parent
+    files = [admin_dir / "recipes.json"] + sorted(admin_dir.glob("recipes_*.json"))
+
+    for json_path in files:
+        if not json_path.exists():
+            continue
+        try:
+            stats = migrate_file(json_path)
+        except Exception as e:
+            print(f"❌ {json_path.name}: {e}")
+            sys.exit(1)
+        saved_kb = (stats["size_before"] - stats["size_after"]) / 1024
+        print(f"✅ {json_path.name}: {stats['migrated']} Bild(er) ausgelagert, {saved_kb:.0f} KB gespart")
+
+    print()
+    print(f"📁 Bildspeicher: {IMAGES_DIR}")
+    print("💡 IMAGE_STORAGE_MODE=files in .env setzen, damit neue Bilder direkt ausgelagert werden.")
+
+
+if __name__ == "__main__":
+    main()
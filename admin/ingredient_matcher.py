@@ -0,0 +1,189 @@
+"""
+Unscharfe Zuordnung von Zutatennamen zu Lebensmitteln
+
+Statt jede Zutat per Teilstring gegen alle Einträge zu vergleichen (langsam
+und abhängig von der Reihenfolge: "öl" gewann vor "kokosöl"), wird einmal ein
+Index aufgebaut. Gesucht wird stufenweise, der beste Treffer gewinnt:
+
+    1. exakt (nach Umlaut-Faltung)            "Süßkartoffel"      → "süßkartoffel"
+    2. Plural/Singular                        "Himbeere"          → "himbeeren"
+    3. einzelnes Wort des Namens              "Tofu geräuchert"   → "tofu"
+    4. Kopf eines Kompositums                 "Bratöl"            → "öl"
+    5. Trigramm-Ähnlichkeit (Tippfehler)      "Brokoli"           → "brokkoli"
+"""
+
+import heapq
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+UMLAUTS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+
+# Deutsche Pluralendungen, längste zuerst ("tomaten" → "tomat", "tomate" → "tomat")
+PLURAL_SUFFIXES = ("nen", "en", "er", "n", "e", "s")
+MIN_STEM_LENGTH = 3
+
+SCORE_EXACT = 1.0
+SCORE_STEM = 0.95
+SCORE_TOKEN = 0.85
+SCORE_HEAD = 0.8
+SCORE_COMPOUND_BASE = 0.55
+SCORE_TRIGRAM_FACTOR = 0.85
+MIN_SCORE = 0.55
+TRIGRAM_CANDIDATES = 20
+# Trigramme, die in mehr als 5 % der Einträge (mindestens 500) vorkommen
+# ("  k", "en "), wählen keine Kandidaten aus - bewertet wird trotzdem mit
+# allen gemeinsamen Trigrammen
+COMMON_TRIGRAM_SHARE = 0.05
+COMMON_TRIGRAM_MIN = 500
+
+
+def fold_name(name: str) -> str:
+    """Normalisiert einen Lebensmittelnamen für Index und Suche.
+
+    "Süsskartoffeln " → "suesskartoffeln"
+    """
+    name = unicodedata.normalize("NFC", name or "")
+    return " ".join(name.lower().split()).translate(UMLAUTS)
+
+
+def stem_token(token: str) -> str:
+    """Entfernt eine Pluralendung, solange ein sinnvoller Stamm übrig bleibt."""
+    for suffix in PLURAL_SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM_LENGTH:
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(folded: str) -> List[str]:
+    return re.findall(r"\w+", folded)
+
+
+def trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class Match(NamedTuple):
+    key: str          # Name des gefundenen Eintrags
+    value: Any        # Daten des Eintrags (z.B. Nährwerte)
+    score: float      # Konfidenz 0..1
+    method: str       # exakt / plural / wort / kopf / kompositum / ähnlich
+
+
+class IngredientMatcher:
+    """Vorberechneter Index über Lebensmittelnamen."""
+
+    def __init__(self, entries: Iterable[Tuple[str, Any]], min_score: float = MIN_SCORE):
+        """
+        Args:
+            entries: (Name, Daten)-Paare - bei gleichem Namen gewinnt der erste
+            min_score: Treffer mit geringerer Konfidenz werden verworfen
+        """
+        self.min_score = min_score
+        self._entries: List[Tuple[str, Any, str]] = []   # (Name, Daten, Stamm)
+        self._exact: Dict[str, int] = {}
+        self._stems: Dict[str, int] = {}                  # Stamm des ganzen Namens
+        self._heads: Dict[str, int] = {}                  # Stamm des ersten Worts ("Tofu, nature")
+        self._trigram_counts: List[int] = []              # Anzahl Trigramme pro Eintrag
+        self._trigrams: Dict[str, List[int]] = defaultdict(list)
+
+        for key, value in entries:
+            folded = fold_name(key)
+            tokens = tokenize(folded)
+            if not tokens or folded in self._exact:
+                continue
+            stem = " ".join(stem_token(t) for t in tokens)
+            idx = len(self._entries)
+            self._entries.append((key, value, stem))
+            self._exact[folded] = idx
+            self._stems.setdefault(stem, idx)
+            # Bei mehreren Einträgen mit gleichem Anfang gewinnt der kürzeste Name
+            head = stem_token(tokens[0])
+            if head not in self._heads or len(key) < len(self._entries[self._heads[head]][0]):
+                self._heads[head] = idx
+            entry_trigrams = trigrams(stem)
+            self._trigram_counts.append(len(entry_trigrams))
+            for tri in entry_trigrams:
+                self._trigrams[tri].append(idx)
+
+        self._common_limit = max(COMMON_TRIGRAM_MIN, int(len(self._entries) * COMMON_TRIGRAM_SHARE))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _match(self, idx: int, score: float, method: str) -> Match:
+        key, value, _ = self._entries[idx]
+        return Match(key, value, round(score, 3), method)
+
+    def match(self, name: str) -> Optional[Match]:
+        """Findet den besten Eintrag für einen Zutatennamen.
+
+        Returns:
+            Match oder None wenn nichts die Mindest-Konfidenz erreicht
+        """
+        folded = fold_name(name)
+        tokens = tokenize(folded)
+        if not tokens:
+            return None
+
+        if folded in self._exact:
+            return self._match(self._exact[folded], SCORE_EXACT, "exakt")
+        joined = "".join(tokens)  # "Kidney-Bohnen" → "kidneybohnen"
+        if len(tokens) > 1 and joined in self._exact:
+            return self._match(self._exact[joined], SCORE_EXACT, "exakt")
+
+        stems = [stem_token(t) for t in tokens]
+        stem = " ".join(stems)
+        if stem in self._stems:
+            return self._match(self._stems[stem], SCORE_STEM, "plural")
+
+        best: Optional[Match] = None
+
+        def consider(idx: int, score: float, method: str) -> None:
+            nonlocal best
+            if score >= self.min_score and (best is None or score > best.score):
+                best = self._match(idx, score, method)
+
+        # Einzelne Wörter, längste zuerst ("frische glatte Petersilie" → "petersilie")
+        for token in sorted(stems, key=len, reverse=True):
+            if token in self._stems:
+                consider(self._stems[token], SCORE_TOKEN, "wort")
+                break
+        if len(stems) == 1 and stems[0] in self._heads:
+            consider(self._heads[stems[0]], SCORE_HEAD, "kopf")
+        if best is not None:
+            return best
+
+        # Komposita: längstes bekanntes Grundwort am Wortende ("räuchertofu" → "tofu")
+        for token in stems:
+            for i in range(1, len(token) - MIN_STEM_LENGTH + 1):
+                suffix = token[i:]
+                idx = self._stems.get(suffix, self._heads.get(suffix))
+                if idx is not None:
+                    consider(idx, SCORE_COMPOUND_BASE + 0.3 * len(suffix) / len(token), "kompositum")
+                    break
+
+        # Trigramme (Tippfehler). Wer den bisherigen Treffer schlagen will,
+        # braucht mindestens `needed` gemeinsame Trigramme - und damit eines der
+        # seltensten (n - needed + 1). Nur die wählen Kandidaten aus, sehr
+        # häufige davon nicht; reicht das nicht, entfällt die Stufe ganz.
+        query_trigrams = trigrams(stem)
+        threshold = best.score if best is not None else self.min_score
+        needed = math.ceil(threshold / SCORE_TRIGRAM_FACTOR * (len(query_trigrams) + 1) / 2)
+        postings = sorted((self._trigrams[tri] for tri in query_trigrams if tri in self._trigrams), key=len)
+        if 0 < needed <= len(postings):
+            selective = postings[:len(postings) - needed + 1]
+            shared: Counter = Counter(selective[0])
+            for entries in selective[1:]:
+                if len(entries) <= self._common_limit:
+                    shared.update(entries)
+            for idx, _ in heapq.nlargest(TRIGRAM_CANDIDATES, shared.items(), key=itemgetter(1)):
+                count = len(query_trigrams & trigrams(self._entries[idx][2]))
+                dice = 2 * count / (len(query_trigrams) + self._trigram_counts[idx])
+                consider(idx, dice * SCORE_TRIGRAM_FACTOR, "ähnlich")
+
+        return best
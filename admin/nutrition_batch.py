@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Nährwerte aller Rezepte neu berechnen
+
+Nach einer Korrektur an Dichten, Stückgewichten oder Nährwertquellen müssen
+alle Rezepte neu gerechnet werden. Jede Zutat wird dabei für den ganzen
+Katalog nur einmal nachgeschlagen (Offline-DB → Cache/APIs parallel →
+eingebaute Liste), danach wird recipes.json in einem atomaren Schritt
+geschrieben. Rezepte, bei denen eine Zutat nur geschätzt werden kann,
+behalten ihre bisherigen Werte.
+
+    python nutrition_batch.py             # berechnen, Unterschiede zeigen, speichern
+    python nutrition_batch.py --dry-run   # nur Unterschiede zeigen
+    python nutrition_batch.py --offline   # ohne APIs
+"""
+
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from generate_sitemap import generate_sitemap
+from nutrition_cache import NutritionCache, normalize_ingredient_name
+from nutrition_db import LocalNutritionDB, SOURCE_BUILTIN, SOURCE_LABELS
+from nutrition_engine import STATUS_ESTIMATE, StaticResolver, compute_nutrition, recipe_items
+from nutrition_sources import NUTRITION_LOOKUP_WORKERS, create_http_session, lookup_many
+from recipe_store import RECIPES_FILE, save_catalog
+from units import NUTRIENT_KEYS, FactorCache
+
+
+def resolve_ingredients(names, local_db: LocalNutritionDB, cache: Optional[NutritionCache] = None,
+                        offline: bool = False, session=None, limits=None,
+                        workers: int = NUTRITION_LOOKUP_WORKERS,
+                        on_progress: Optional[Callable[[int, int, str], None]] = None) -> Dict[str, Optional[Dict]]:
+    """Schlägt jede Zutat des Katalogs genau einmal nach.
+
+    Args:
+        names: Zutatennamen aller Rezepte (Duplikate erlaubt)
+        local_db: Offline-Datenbank
+        cache: Nährwert-Cache für die APIs (None = keine APIs)
+        offline: Nur Offline-DB und eingebaute Liste
+        session, limits: aus create_http_session()
+        on_progress: (fertig, gesamt, name) während der API-Abfragen
+
+    Returns:
+        dict: normalisierter Name → Ergebnis ({nutrition, matched_name, source, ...}) oder None
+    """
+    unique = {}
+    for name in names:
+        unique.setdefault(normalize_ingredient_name(name), name)
+
+    resolved: Dict[str, Optional[Dict]] = {}
+    missing = {}
+    for key, name in unique.items():
+        local = local_db.lookup(name)
+        if local:
+            resolved[key] = local
+        else:
+            missing[key] = name
+
+    if missing and cache is not None and not offline:
+        api_results = lookup_many(missing.values(), cache, session, limits, workers, on_progress)
+        for key, (api_result, from_cache) in api_results.items():
+            if api_result:
+                resolved[key] = dict(api_result, from_cache=from_cache)
+
+    for key, name in missing.items():
+        if key in resolved:
+            continue
+        match = local_db.find_builtin(name)
+        resolved[key] = {
+            "nutrition": match.value,
+            "matched_name": match.key,
+            "source": SOURCE_LABELS[SOURCE_BUILTIN],
+            "confidence": match.score,
+            "fallback_method": match.method,
+        } if match else None
+
+    return resolved
+
+
+def _recipe_key(recipe: Dict, position: int) -> str:
+    """Rezept-ID, ohne ID die Position - so lassen sich Unterschiede später zuordnen."""
+    return recipe.get("id") or f"#{position}"
+
+
+# Umrechnungsfaktoren (Einheit, Zutat) → unit_factor(), einmal pro Prozess
+# für den ganzen Katalog bestimmt - die Tabellen in units.py ändern sich nicht
+_FACTORS: FactorCache = {}
+
+
+def _compute_with_estimates(ingredients: List[Dict], portions, resolve) -> Tuple[Dict[str, int], List[str]]:
+    """Nährwerte pro Portion und die Zutaten, für die nur der Schätzwert blieb."""
+    result = compute_nutrition(ingredients, portions, resolve, _FACTORS)
+    return result.per_portion, [trace.name for trace in result.items if trace.status == STATUS_ESTIMATE]
+
+
+def recompute_catalog(recipes: List[Dict], resolved: Dict[str, Optional[Dict]],
+                      processes: int = 0) -> List[Dict]:
+    """Rechnet alle Rezepte mit den nachgeschlagenen Zutaten neu.
+
+    Rezepte werden nicht verändert - apply_diffs() übernimmt die Unterschiede
+    später in einen frisch geladenen Katalog. Fällt eine Zutat auf den
+    Schätzwert zurück (Menge wird ungeachtet der Einheit als Gramm gezählt),
+    ist das neue Ergebnis unzuverlässig: solche Unterschiede tragen die
+    betroffenen Zutaten unter "estimated" und werden nicht übernommen.
+
+    Args:
+        recipes: Rezepte aus recipes.json
+        resolved: Ergebnis von resolve_ingredients()
+        processes: >1 = Berechnung in so vielen Worker-Prozessen
+
+    Returns:
+        Liste der Unterschiede: {key, title, old, new, estimated}
+        (key = Rezept-ID, ohne ID "#Position")
+    """
+    resolve = StaticResolver(resolved)
+    args = [(recipe.get("ingredients", []), recipe.get("portion", 1), resolve) for recipe in recipes]
+    if processes > 1 and len(args) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(_compute_with_estimates, *zip(*args), chunksize=8))
+    else:
+        results = [_compute_with_estimates(*a) for a in args]
+
+    diffs = []
+    for idx, (recipe, (new, estimated)) in enumerate(zip(recipes, results)):
+        old = recipe.get("nutrition") or {}
+        if any(old.get(key) != new[key] for key in NUTRIENT_KEYS):
+            diffs.append({
+                "key": _recipe_key(recipe, idx),
+                "title": recipe.get("title", ""),
+                "old": old,
+                "new": new,
+                "estimated": estimated,
+            })
+    return diffs
+
+
+def apply_diffs(recipes: List[Dict], diffs: List[Dict]) -> int:
+    """Übernimmt die verlässlichen Unterschiede in einen Katalog (in place).
+
+    Unterschiede mit Schätzwerten werden übersprungen, ebenso Rezepte, die
+    es nicht mehr gibt oder deren Nährwerte inzwischen anders gespeichert
+    wurden als bei der Berechnung - dort gewinnt die neuere Bearbeitung.
+
+    Args:
+        recipes: frisch geladene, bearbeitbare Rezepte
+        diffs: Ergebnis von recompute_catalog()
+
+    Returns:
+        Anzahl geänderter Rezepte
+    """
+    positions = {_recipe_key(recipe, idx): idx for idx, recipe in enumerate(recipes)}
+    now = datetime.now().isoformat()
+    applied = 0
+    for diff in diffs:
+        idx = positions.get(diff["key"])
+        if diff["estimated"] or idx is None:
+            continue
+        if (recipes[idx].get("nutrition") or {}) != diff["old"]:
+            continue
+        recipe = recipes[idx] = dict(recipes[idx])
+        recipe["nutrition"] = dict(diff["new"])
+        recipe["updated_at"] = now
+        applied += 1
+    return applied
+
+
+def format_diff(diff: Dict) -> str:
+    """Eine Zeile pro Rezept: 'Titel: kcal 707 → 690, fat 33 → 31'."""
+    changes = [
+        f"{key} {diff['old'].get(key, '–')} → {diff['new'][key]}"
+        for key in NUTRIENT_KEYS
+        if diff["old"].get(key) != diff["new"][key]
+    ]
+    line = f"{diff['title']}: {', '.join(changes)}"
+    if diff["estimated"]:
+        line += f" (übersprungen - Schätzwert für {', '.join(diff['estimated'])})"
+    return line
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Nährwerte aller Rezepte neu berechnen")
+    parser.add_argument("--dry-run", action="store_true", help="Nur Unterschiede anzeigen, nichts speichern")
+    parser.add_argument("--offline", action="store_true", help="Keine APIs, nur Offline-DB und eingebaute Liste")
+    parser.add_argument("--workers", type=int, default=NUTRITION_LOOKUP_WORKERS, help="Parallele API-Abfragen")
+    parser.add_argument("--processes", type=int, default=0, help="Berechnung auf mehrere Prozesse verteilen")
+    parser.add_argument("--recipes", default=RECIPES_FILE, help="Pfad zur recipes.json")
+    args = parser.parse_args()
+
+    print("🧮 Nährwerte aller Rezepte neu berechnen")
+    print("=" * 50)
+
+    with open(args.recipes, "r", encoding="utf-8") as f:
+        recipes = json.load(f)
+
+    names = [name for recipe in recipes for name, _, _ in recipe_items(recipe.get("ingredients", []))]
+    print(f"📚 {len(recipes)} Rezepte, {len(names)} Zutaten, {len({normalize_ingredient_name(n) for n in names})} verschieden")
+
+    cache = None if args.offline else NutritionCache()
+    session, limits = create_http_session(args.workers)
+
+    def on_progress(done, total, name):
+        print(f"\r🔎 {done}/{total} nachgeschlagen", end="", flush=True)
+        if done == total:
+            print()
+
+    resolved = resolve_ingredients(names, LocalNutritionDB(), cache, args.offline, session, limits,
+                                   args.workers, on_progress)
+    not_found = sorted(key for key, result in resolved.items() if result is None)
+    if not_found:
+        print(f"⚠️ {len(not_found)} Zutat(en) ohne Treffer (Schätzwert): {', '.join(not_found)}")
+    if cache is not None:
+        stats = cache.stats()
+        print(f"🗄️ Cache: {stats['hits']} Treffer, {stats['misses']} API-Abfragen")
+
+    diffs = recompute_catalog(recipes, resolved, args.processes)
+    print()
+    if not diffs:
+        print("✅ Alle Nährwerte sind aktuell - nichts zu speichern")
+        return
+    for diff in diffs:
+        print(f"{'⚠️' if diff['estimated'] else '✏️'} {format_diff(diff)}")
+    print()
+
+    reliable = sum(1 for diff in diffs if not diff["estimated"])
+    if args.dry_run:
+        print(f"🔍 Dry-Run: {reliable} Rezept(e) würden geändert, {len(diffs) - reliable} übersprungen")
+        return
+    if not reliable:
+        print("⚠️ Nur Unterschiede mit Schätzwerten - nichts gespeichert")
+        return
+
+    applied = apply_diffs(recipes, diffs)
+    try:
+        save_catalog(recipes, args.recipes)
+    except OSError as e:
+        print(f"❌ Speichern fehlgeschlagen: {e}")
+        sys.exit(1)
+    print(f"💾 {applied} Rezept(e) aktualisiert und gespeichert")
+
+    # Wie nach einem Save im Admin: Sitemap (lastmod) nachziehen - committet
+    # wird hier aber nicht automatisch
+    generate_sitemap(recipes)
+    print("📝 Noch nicht committet: recipes.json und public/sitemap.xml bitte selbst committen")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Persistenter Cache für Nährwert-Abfragen (Swiss Food DB / Open Food Facts / USDA)
+
+Ergebnisse werden in einer SQLite-Datei unter dem normalisierten Zutatennamen
+abgelegt, damit z.B. "Tofu" nicht für jedes Rezept erneut bei drei APIs
+angefragt wird. Auch "nicht gefunden" wird gemerkt (kürzere Gültigkeit), denn
+gerade die erfolglosen Abfragen laufen durch die komplette Fallback-Kette.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "nutrition_cache.sqlite3")
+DEFAULT_TTL_DAYS = 180          # Treffer ändern sich selten
+DEFAULT_NEGATIVE_TTL_DAYS = 14  # "Nicht gefunden" öfter neu versuchen
+
+
+def normalize_ingredient_name(name: str) -> str:
+    """Normalisiert Zutatennamen für den Cache-Schlüssel.
+
+    "  Tofu " / "tofu" / "TOFU" → "tofu"
+    """
+    name = unicodedata.normalize("NFC", name or "")
+    return " ".join(name.lower().split())
+
+
+class NutritionCache:
+    """SQLite-Cache mit TTL, Negativ-Einträgen und Treffer-Statistik (thread-safe)."""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH,
+                 ttl_days: float = DEFAULT_TTL_DAYS,
+                 negative_ttl_days: float = DEFAULT_NEGATIVE_TTL_DAYS):
+        self.db_path = db_path
+        self.ttl = ttl_days * 86400
+        self.negative_ttl = negative_ttl_days * 86400
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS lookups (
+                   key TEXT PRIMARY KEY,
+                   result TEXT,
+                   created_at REAL NOT NULL
+               )"""
+        )
+        self._conn.commit()
+
+    def get(self, name: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Sucht eine Zutat im Cache.
+
+        Returns:
+            Tuple (gefunden, ergebnis) - (True, None) ist ein gemerktes "nicht gefunden"
+        """
+        key = normalize_ingredient_name(name)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, created_at FROM lookups WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is not None:
+                result_json, created_at = row
+                ttl = self.ttl if result_json is not None else self.negative_ttl
+                if time.time() - created_at < ttl:
+                    self.hits += 1
+                    return True, json.loads(result_json) if result_json is not None else None
+
+            self.misses += 1
+            return False, None
+
+    def set(self, name: str, result: Optional[Dict[str, Any]]) -> None:
+        """Merkt sich ein Ergebnis (None = nicht gefunden)."""
+        key = normalize_ingredient_name(name)
+        result_json = json.dumps(result, ensure_ascii=False) if result is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO lookups (key, result, created_at) VALUES (?, ?, ?)",
+                (key, result_json, time.time()),
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Treffer/Fehlschläge seit Start und Größe des Caches."""
+        with self._lock:
+            entries, negatives = self._conn.execute(
+                "SELECT COUNT(*), SUM(CASE WHEN result IS NULL THEN 1 ELSE 0 END) FROM lookups"
+            ).fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total * 100) if total else 0.0,
+            "entries": entries,
+            "negatives": negatives or 0,
+        }
+
+    def clear(self) -> None:
+        """Leert den Cache komplett."""
+        with self._lock:
+            self._conn.execute("DELETE FROM lookups")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
@@ -0,0 +1,517 @@
+#!/usr/bin/env python3
+"""
+Lokale Nährwert-Datenbank (offline)
+
+Baut aus den Bulk-Exporten von BLV (Schweizer Nährwertdatenbank), Open Food
+Facts und USDA FoodData Central eine kompakte SQLite-Datei mit FTS-Index.
+Der Admin öffnet sie einmal beim Start und kann Nährwerte damit komplett
+offline in Millisekunden berechnen - die APIs werden nur noch für Zutaten
+gefragt, die lokal fehlen.
+
+Import (alle Quellen optional, die eingebaute Liste ist immer dabei):
+    python nutrition_db.py --blv naehrwertdaten.csv \
+        --off en.openfoodfacts.org.products.csv \
+        --usda FoodData_Central_csv/
+
+Bezugsquellen:
+    BLV:  naehrwertdaten.ch → Download (Excel als CSV speichern)
+    OFF:  https://world.openfoodfacts.org/data (CSV-Export, Tab-getrennt)
+    USDA: https://fdc.nal.usda.gov/download-datasets (Foundation / SR Legacy, CSV)
+"""
+
+import argparse
+import csv
+import os
+import re
+import sqlite3
+import sys
+import threading
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from ingredient_matcher import IngredientMatcher, Match, fold_name
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "nutrition_db.sqlite3")
+
+SOURCE_BUILTIN = "builtin"
+SOURCE_BLV = "blv"
+SOURCE_OFF = "off"
+SOURCE_USDA = "usda"
+
+SOURCE_LABELS = {
+    SOURCE_BLV: "Swiss Food DB 🇨🇭 (offline)",
+    SOURCE_USDA: "USDA FoodData 🇺🇸 (offline)",
+    SOURCE_OFF: "Open Food Facts 🌍 (offline)",
+    SOURCE_BUILTIN: "Lokal 💾",
+}
+# Bei gleich gutem Treffer gewinnt die verlässlichere Quelle
+SOURCE_PRIORITY = {SOURCE_BLV: 0, SOURCE_USDA: 1, SOURCE_OFF: 2, SOURCE_BUILTIN: 3}
+
+NUTRIENT_KEYS = ("kcal", "protein", "carbs", "fat", "fiber")
+
+# Konfidenz eines reinen Volltext-Treffers (Open Food Facts wird nicht unscharf indexiert)
+FTS_CONFIDENCE = 0.6
+
+# Open Food Facts ist riesig - standardmässig nur Produkte aus dem DACH-Raum
+DEFAULT_OFF_COUNTRIES = ("en:switzerland", "en:germany", "en:austria")
+USDA_DATA_TYPES = ("foundation_food", "sr_legacy_food")
+
+# Lokale Fallback-Datenbank für häufige vegane Zutaten (pro 100g)
+BUILTIN_FOODS = {
+    # Getreide & Mehl
+    "mehl": {"kcal": 364, "protein": 10, "carbs": 76, "fat": 1, "fiber": 3},
+    "weizenmehl": {"kcal": 364, "protein": 10, "carbs": 76, "fat": 1, "fiber": 3},
+    "dinkelmehl": {"kcal": 338, "protein": 15, "carbs": 70, "fat": 2, "fiber": 9},
+    "vollkornmehl": {"kcal": 340, "protein": 13, "carbs": 72, "fat": 2, "fiber": 10},
+    "haferflocken": {"kcal": 379, "protein": 13, "carbs": 58, "fat": 7, "fiber": 10},
+    "reis": {"kcal": 130, "protein": 3, "carbs": 28, "fat": 0, "fiber": 0},
+    "nudeln": {"kcal": 371, "protein": 13, "carbs": 74, "fat": 1, "fiber": 3},
+    "pasta": {"kcal": 371, "protein": 13, "carbs": 74, "fat": 1, "fiber": 3},
+    "brot": {"kcal": 265, "protein": 9, "carbs": 49, "fat": 3, "fiber": 4},
+    
+    # Hülsenfrüchte
+    "linsen": {"kcal": 116, "protein": 9, "carbs": 20, "fat": 0, "fiber": 8},
+    "kichererbsen": {"kcal": 164, "protein": 9, "carbs": 27, "fat": 3, "fiber": 7},
+    "bohnen": {"kcal": 127, "protein": 9, "carbs": 23, "fat": 0, "fiber": 7},
+    "kidneybohnen": {"kcal": 127, "protein": 9, "carbs": 23, "fat": 0, "fiber": 7},
+    "schwarze bohnen": {"kcal": 132, "protein": 9, "carbs": 24, "fat": 1, "fiber": 9},
+    "erbsen": {"kcal": 81, "protein": 5, "carbs": 14, "fat": 0, "fiber": 5},
+    "tofu": {"kcal": 76, "protein": 8, "carbs": 2, "fat": 5, "fiber": 1},
+    "räuchertofu": {"kcal": 150, "protein": 15, "carbs": 3, "fat": 9, "fiber": 2},
+    "tempeh": {"kcal": 193, "protein": 19, "carbs": 9, "fat": 11, "fiber": 9},
+    
+    # Gemüse
+    "tomate": {"kcal": 18, "protein": 1, "carbs": 4, "fat": 0, "fiber": 1},
+    "tomaten": {"kcal": 18, "protein": 1, "carbs": 4, "fat": 0, "fiber": 1},
+    "zwiebel": {"kcal": 40, "protein": 1, "carbs": 9, "fat": 0, "fiber": 2},
+    "zwiebeln": {"kcal": 40, "protein": 1, "carbs": 9, "fat": 0, "fiber": 2},
+    "knoblauch": {"kcal": 149, "protein": 6, "carbs": 33, "fat": 1, "fiber": 2},
+    "karotte": {"kcal": 41, "protein": 1, "carbs": 10, "fat": 0, "fiber": 3},
+    "karotten": {"kcal": 41, "protein": 1, "carbs": 10, "fat": 0, "fiber": 3},
+    "möhre": {"kcal": 41, "protein": 1, "carbs": 10, "fat": 0, "fiber": 3},
+    "möhren": {"kcal": 41, "protein": 1, "carbs": 10, "fat": 0, "fiber": 3},
+    "paprika": {"kcal": 31, "protein": 1, "carbs": 6, "fat": 0, "fiber": 2},
+    "zucchini": {"kcal": 17, "protein": 1, "carbs": 3, "fat": 0, "fiber": 1},
+    "aubergine": {"kcal": 25, "protein": 1, "carbs": 6, "fat": 0, "fiber": 3},
+    "brokkoli": {"kcal": 34, "protein": 3, "carbs": 7, "fat": 0, "fiber": 3},
+    "blumenkohl": {"kcal": 25, "protein": 2, "carbs": 5, "fat": 0, "fiber": 2},
+    "spinat": {"kcal": 23, "protein": 3, "carbs": 4, "fat": 0, "fiber": 2},
+    "salat": {"kcal": 15, "protein": 1, "carbs": 3, "fat": 0, "fiber": 1},
+    "gurke": {"kcal": 15, "protein": 1, "carbs": 4, "fat": 0, "fiber": 1},
+    "lauch": {"kcal": 61, "protein": 1, "carbs": 14, "fat": 0, "fiber": 2},
+    
+    # Nüsse & Samen
+    "mandel": {"kcal": 579, "protein": 21, "carbs": 22, "fat": 50, "fiber": 12},
+    "mandeln": {"kcal": 579, "protein": 21, "carbs": 22, "fat": 50, "fiber": 12},
+    "walnuss": {"kcal": 654, "protein": 15, "carbs": 14, "fat": 65, "fiber": 7},
+    "walnüsse": {"kcal": 654, "protein": 15, "carbs": 14, "fat": 65, "fiber": 7},
+    "cashew": {"kcal": 553, "protein": 18, "carbs": 30, "fat": 44, "fiber": 3},
+    "cashews": {"kcal": 553, "protein": 18, "carbs": 30, "fat": 44, "fiber": 3},
+    "erdnuss": {"kcal": 567, "protein": 26, "carbs": 16, "fat": 49, "fiber": 8},
+    "erdnüsse": {"kcal": 567, "protein": 26, "carbs": 16, "fat": 49, "fiber": 8},
+    "sonnenblumenkerne": {"kcal": 584, "protein": 21, "carbs": 20, "fat": 51, "fiber": 9},
+    "kürbiskerne": {"kcal": 559, "protein": 30, "carbs": 11, "fat": 49, "fiber": 6},
+    "sesam": {"kcal": 573, "protein": 18, "carbs": 23, "fat": 50, "fiber": 12},
+    "leinsamen": {"kcal": 534, "protein": 18, "carbs": 29, "fat": 42, "fiber": 27},
+    "chiasamen": {"kcal": 486, "protein": 17, "carbs": 42, "fat": 31, "fiber": 34},
+    
+    # Öle & Fette
+    "öl": {"kcal": 884, "protein": 0, "carbs": 0, "fat": 100, "fiber": 0},
+    "olivenöl": {"kcal": 884, "protein": 0, "carbs": 0, "fat": 100, "fiber": 0},
+    "rapsöl": {"kcal": 884, "protein": 0, "carbs": 0, "fat": 100, "fiber": 0},
+    "sonnenblumenöl": {"kcal": 884, "protein": 0, "carbs": 0, "fat": 100, "fiber": 0},
+    "kokosöl": {"kcal": 862, "protein": 0, "carbs": 0, "fat": 100, "fiber": 0},
+    
+    # Milchalternativen
+    "hafermilch": {"kcal": 47, "protein": 1, "carbs": 7, "fat": 2, "fiber": 1},
+    "sojamilch": {"kcal": 54, "protein": 3, "carbs": 6, "fat": 2, "fiber": 1},
+    "mandelmilch": {"kcal": 24, "protein": 1, "carbs": 3, "fat": 1, "fiber": 0},
+    "kokosmilch": {"kcal": 230, "protein": 2, "carbs": 6, "fat": 24, "fiber": 2},
+    
+    # Süßungsmittel
+    "zucker": {"kcal": 387, "protein": 0, "carbs": 100, "fat": 0, "fiber": 0},
+    "ahornsirup": {"kcal": 260, "protein": 0, "carbs": 67, "fat": 0, "fiber": 0},
+    "agavendicksaft": {"kcal": 310, "protein": 0, "carbs": 76, "fat": 0, "fiber": 0},
+    "honig": {"kcal": 304, "protein": 0, "carbs": 82, "fat": 0, "fiber": 0},
+    
+    # Gewürze & Würze (geringe Mengen, daher Nullwerte)
+    "salz": {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0},
+    "pfeffer": {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0},
+    "paprikapulver": {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0},
+    "curry": {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0},
+    "kurkuma": {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0},
+    "kreuzkümmel": {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0},
+    "zimt": {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0},
+    "muskat": {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0},
+    "ingwer": {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0},
+    "petersilie": {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0},
+    "basilikum": {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0},
+    "oregano": {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0},
+    "thymian": {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0},
+    "rosmarin": {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0},
+    "sojasauce": {"kcal": 53, "protein": 5, "carbs": 5, "fat": 0, "fiber": 0},
+    "essig": {"kcal": 19, "protein": 0, "carbs": 1, "fat": 0, "fiber": 0},
+    "senf": {"kcal": 66, "protein": 4, "carbs": 6, "fat": 3, "fiber": 3},
+    "tomatenmark": {"kcal": 82, "protein": 4, "carbs": 18, "fat": 0, "fiber": 3},
+    
+    # Kartoffeln & Stärke
+    "kartoffel": {"kcal": 77, "protein": 2, "carbs": 17, "fat": 0, "fiber": 2},
+    "kartoffeln": {"kcal": 77, "protein": 2, "carbs": 17, "fat": 0, "fiber": 2},
+    "süßkartoffel": {"kcal": 86, "protein": 2, "carbs": 20, "fat": 0, "fiber": 3},
+    "süßkartoffeln": {"kcal": 86, "protein": 2, "carbs": 20, "fat": 0, "fiber": 3},
+    "stärke": {"kcal": 381, "protein": 0, "carbs": 91, "fat": 0, "fiber": 0},
+    "maisstärke": {"kcal": 381, "protein": 0, "carbs": 91, "fat": 0, "fiber": 0},
+    
+    # Obst
+    "apfel": {"kcal": 52, "protein": 0, "carbs": 14, "fat": 0, "fiber": 2},
+    "banane": {"kcal": 89, "protein": 1, "carbs": 23, "fat": 0, "fiber": 3},
+    "orange": {"kcal": 47, "protein": 1, "carbs": 12, "fat": 0, "fiber": 2},
+    "zitrone": {"kcal": 29, "protein": 1, "carbs": 9, "fat": 0, "fiber": 3},
+    "beeren": {"kcal": 57, "protein": 1, "carbs": 14, "fat": 0, "fiber": 2},
+    "erdbeeren": {"kcal": 32, "protein": 1, "carbs": 8, "fat": 0, "fiber": 2},
+    "heidelbeeren": {"kcal": 57, "protein": 1, "carbs": 14, "fat": 0, "fiber": 2},
+    "himbeeren": {"kcal": 52, "protein": 1, "carbs": 12, "fat": 1, "fiber": 7},
+    "mango": {"kcal": 60, "protein": 1, "carbs": 15, "fat": 0, "fiber": 2},
+    "ananas": {"kcal": 50, "protein": 1, "carbs": 13, "fat": 0, "fiber": 1},
+    "avocado": {"kcal": 160, "protein": 2, "carbs": 9, "fat": 15, "fiber": 7},
+}
+
+
+def parse_number(value) -> Optional[float]:
+    """Liest Zahlen aus den Exporten ("1,5", "<0.1", "tr", "")."""
+    if value is None:
+        return None
+    value = str(value).strip().replace(",", ".").lstrip("<~")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+# === Import ===
+
+def _open_csv(path: str, delimiter: Optional[str] = None) -> Tuple[Iterator[list], object]:
+    """Öffnet eine CSV-Datei; Trennzeichen wird erkannt, falls nicht angegeben."""
+    f = open(path, "r", encoding="utf-8-sig", newline="")
+    if delimiter is None:
+        sample = f.read(64 * 1024)
+        f.seek(0)
+        try:
+            delimiter = csv.Sniffer().sniff(sample, delimiters=";,\t").delimiter
+        except csv.Error:
+            delimiter = ";"
+    return csv.reader(f, delimiter=delimiter), f
+
+
+def iter_blv_rows(path: str) -> Iterator[Tuple[str, Dict[str, float]]]:
+    """Liest den BLV-Export (Schweizer Nährwertdatenbank, als CSV gespeichert).
+
+    Die Kopfzeile wird gesucht (das Excel hat Titelzeilen davor), Spalten
+    werden am Anfang des Spaltennamens erkannt.
+    """
+    columns = {
+        "name": ("name",),
+        "kcal": ("energie, kalorien",),
+        "protein": ("protein",),
+        "carbs": ("kohlenhydrate, verfügbar", "kohlenhydrate"),
+        "fat": ("fett, total", "fett"),
+        "fiber": ("nahrungsfasern", "ballaststoffe"),
+    }
+    reader, f = _open_csv(path)
+    with f:
+        index = None
+        for row in reader:
+            if index is None:
+                header = [cell.strip().lower() for cell in row]
+                if "protein" not in " ".join(header):
+                    continue
+                index = {}
+                for key, prefixes in columns.items():
+                    for prefix in prefixes:
+                        match = next((i for i, h in enumerate(header) if h.startswith(prefix)), None)
+                        if match is not None:
+                            index[key] = match
+                            break
+                if "name" not in index or "kcal" not in index:
+                    raise ValueError(f"{path}: Spalten 'Name' / 'Energie, Kalorien' nicht gefunden")
+                continue
+
+            name = row[index["name"]].strip() if len(row) > index["name"] else ""
+            values = {key: parse_number(row[i]) if i < len(row) else None
+                      for key, i in index.items() if key != "name"}
+            if name and values.get("kcal") is not None:
+                yield name, {key: values.get(key) or 0 for key in NUTRIENT_KEYS}
+
+
+def iter_off_rows(path: str, countries: Optional[Iterable[str]] = DEFAULT_OFF_COUNTRIES
+                  ) -> Iterator[Tuple[str, Dict[str, float]]]:
+    """Liest den Open-Food-Facts-CSV-Export (Tab-getrennt, mehrere GB) zeilenweise."""
+    csv.field_size_limit(sys.maxsize)
+    countries = set(countries) if countries else None
+    fields = {
+        "kcal": "energy-kcal_100g",
+        "protein": "proteins_100g",
+        "carbs": "carbohydrates_100g",
+        "fat": "fat_100g",
+        "fiber": "fiber_100g",
+    }
+    reader, f = _open_csv(path, delimiter="\t")
+    with f:
+        header = next(reader)
+        pos = {name: i for i, name in enumerate(header)}
+        name_idx = pos["product_name"]
+        countries_idx = pos.get("countries_tags")
+        field_idx = {key: pos[col] for key, col in fields.items() if col in pos}
+
+        for row in reader:
+            if len(row) != len(header):
+                continue
+            if countries and countries_idx is not None:
+                if not countries.intersection(row[countries_idx].split(",")):
+                    continue
+            name = row[name_idx].strip()
+            kcal = parse_number(row[field_idx["kcal"]]) if "kcal" in field_idx else None
+            if not name or not kcal or kcal <= 0:
+                continue
+            yield name, {key: parse_number(row[i]) or 0 for key, i in field_idx.items()}
+
+
+def iter_usda_rows(directory: str) -> Iterator[Tuple[str, Dict[str, float]]]:
+    """Liest den USDA-FoodData-Central-CSV-Export (food.csv + food_nutrient.csv)."""
+    nutrient_map = {
+        "1008": "kcal",
+        "2047": "kcal_atwater",  # Foundation Foods haben oft nur Atwater-Energie
+        "2048": "kcal_atwater",
+        "1003": "protein",
+        "1005": "carbs",
+        "1004": "fat",
+        "1079": "fiber",
+    }
+
+    foods = {}
+    with open(os.path.join(directory, "food.csv"), "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            if row.get("data_type") in USDA_DATA_TYPES:
+                foods[row["fdc_id"]] = row["description"].strip()
+
+    values: Dict[str, Dict[str, float]] = {}
+    with open(os.path.join(directory, "food_nutrient.csv"), "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            fdc_id = row["fdc_id"]
+            key = nutrient_map.get(row["nutrient_id"])
+            if key and fdc_id in foods:
+                amount = parse_number(row["amount"])
+                if amount is not None:
+                    values.setdefault(fdc_id, {})[key] = amount
+
+    for fdc_id, name in foods.items():
+        nutr = values.get(fdc_id, {})
+        kcal = nutr.get("kcal") or nutr.get("kcal_atwater")
+        if name and kcal:
+            nutr["kcal"] = kcal
+            yield name, {key: nutr.get(key, 0) for key in NUTRIENT_KEYS}
+
+
+SCHEMA = """
+CREATE TABLE foods (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    name_folded TEXT NOT NULL,
+    source TEXT NOT NULL,
+    kcal REAL, protein REAL, carbs REAL, fat REAL, fiber REAL,
+    UNIQUE (source, name_folded)
+);
+CREATE INDEX foods_name_folded ON foods (name_folded);
+CREATE VIRTUAL TABLE foods_fts USING fts5 (name_folded, content='foods', content_rowid='id');
+"""
+
+
+def build_database(db_path: str = DB_PATH, blv: Optional[str] = None, off: Optional[str] = None,
+                   usda: Optional[str] = None, off_countries: Optional[Iterable[str]] = DEFAULT_OFF_COUNTRIES,
+                   progress=print) -> Dict[str, int]:
+    """Baut die Offline-Datenbank neu auf.
+
+    Geschrieben wird in eine temporäre Datei, die erst am Ende die alte
+    ersetzt - ein laufender Admin liest nie eine halbe Datenbank.
+
+    Args:
+        db_path: Ziel-Datei
+        blv: Pfad zum BLV-CSV
+        off: Pfad zum Open-Food-Facts-CSV
+        usda: Ordner mit dem USDA-CSV-Export
+        off_countries: countries_tags-Filter für Open Food Facts (None = alle)
+        progress: Funktion für Statusmeldungen
+
+    Returns:
+        dict: Anzahl importierter Lebensmittel pro Quelle
+    """
+    tmp_path = f"{db_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    conn.executescript(SCHEMA)
+
+    sources = [(SOURCE_BUILTIN, BUILTIN_FOODS.items())]
+    if blv:
+        sources.append((SOURCE_BLV, iter_blv_rows(blv)))
+    if usda:
+        sources.append((SOURCE_USDA, iter_usda_rows(usda)))
+    if off:
+        sources.append((SOURCE_OFF, iter_off_rows(off, off_countries)))
+
+    counts = {}
+    try:
+        for source, rows in sources:
+            before = conn.total_changes
+            batch = []
+            for name, nutr in rows:
+                batch.append((name, fold_name(name), source) + tuple(nutr.get(k, 0) for k in NUTRIENT_KEYS))
+                if len(batch) >= 10000:
+                    conn.executemany("INSERT OR IGNORE INTO foods (name, name_folded, source, kcal, protein, carbs, fat, fiber) "
+                                     "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", batch)
+                    batch = []
+            conn.executemany("INSERT OR IGNORE INTO foods (name, name_folded, source, kcal, protein, carbs, fat, fiber) "
+                             "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", batch)
+            counts[source] = conn.total_changes - before
+            progress(f"✅ {source}: {counts[source]} Lebensmittel")
+
+        conn.execute("INSERT INTO foods_fts (foods_fts) VALUES ('rebuild')")
+        conn.commit()
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, db_path)
+    return counts
+
+
+# === Abfrage ===
+
+class LocalNutritionDB:
+    """Lesezugriff auf die Offline-Datenbank (einmal öffnen, thread-safe).
+
+    Fehlt die Datei, wird nur die eingebaute Liste (im Speicher) verwendet.
+    """
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        if os.path.exists(db_path):
+            self._conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+            self._conn.execute("PRAGMA mmap_size = 268435456")
+        else:
+            self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+            self._conn.executescript(SCHEMA)
+            self._conn.executemany(
+                "INSERT INTO foods (name, name_folded, source, kcal, protein, carbs, fat, fiber) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(name, fold_name(name), SOURCE_BUILTIN) + tuple(nutr[k] for k in NUTRIENT_KEYS)
+                 for name, nutr in BUILTIN_FOODS.items()],
+            )
+            self._conn.execute("INSERT INTO foods_fts (foods_fts) VALUES ('rebuild')")
+
+        # Unscharfer Index über die kuratierten Quellen (BLV vor USDA bei gleichem Namen)
+        rows = self._conn.execute(
+            "SELECT name, source, kcal, protein, carbs, fat, fiber FROM foods WHERE source IN (?, ?) "
+            "ORDER BY CASE source WHEN ? THEN 0 ELSE 1 END, id",
+            (SOURCE_BLV, SOURCE_USDA, SOURCE_BLV),
+        ).fetchall()
+        self._matcher = IngredientMatcher((row[0], row) for row in rows)
+        self._builtin_matcher = IngredientMatcher(BUILTIN_FOODS.items())
+
+    def counts(self) -> Dict[str, int]:
+        """Anzahl Lebensmittel pro Quelle."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT source, COUNT(*) FROM foods GROUP BY source").fetchall())
+
+    @staticmethod
+    def _to_result(row, confidence: float) -> Dict:
+        name, source = row[0], row[1]
+        return {
+            "nutrition": dict(zip(NUTRIENT_KEYS, row[2:7])),
+            "matched_name": name,
+            "source": SOURCE_LABELS.get(source, source),
+            "confidence": confidence,
+        }
+
+    def lookup(self, name: str) -> Optional[Dict]:
+        """Sucht eine Zutat in den importierten Bulk-Daten (ohne eingebaute Liste).
+
+        Reihenfolge: exakter Name (alle Quellen) → unscharfer Index über
+        BLV/USDA → Volltextsuche (alle Wörter als Präfix, auch Open Food Facts).
+
+        Returns:
+            dict wie die API-Suchen ({nutrition, matched_name, source}) plus
+            confidence (0..1), oder None
+        """
+        folded = fold_name(name)
+        tokens = re.findall(r"\w+", folded)
+        if not tokens:
+            return None
+
+        priority = " ".join(f"WHEN '{s}' THEN {p}" for s, p in SOURCE_PRIORITY.items())
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT name, source, kcal, protein, carbs, fat, fiber FROM foods "
+                f"WHERE name_folded = ? AND source != ? ORDER BY CASE source {priority} END LIMIT 1",
+                (folded, SOURCE_BUILTIN),
+            ).fetchone()
+        if row is not None:
+            return self._to_result(row, 1.0)
+
+        match = self._matcher.match(name)
+        if match and match.score >= FTS_CONFIDENCE:
+            return self._to_result(match.value, match.score)
+
+        query = " ".join(f'"{token}"*' for token in tokens)
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT f.name, f.source, f.kcal, f.protein, f.carbs, f.fat, f.fiber "
+                f"FROM foods_fts JOIN foods f ON f.id = foods_fts.rowid "
+                f"WHERE foods_fts MATCH ? AND f.source != ? "
+                f"ORDER BY foods_fts.rank, length(f.name), CASE f.source {priority} END LIMIT 1",
+                (query, SOURCE_BUILTIN),
+            ).fetchone()
+        if row is not None:
+            return self._to_result(row, FTS_CONFIDENCE)
+        return self._to_result(match.value, match.score) if match else None
+
+    def find_builtin(self, name: str) -> Optional[Match]:
+        """Fallback auf die eingebaute Liste (indexiert, siehe ingredient_matcher).
+
+        Returns:
+            Match (key, Nährwerte pro 100g, score, method) oder None
+        """
+        return self._builtin_matcher.match(name)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Baut die Offline-Nährwertdatenbank aus Bulk-Exporten")
+    parser.add_argument("--blv", help="BLV-Export als CSV (Schweizer Nährwertdatenbank)")
+    parser.add_argument("--off", help="Open-Food-Facts-CSV-Export (Tab-getrennt)")
+    parser.add_argument("--usda", help="Ordner mit dem USDA-FoodData-Central-CSV-Export")
+    parser.add_argument("--off-all-countries", action="store_true",
+                        help="Alle Open-Food-Facts-Produkte statt nur CH/DE/AT importieren")
+    parser.add_argument("--output", default=DB_PATH, help="Ziel-Datei")
+    args = parser.parse_args()
+
+    print("📦 Offline-Nährwertdatenbank aufbauen")
+    print("=" * 50)
+    try:
+        counts = build_database(
+            args.output, blv=args.blv, off=args.off, usda=args.usda,
+            off_countries=None if args.off_all_countries else DEFAULT_OFF_COUNTRIES,
+        )
+    except (OSError, KeyError, ValueError) as e:
+        print(f"❌ Import fehlgeschlagen: {e}")
+        sys.exit(1)
+
+    size_mb = os.path.getsize(args.output) / (1024 * 1024)
+    print()
+    print(f"📁 {args.output} ({sum(counts.values())} Lebensmittel, {size_mb:.1f} MB)")
+    print("💡 Admin neu starten, damit die neue Datenbank geladen wird.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Nährwertberechnung ohne Streamlit
+
+Mengen parsen, in Gramm umrechnen (units.py) und mit den Nährwerten pro 100 g
+verrechnen. Woher die Nährwerte kommen (Offline-DB, Cache, APIs), entscheidet
+der Aufrufer über eine resolve-Funktion - so rechnen Admin und
+nutrition_batch.py exakt gleich.
+
+compute_nutrition() gibt statt Streamlit-Ausgaben eine Spur zurück (Treffer,
+Quelle, Umrechnung, Warnungen); der Admin zeigt sie danach an. Mit einem
+StaticResolver läuft die Berechnung auch in Worker-Prozessen oder Benchmarks.
+"""
+
+import re
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from nutrition_cache import normalize_ingredient_name
+from units import NUTRIENT_KEYS, FactorCache, convert_many, describe_conversion, nutrient_totals
+
+# Durchschnittswert pro 100 g, wenn eine Zutat nirgends gefunden wird
+DEFAULT_ESTIMATE = {"kcal": 50, "protein": 2, "carbs": 10, "fat": 1, "fiber": 1}
+
+FRACTIONS = {"½": 0.5, "¼": 0.25, "¾": 0.75, "⅓": 1 / 3, "⅔": 2 / 3}
+
+RANGE_PATTERN = re.compile(r"^(\d+(?:\.\d+)?)\s*[-–]\s*(\d+(?:\.\d+)?)")
+MIXED_PATTERN = re.compile(r"(\d+)\s+(\d+)/(\d+)")
+FRACTION_PATTERN = re.compile(r"(\d+)/(\d+)")
+UNICODE_FRACTION_PATTERN = re.compile(r"(\d*)\s*([½¼¾⅓⅔])")
+NUMBER_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+
+
+def parse_amount(amount) -> Tuple[Optional[float], str]:
+    """Liest eine Mengenangabe aus dem Rezept.
+
+    "200" → 200, "0,5" → 0.5, "50-100" → 75 (Durchschnitt), "1 1/2" → 1.5, "½" → 0.5
+
+    Returns:
+        Tuple (Menge oder None, Hinweis für die Anzeige - leer wenn nichts Besonderes)
+    """
+    text = str(amount or "").strip().replace(",", ".")
+    if not text:
+        return None, ""
+
+    match = RANGE_PATTERN.match(text)
+    if match:
+        low, high = float(match.group(1)), float(match.group(2))
+        average = (low + high) / 2
+        return average, f"Bereich {amount} → Durchschnitt {average:g}"
+
+    match = MIXED_PATTERN.search(text)
+    if match and int(match.group(3)):
+        return int(match.group(1)) + int(match.group(2)) / int(match.group(3)), ""
+
+    match = FRACTION_PATTERN.search(text)
+    if match and int(match.group(2)):
+        return int(match.group(1)) / int(match.group(2)), ""
+
+    match = UNICODE_FRACTION_PATTERN.search(text)
+    if match:
+        return int(match.group(1) or 0) + FRACTIONS[match.group(2)], ""
+
+    match = NUMBER_PATTERN.search(text)
+    if match:
+        return float(match.group(0)), ""
+    return None, ""
+
+
+def recipe_items(ingredients: List[Dict]) -> List[Tuple[str, float, str]]:
+    """Alle berechenbaren Zutaten eines Rezepts als (Name, Menge, Einheit)."""
+    items = []
+    for group in ingredients or []:
+        for item in group.get("items", []):
+            name = (item.get("name") or "").strip()
+            amount, _ = parse_amount(item.get("amount"))
+            if name and amount and amount > 0:
+                items.append((name, amount, item.get("unit") or ""))
+    return items
+
+
+def _portion_count(portions) -> int:
+    """Portionen aus dem Rezept als Zahl ≥ 1 ("4" → 4, ungültig → 1)."""
+    try:
+        return max(int(portions), 1)
+    except (TypeError, ValueError):
+        return 1
+
+
+def per_portion(total: Dict[str, int], portions) -> Dict[str, int]:
+    """Teilt die Summe durch die Portionen (abgerundet wie bisher)."""
+    count = _portion_count(portions)
+    if count == 1:
+        return dict(total)
+    return {key: int(total[key] / count) for key in NUTRIENT_KEYS}
+
+
+STATUS_OK = "ok"
+STATUS_ESTIMATE = "estimate"
+STATUS_INVALID = "invalid"
+
+
+class IngredientTrace(NamedTuple):
+    """Eine Zeile der Berechnung - was gefunden, wie umgerechnet, was addiert wurde."""
+    group_index: int
+    name: str
+    amount_raw: Any               # Menge wie im Rezept ("50-100", "½", 200)
+    amount: Optional[float]       # geparste Menge, None = ungültig
+    unit: str
+    amount_note: str              # Hinweis aus parse_amount (Bereich → Durchschnitt)
+    status: str                   # STATUS_OK / STATUS_ESTIMATE / STATUS_INVALID
+    matched_name: Optional[str] = None
+    source: str = ""
+    confidence: Optional[float] = None
+    from_cache: bool = False
+    fallback_method: str = ""     # Methode des Matchers, wenn die eingebaute Liste einspringen musste
+    grams: float = 0.0
+    conversion_note: str = ""
+    added: Optional[Dict[str, int]] = None
+
+
+class NutritionResult(NamedTuple):
+    """Ergebnis inkl. Spur für die Anzeige (Admin) oder Auswertung (Batch, Benchmarks)."""
+    per_portion: Dict[str, int]
+    total: Dict[str, int]
+    portions: int
+    groups: List[str]             # Gruppennamen in Rezept-Reihenfolge
+    items: List[IngredientTrace]
+    warnings: List[str]
+
+
+class StaticResolver:
+    """resolve-Funktion über bereits nachgeschlagene Zutaten.
+
+    Ohne Netzwerk und Streamlit, lässt sich pickeln - damit kann dieselbe
+    Berechnung in einem ProcessPoolExecutor oder Benchmark laufen.
+    """
+
+    def __init__(self, resolved: Dict[str, Optional[Dict[str, Any]]]):
+        """
+        Args:
+            resolved: normalisierter Name → Ergebnis ({nutrition, matched_name, source, ...}) oder None
+        """
+        self.resolved = resolved
+
+    def __call__(self, name: str) -> Optional[Dict[str, Any]]:
+        return self.resolved.get(normalize_ingredient_name(name))
+
+
+def compute_nutrition(ingredients: List[Dict], portions,
+                      resolve: Callable[[str], Optional[Dict[str, Any]]],
+                      factors: Optional[FactorCache] = None) -> NutritionResult:
+    """Berechnet die Nährwerte eines Rezepts und protokolliert jeden Schritt.
+
+    Zuerst werden alle Zeilen nachgeschlagen, danach in einem Schritt
+    umgerechnet (convert_many) und verrechnet (nutrient_totals).
+
+    Args:
+        ingredients: Zutatengruppen wie in recipes.json
+        portions: Anzahl Portionen
+        resolve: Zutatenname → Ergebnis mit "nutrition" (pro 100 g), "matched_name",
+            "source" und optional "confidence", "from_cache", "fallback_method";
+            None = Schätzwert verwenden
+        factors: Umrechnungsfaktoren über mehrere Rezepte teilen (siehe convert_many)
+
+    Returns:
+        NutritionResult - Summen sind ganze Zahlen (pro Zutat abgerundet wie bisher)
+    """
+    if factors is None:
+        factors = {}
+    groups, items, warnings = [], [], []
+    lines = []  # (Position in items, Menge, Einheit, Name, Ergebnis) - Zeilen mit Menge
+
+    for g_idx, group in enumerate(ingredients or []):
+        groups.append(group.get("group", "Unbekannt"))
+        for item in group.get("items", []):
+            name = (item.get("name") or "").strip()
+            amount_raw = item.get("amount")
+            unit = item.get("unit") or ""
+            if not name or not amount_raw:
+                continue
+
+            amount, amount_note = parse_amount(amount_raw)
+            base = dict(group_index=g_idx, name=name, amount_raw=amount_raw, unit=unit, amount_note=amount_note)
+            if not amount or amount <= 0:
+                items.append(IngredientTrace(amount=None, status=STATUS_INVALID, **base))
+                warnings.append(f"{name}: Menge ungültig ({amount_raw})")
+                continue
+
+            result = resolve(name)
+            if result is None:
+                # Schätzwert: Menge wird als Gramm genommen
+                items.append(IngredientTrace(amount=amount, status=STATUS_ESTIMATE, grams=amount, **base))
+                warnings.append(f"{name}: nicht gefunden, Schätzwert")
+            else:
+                items.append(IngredientTrace(
+                    amount=amount,
+                    status=STATUS_OK,
+                    matched_name=result.get("matched_name"),
+                    source=result.get("source", ""),
+                    confidence=result.get("confidence"),
+                    from_cache=bool(result.get("from_cache")),
+                    fallback_method=result.get("fallback_method", ""),
+                    **base,
+                ))
+            lines.append((len(items) - 1, amount, unit, name, result))
+
+    # Umrechnung für alle gefundenen Zutaten auf einmal
+    found = [line for line in lines if line[4] is not None]
+    converted = iter(convert_many(((amount, unit, name) for _, amount, unit, name, _ in found), factors))
+    grams, per_100g = [], []
+    for position, amount, unit, name, result in lines:
+        if result is None:
+            grams.append(amount)
+            per_100g.append(DEFAULT_ESTIMATE)
+            continue
+        line_grams = next(converted)
+        note = describe_conversion(amount, unit, factors[(unit, name)]).note
+        items[position] = items[position]._replace(grams=line_grams, conversion_note=note)
+        grams.append(line_grams)
+        per_100g.append(result["nutrition"])
+
+    rows, total = nutrient_totals(grams, per_100g)
+    for (position, _, _, _, _), added in zip(lines, rows):
+        items[position] = items[position]._replace(added=added)
+
+    count = _portion_count(portions)
+    return NutritionResult(per_portion(total, count), total, count, groups, items, warnings)
+
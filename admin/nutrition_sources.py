@@ -0,0 +1,335 @@
+"""
+Nährwert-Abfragen bei den freien APIs (Swiss Food DB → Open Food Facts → USDA)
+
+Ohne Streamlit nutzbar - der Admin, nutrition_batch.py und Worker-Threads
+verwenden dieselben Funktionen. Nicht erreichbare APIs (Timeout, 429, 5xx)
+werfen NutritionLookupError, "nicht gefunden" liefert None.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from nutrition_cache import NutritionCache, normalize_ingredient_name
+
+try:
+    import requests
+except ImportError:  # Admin installiert requests beim Start nach
+    requests = None
+
+
+class NutritionLookupError(Exception):
+    """Nährwert-API nicht erreichbar (Timeout, 429, 5xx) - nicht dasselbe wie "nicht gefunden"."""
+
+
+def raise_if_unavailable(response, source):
+    """Wirft NutritionLookupError bei Rate-Limit oder Serverfehler.
+
+    Nur echte "nicht gefunden"-Antworten dürfen negativ gecacht werden.
+    """
+    if response.status_code == 429 or response.status_code >= 500:
+        raise NutritionLookupError(f"{source}: HTTP {response.status_code}")
+
+
+def search_swiss_food_api(name, session=None):
+    """Suche in Swiss Food Database. Returns nutrition dict or None."""
+    http = session or requests  # geteilte Session mit Connection-Pool, falls vorhanden
+    try:
+        base_url = "https://api.webapp.prod.blv.foodcase-services.com/BLV_WebApp_WS/webresources/BLV-api"
+        
+        # 1. Suche nach Lebensmittel
+        search_url = f"{base_url}/foods"
+        params = {"search": name, "lang": "de", "limit": 3}
+        response = http.get(search_url, params=params, timeout=8)
+        
+        raise_if_unavailable(response, "Swiss Food DB")
+        if response.status_code != 200:
+            return None
+            
+        foods = response.json()
+        if not foods or len(foods) == 0:
+            return None
+        
+        # 2. Hole DBID
+        food = foods[0]
+        food_id = food.get("id")
+        if not food_id:
+            return None
+            
+        dbid_url = f"{base_url}/fooddbid/{food_id}"
+        dbid_resp = http.get(dbid_url, timeout=8)
+        raise_if_unavailable(dbid_resp, "Swiss Food DB")
+        if dbid_resp.status_code != 200:
+            return None
+            
+        dbid_data = dbid_resp.json()
+        if not isinstance(dbid_data, list) or len(dbid_data) == 0:
+            return None
+        food_dbid = dbid_data[0]
+        
+        # 3. Hole Nährwerte
+        values_url = f"{base_url}/values"
+        values_params = {"DBID": food_dbid, "componentsetid": 1, "lang": "de"}
+        values_resp = http.get(values_url, params=values_params, timeout=8)
+        
+        raise_if_unavailable(values_resp, "Swiss Food DB")
+        if values_resp.status_code != 200:
+            return None
+            
+        values = values_resp.json()
+        
+        # Parse Nährwerte
+        component_map = {
+            "ENER1": "kcal", "PROT": "protein", "CHO": "carbs",
+            "FAT": "fat", "FIBC": "fiber"
+        }
+        
+        result = {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0}
+        matched_name = food.get("names", [{}])[0].get("term", name) if "names" in food else name
+        
+        for value in values:
+            component = value.get("component", {})
+            component_code = component.get("code", "")
+            
+            if component_code in component_map:
+                key = component_map[component_code]
+                value_str = value.get("value", "0")
+                try:
+                    if isinstance(value_str, str):
+                        value_str = value_str.replace(',', '.')
+                    result[key] = float(value_str)
+                except:
+                    pass
+        
+        return {"nutrition": result, "matched_name": matched_name, "source": "Swiss Food DB 🇨🇭"}
+        
+    except NutritionLookupError:
+        raise
+    except requests.exceptions.RequestException as e:
+        raise NutritionLookupError(f"Swiss Food DB: {e}")
+    except:
+        return None
+
+
+def search_openfoodfacts_api(name, session=None):
+    """Suche in Open Food Facts. Returns nutrition dict or None."""
+    http = session or requests
+    try:
+        # Open Food Facts API (weltweit, crowdsourced)
+        search_url = "https://world.openfoodfacts.org/cgi/search.pl"
+        params = {
+            "search_terms": name,
+            "search_simple": 1,
+            "action": "process",
+            "json": 1,
+            "page_size": 3,
+            "fields": "product_name,nutriments"
+        }
+        
+        response = http.get(search_url, params=params, timeout=8)
+        raise_if_unavailable(response, "Open Food Facts")
+        if response.status_code != 200:
+            return None
+            
+        data = response.json()
+        products = data.get("products", [])
+        
+        if not products:
+            return None
+        
+        # Nehme ersten Treffer
+        product = products[0]
+        nutriments = product.get("nutriments", {})
+        matched_name = product.get("product_name", name)
+        
+        # Extrahiere Nährwerte (pro 100g)
+        result = {
+            "kcal": nutriments.get("energy-kcal_100g", 0) or 0,
+            "protein": nutriments.get("proteins_100g", 0) or 0,
+            "carbs": nutriments.get("carbohydrates_100g", 0) or 0,
+            "fat": nutriments.get("fat_100g", 0) or 0,
+            "fiber": nutriments.get("fiber_100g", 0) or 0
+        }
+        
+        # Nur zurückgeben wenn mindestens kcal vorhanden
+        if result["kcal"] > 0:
+            return {"nutrition": result, "matched_name": matched_name, "source": "Open Food Facts 🌍"}
+        
+        return None
+        
+    except NutritionLookupError:
+        raise
+    except requests.exceptions.RequestException as e:
+        raise NutritionLookupError(f"Open Food Facts: {e}")
+    except:
+        return None
+
+
+def search_usda_api(name, session=None):
+    """Suche in USDA FoodData Central (kostenlos, kein Key nötig für Basis-Suche). Returns nutrition dict or None."""
+    http = session or requests
+    try:
+        # USDA FoodData Central - Foundation Foods (öffentlich)
+        search_url = "https://api.nal.usda.gov/fdc/v1/foods/search"
+        params = {
+            "query": name,
+            "pageSize": 3,
+            "api_key": "DEMO_KEY"  # DEMO_KEY erlaubt 30 requests/hour/IP
+        }
+        
+        response = http.get(search_url, params=params, timeout=8)
+        raise_if_unavailable(response, "USDA")
+        if response.status_code != 200:
+            return None
+            
+        data = response.json()
+        foods = data.get("foods", [])
+        
+        if not foods:
+            return None
+        
+        # Nehme ersten Treffer
+        food = foods[0]
+        matched_name = food.get("description", name)
+        nutrients = food.get("foodNutrients", [])
+        
+        # USDA Nutrient IDs
+        nutrient_map = {
+            1008: "kcal",      # Energy
+            1003: "protein",   # Protein
+            1005: "carbs",     # Carbohydrate
+            1004: "fat",       # Total lipid (fat)
+            1079: "fiber"      # Fiber, total dietary
+        }
+        
+        result = {"kcal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0}
+        
+        for nutrient in nutrients:
+            nutrient_id = nutrient.get("nutrientId")
+            if nutrient_id in nutrient_map:
+                key = nutrient_map[nutrient_id]
+                value = nutrient.get("value", 0)
+                result[key] = float(value) if value else 0
+        
+        # Nur zurückgeben wenn mindestens kcal vorhanden
+        if result["kcal"] > 0:
+            return {"nutrition": result, "matched_name": matched_name, "source": "USDA FoodData 🇺🇸"}
+        
+        return None
+        
+    except NutritionLookupError:
+        raise
+    except requests.exceptions.RequestException as e:
+        raise NutritionLookupError(f"USDA: {e}")
+    except:
+        return None
+
+
+# Parallele Nährwert-Abfragen: Worker gesamt und gleichzeitige Anfragen je API
+NUTRITION_LOOKUP_WORKERS = 8
+NUTRITION_PROVIDERS = (
+    ("swiss", search_swiss_food_api),
+    ("openfoodfacts", search_openfoodfacts_api),
+    ("usda", search_usda_api),
+)
+PROVIDER_CONCURRENCY = {"swiss": 4, "openfoodfacts": 2, "usda": 2}
+
+
+def create_http_session(workers: int = NUTRITION_LOOKUP_WORKERS):
+    """Geteilte HTTP-Session (Keep-Alive) und Semaphoren pro API.
+
+    Returns:
+        Tuple (requests.Session, {provider: BoundedSemaphore})
+    """
+    limits = {key: threading.BoundedSemaphore(PROVIDER_CONCURRENCY[key]) for key, _ in NUTRITION_PROVIDERS}
+    if requests is None:
+        return None, limits
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=len(NUTRITION_PROVIDERS), pool_maxsize=workers)
+    session.mount("https://", adapter)
+    return session, limits
+
+
+def lookup_ingredient_nutrition(name: str, cache: NutritionCache, session=None, limits=None):
+    """Nährwerte einer Zutat über die API-Kette Swiss → Open Food Facts → USDA.
+
+    Ergebnisse (auch "nicht gefunden") kommen aus dem persistenten Cache, sobald
+    eine Zutat einmal nachgeschlagen wurde. War eine API nicht erreichbar, wird
+    ein "nicht gefunden" nicht gecacht - sonst bliebe ein Timeout wochenlang hängen.
+
+    Args:
+        name: Zutatenname
+        cache: NutritionCache
+        session: requests.Session für Keep-Alive
+        limits: {provider: Semaphore} zur Begrenzung gleichzeitiger Anfragen je API
+
+    Returns:
+        Tuple (api_result oder None, from_cache)
+    """
+    hit, cached = cache.get(name)
+    if hit:
+        return cached, True
+    if requests is None:
+        return None, False
+
+    api_result = None
+    complete = True
+    for key, search in NUTRITION_PROVIDERS:
+        try:
+            if limits:
+                with limits[key]:
+                    api_result = search(name, session=session)
+            else:
+                api_result = search(name, session=session)
+        except NutritionLookupError as e:
+            complete = False
+            print(f"⚠️ {e}")
+            continue
+        if api_result:
+            break
+
+    if api_result or complete:
+        cache.set(name, api_result)
+    return api_result, False
+
+
+def lookup_many(names: Iterable[str], cache: NutritionCache, session=None, limits=None,
+                workers: int = NUTRITION_LOOKUP_WORKERS,
+                on_progress: Optional[Callable[[int, int, str], None]] = None) -> Dict[str, Tuple]:
+    """Schlägt viele Zutaten parallel nach (begrenzter Thread-Pool).
+
+    Jeder Name wird nur einmal abgefragt. Die Gesamtdauer liegt so etwa bei
+    der langsamsten Einzelabfrage statt bei der Summe aller Abfragen.
+
+    Args:
+        names: Zutatennamen (Duplikate erlaubt)
+        cache: NutritionCache
+        session, limits: aus create_http_session()
+        workers: maximale Anzahl paralleler Abfragen
+        on_progress: wird im aufrufenden Thread mit (fertig, gesamt, name) aufgerufen
+
+    Returns:
+        dict: normalisierter Name → (api_result oder None, from_cache)
+    """
+    unique = {}
+    for name in names:
+        unique.setdefault(normalize_ingredient_name(name), name)
+    if not unique:
+        return {}
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=min(workers, len(unique)), thread_name_prefix="nutrition") as executor:
+        futures = {
+            executor.submit(lookup_ingredient_nutrition, name, cache, session, limits): key
+            for key, name in unique.items()
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            key = futures[future]
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                print(f"⚠️ Nährwert-Abfrage '{unique[key]}' fehlgeschlagen: {e}")
+                results[key] = (None, False)
+            if on_progress:
+                on_progress(done, len(unique), unique[key])
+    return results
@@ -6,6 +6,8 @@ import os
 import deepl
 from pathlib import Path
 
+from translation_memory import shared_memory
+
 # DeepL API Setup
 DEEPL_API_KEY = os.getenv('DEEPL_API_KEY', '48bab1ac-46c3-411b-85f6-1d40aac7a2e9:fx')
 translator = deepl.Translator(DEEPL_API_KEY)
@@ -77,11 +79,17 @@ def main():
         if lang_code not in data:
             data[lang_code] = {}
         
-        # Translate and add missing keys
+        # Translate and add missing keys (Translation Memory first)
+        memory = shared_memory()
         for key, german_text in new_keys.items():
-            print(f"  ✅ {key}")
-            result = translator.translate_text(german_text, target_lang=deepl_code)
-            set_nested_key(data[lang_code], key, result.text)
+            translated = memory.get(german_text, deepl_code)
+            if translated is None:
+                translated = translator.translate_text(german_text, target_lang=deepl_code).text
+                memory.set(german_text, translated, deepl_code)
+                print(f"  ✅ {key}")
+            else:
+                print(f"  🧠 {key}")
+            set_nested_key(data[lang_code], key, translated)
         
         # Save
         with open(file_path, 'w', encoding='utf-8') as f:
@@ -93,6 +101,7 @@ def main():
     usage = translator.get_usage()
     print(f"\n📊 Finales DeepL Quota:")
     print(f"   Verbraucht: {usage.character.count:,} / 500,000 Zeichen ({usage.character.count/5000:.1f}%)")
+    print(shared_memory().summary())
     print(f"\n✅ Fertig!")
 
 if __name__ == "__main__":
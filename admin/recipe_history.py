@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Versionshistorie für recipes.json (content-adressiert)
+
+Statt bei jedem Speichern die komplette recipes.json zu kopieren, wird jedes
+Rezept als komprimierter Blob unter seinem Inhalts-Hash abgelegt. Pro Speichern
+entsteht nur ein kleines Manifest mit den Hashes, die sich gegenüber dem
+Vorgänger geändert haben. Unveränderte Rezepte (inkl. großer Bilder) werden
+so nie doppelt gespeichert.
+
+Layout in recipes_history/:
+    objects/<hash>.json.gz        ← ein Rezept pro Blob
+    manifests/<snapshot_id>.json  ← Liste der Hashes (voll oder als Delta)
+    recipes_YYYYMMDD_HHMMSS.json  ← alte Vollkopien (weiterhin lesbar)
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+HISTORY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recipes_history")
+MAX_SNAPSHOTS = 5000    # Wiederherstellungspunkte, die behalten werden
+PRUNE_BATCH = 100       # Beim Aufräumen gleich etwas Luft schaffen
+FULL_EVERY = 50         # Spätestens jedes 50. Manifest enthält die volle Liste
+HASH_LENGTH = 20        # Hex-Zeichen des SHA-256
+
+LEGACY_PREFIX = "recipes_"
+
+
+def _objects_dir(history_dir: str) -> str:
+    return os.path.join(history_dir, "objects")
+
+
+def _manifests_dir(history_dir: str) -> str:
+    return os.path.join(history_dir, "manifests")
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """Schreibt über eine temporäre Datei, damit nie halbe Dateien entstehen."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _serialize_recipe(recipe: dict) -> bytes:
+    """Kompakte, stabile Serialisierung eines Rezepts (Schlüsselreihenfolge bleibt erhalten)."""
+    return json.dumps(recipe, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def store_recipe_blob(recipe: dict, history_dir: str = HISTORY_DIR) -> str:
+    """Legt ein Rezept content-adressiert ab.
+
+    Returns:
+        str: Hash des Rezepts
+    """
+    data = _serialize_recipe(recipe)
+    blob_hash = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+    blob_path = os.path.join(_objects_dir(history_dir), f"{blob_hash}.json.gz")
+    if not os.path.exists(blob_path):
+        _write_atomic(blob_path, gzip.compress(data, compresslevel=6))
+    return blob_hash
+
+
+@lru_cache(maxsize=4096)
+def _read_blob(blob_hash: str, history_dir: str) -> str:
+    """Blobs sind unveränderlich - einmal gelesen bleiben sie im Speicher."""
+    blob_path = os.path.join(_objects_dir(history_dir), f"{blob_hash}.json.gz")
+    with open(blob_path, "rb") as f:
+        return gzip.decompress(f.read()).decode("utf-8")
+
+
+@lru_cache(maxsize=1024)
+def _read_manifest(snapshot_id: str, history_dir: str) -> dict:
+    manifest_path = os.path.join(_manifests_dir(history_dir), f"{snapshot_id}.json")
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _manifest_ids(history_dir: str) -> List[str]:
+    """Alle Snapshot-IDs, älteste zuerst (IDs sind zeitlich sortierbar)."""
+    manifests_dir = _manifests_dir(history_dir)
+    if not os.path.exists(manifests_dir):
+        return []
+    return sorted(f[:-5] for f in os.listdir(manifests_dir) if f.endswith(".json"))
+
+
+def has_snapshots(history_dir: str = HISTORY_DIR) -> bool:
+    """True sobald mindestens ein content-adressierter Snapshot existiert."""
+    return bool(_manifest_ids(history_dir))
+
+
+def resolve_hashes(snapshot_id: str, history_dir: str = HISTORY_DIR) -> List[str]:
+    """Rekonstruiert die vollständige Hash-Liste eines Snapshots.
+
+    Delta-Manifeste werden bis zum nächsten vollen Manifest zurückverfolgt
+    (höchstens FULL_EVERY Schritte).
+    """
+    manifest = _read_manifest(snapshot_id, history_dir)
+    if "recipes" in manifest:
+        return list(manifest["recipes"])
+
+    hashes = resolve_hashes(manifest["parent"], history_dir)
+    count = manifest["count"]
+    hashes = hashes[:count] + [""] * max(0, count - len(hashes))
+    for idx, blob_hash in manifest.get("changes", {}).items():
+        hashes[int(idx)] = blob_hash
+    return hashes
+
+
+def record_snapshot(recipes: List[dict], history_dir: str = HISTORY_DIR) -> Optional[str]:
+    """Speichert den aktuellen Stand als Wiederherstellungspunkt.
+
+    Args:
+        recipes: Liste der Rezepte (so wie sie gespeichert werden)
+        history_dir: Ordner der Versionshistorie
+
+    Returns:
+        Snapshot-ID oder None wenn sich nichts geändert hat
+    """
+    os.makedirs(_objects_dir(history_dir), exist_ok=True)
+    os.makedirs(_manifests_dir(history_dir), exist_ok=True)
+
+    hashes = [store_recipe_blob(recipe, history_dir) for recipe in recipes]
+
+    existing = _manifest_ids(history_dir)
+    parent_id = existing[-1] if existing else None
+    parent_hashes = resolve_hashes(parent_id, history_dir) if parent_id else None
+
+    if parent_hashes == hashes:
+        return None  # Keine Änderung - kein neuer Wiederherstellungspunkt
+
+    now = datetime.now()
+    snapshot_id = now.strftime("%Y%m%d_%H%M%S_%f")
+    manifest = {"id": snapshot_id, "created_at": now.isoformat(), "count": len(hashes)}
+
+    changes = {}
+    if parent_hashes is not None:
+        changes = {
+            str(idx): blob_hash for idx, blob_hash in enumerate(hashes)
+            if idx >= len(parent_hashes) or parent_hashes[idx] != blob_hash
+        }
+
+    parent_depth = _read_manifest(parent_id, history_dir).get("depth", 0) if parent_id else 0
+    if parent_id is None or parent_depth + 1 >= FULL_EVERY or len(changes) * 2 > len(hashes):
+        manifest["recipes"] = hashes
+        manifest["depth"] = 0
+    else:
+        manifest["parent"] = parent_id
+        manifest["changes"] = changes
+        manifest["depth"] = parent_depth + 1
+    manifest["changed"] = len(changes) if parent_hashes is not None else len(hashes)
+
+    manifest_path = os.path.join(_manifests_dir(history_dir), f"{snapshot_id}.json")
+    _write_atomic(manifest_path, json.dumps(manifest, separators=(",", ":")).encode("utf-8"))
+
+    if len(existing) + 1 > MAX_SNAPSHOTS:
+        prune_snapshots(MAX_SNAPSHOTS - PRUNE_BATCH, history_dir)
+
+    return snapshot_id
+
+
+def load_snapshot(snapshot_id: str, history_dir: str = HISTORY_DIR) -> List[dict]:
+    """Baut die Rezeptliste eines Snapshots wieder zusammen.
+
+    Alte Vollkopien (recipes_*.json) werden direkt geladen.
+    """
+    if snapshot_id.startswith(LEGACY_PREFIX):
+        with open(os.path.join(history_dir, snapshot_id), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    return [json.loads(_read_blob(h, history_dir)) for h in resolve_hashes(snapshot_id, history_dir)]
+
+
+def list_snapshots(history_dir: str = HISTORY_DIR) -> List[Dict]:
+    """Listet alle Wiederherstellungspunkte, neueste zuerst.
+
+    Liest keine Manifeste - der Zeitstempel steckt in der Snapshot-ID, damit
+    die Liste auch bei tausenden Snapshots sofort da ist.
+
+    Returns:
+        list: Dictionaries mit {id, created_at, legacy}
+    """
+    snapshots = []
+
+    for snapshot_id in _manifest_ids(history_dir):
+        try:
+            created_at = datetime.strptime(snapshot_id, "%Y%m%d_%H%M%S_%f")
+        except ValueError:
+            continue
+        snapshots.append({"id": snapshot_id, "created_at": created_at, "legacy": False})
+
+    # Alte Vollkopien aus der Zeit vor der content-adressierten Historie
+    if os.path.exists(history_dir):
+        for filename in os.listdir(history_dir):
+            if not (filename.startswith(LEGACY_PREFIX) and filename.endswith(".json")):
+                continue
+            timestamp_str = filename[len(LEGACY_PREFIX):-5]
+            try:
+                created_at = datetime.strptime(timestamp_str, "%Y%m%d_%H%M%S")
+            except ValueError:
+                continue
+            snapshots.append({"id": filename, "created_at": created_at, "legacy": True})
+
+    snapshots.sort(key=lambda s: s["created_at"], reverse=True)
+    return snapshots
+
+
+def snapshot_info(snapshot_id: str, history_dir: str = HISTORY_DIR) -> Dict:
+    """Details eines Snapshots (Anzahl Rezepte, davon geändert).
+
+    Returns:
+        dict: {count, changed} - bei alten Vollkopien None-Werte
+    """
+    if snapshot_id.startswith(LEGACY_PREFIX):
+        return {"count": None, "changed": None}
+    manifest = _read_manifest(snapshot_id, history_dir)
+    return {"count": manifest.get("count", 0), "changed": manifest.get("changed")}
+
+
+def prune_snapshots(keep: int, history_dir: str = HISTORY_DIR) -> int:
+    """Entfernt die ältesten Snapshots und nicht mehr referenzierte Blobs.
+
+    Der älteste verbleibende Snapshot wird vorher als volles Manifest neu
+    geschrieben, damit keine Delta-Kette ins Leere zeigt.
+
+    Returns:
+        int: Anzahl entfernter Snapshots
+    """
+    ids = _manifest_ids(history_dir)
+    if len(ids) <= keep:
+        return 0
+
+    cut = len(ids) - keep
+    removed, kept = ids[:cut], ids[cut:]
+
+    if kept:
+        oldest = dict(_read_manifest(kept[0], history_dir))
+        if "recipes" not in oldest:
+            oldest["recipes"] = resolve_hashes(kept[0], history_dir)
+            oldest.pop("parent", None)
+            oldest.pop("changes", None)
+            oldest["depth"] = 0
+            manifest_path = os.path.join(_manifests_dir(history_dir), f"{kept[0]}.json")
+            _write_atomic(manifest_path, json.dumps(oldest, separators=(",", ":")).encode("utf-8"))
+
+    for snapshot_id in removed:
+        try:
+            os.remove(os.path.join(_manifests_dir(history_dir), f"{snapshot_id}.json"))
+        except OSError:
+            pass
+    _read_manifest.cache_clear()
+
+    # Blobs aufräumen, die von keinem verbleibenden Snapshot mehr gebraucht werden
+    referenced = set()
+    for snapshot_id in kept:
+        referenced.update(resolve_hashes(snapshot_id, history_dir))
+    objects_dir = _objects_dir(history_dir)
+    for filename in os.listdir(objects_dir):
+        if filename.endswith(".json.gz") and filename[:-8] not in referenced:
+            try:
+                os.remove(os.path.join(objects_dir, filename))
+            except OSError:
+                pass
+
+    return len(removed)
@@ -0,0 +1,214 @@
+"""
+Invertierter Suchindex für die Sidebar-Suche (ohne Streamlit)
+
+Statt bei jedem Tastendruck alle Rezepte zu durchsuchen, wird pro
+Katalog-Stand einmal ein Index gebaut:
+
+- Wörter aus Titel, Untertitel, Zutaten, Tags und Tipps, kleingeschrieben
+  und mit gefalteten Umlauten ("Käse" findet man mit "käse", "kaese" und
+  "kase")
+- Postings als Bitmasken (Python-int, ein Bit pro Rezept), Kategorie und
+  Schwierigkeit ebenso - Filtern ist eine Schnittmenge mit &
+- Wortanfänge über das sortierte Vokabular (bisect), Wortteile wie
+  "tofu" in "Räuchertofu" über einen Scan des Vokabulars statt der Rezepte
+- optional Sortierung nach Relevanz (Titel zählt mehr als Tipps)
+
+    index = RecipeSearchIndex(recipes)
+    index.search("tofu", category="Hauptgerichte", rank=True)
+"""
+
+import bisect
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Gewicht eines Treffers pro Feld (für die Relevanz)
+FIELD_WEIGHTS = {
+    "title": 5.0,
+    "tags": 3.0,
+    "subtitle": 2.0,
+    "ingredients": 2.0,
+    "tips": 1.0,
+}
+# Ganzes Wort > Wortanfang > Wortteil
+MATCH_EXACT = 1.0
+MATCH_PREFIX = 0.7
+MATCH_INFIX = 0.4
+
+INFIX_CACHE_SIZE = 1000  # gemerkte Suchwörter pro Index
+
+DEFAULT_CATEGORY = "Ohne Kategorie"  # wie im Kategorie-Filter der Sidebar
+
+UMLAUTS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def strip_accents(text: str) -> str:
+    """Entfernt Akzente und Umlaut-Punkte ("käse" → "kase", "crème" → "creme")."""
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+
+
+def fold_variants(text: str) -> Tuple[str, str]:
+    """Beide Schreibweisen eines Texts: mit ae/oe/ue und ganz ohne Umlaute."""
+    text = unicodedata.normalize("NFC", text).lower()
+    return strip_accents(text.translate(UMLAUTS)), strip_accents(text)
+
+
+@lru_cache(maxsize=65536)
+def tokenize(text: str) -> FrozenSet[str]:
+    """Alle Wörter eines Texts in beiden Schreibweisen (gemerkt - "Salz" steht in fast jedem Rezept)."""
+    tokens = set()
+    for variant in fold_variants(text):
+        tokens.update(TOKEN_RE.findall(variant))
+    return frozenset(tokens)
+
+
+def query_tokens(query: str) -> List[str]:
+    """Wörter einer Suchanfrage (ae/oe/ue-Schreibweise, der Index kennt beide)."""
+    return TOKEN_RE.findall(fold_variants(query)[0])
+
+
+def recipe_fields(recipe: dict) -> Iterator[Tuple[str, str]]:
+    """(Feld, Text) aller durchsuchbaren Texte eines Rezepts."""
+    yield "title", recipe.get("title") or ""
+    yield "subtitle", recipe.get("subtitle") or ""
+    for group in recipe.get("ingredients") or []:
+        if isinstance(group, dict):
+            for item in group.get("items") or []:
+                if isinstance(item, dict):
+                    yield "ingredients", item.get("name") or ""
+    tags = recipe.get("tags") or []
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    for tag in tags:
+        if isinstance(tag, str):
+            yield "tags", tag
+    tips = recipe.get("tips") or []
+    if isinstance(tips, str):
+        tips = [tips]
+    for tip in tips:
+        if isinstance(tip, str):
+            yield "tips", tip
+
+
+def mask_from_positions(positions: Iterable[int]) -> int:
+    """Bitmaske aus Positionen - über ein bytearray, statt große ints immer wieder zu verodern."""
+    positions = list(positions)
+    if not positions:
+        return 0
+    bits = bytearray(max(positions) // 8 + 1)
+    for position in positions:
+        bits[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(bits, "little")
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Positionen der gesetzten Bits, aufsteigend."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class RecipeSearchIndex:
+    """Unveränderlicher Index über einen Katalog-Stand."""
+
+    def __init__(self, recipes: Sequence[dict]):
+        self.recipes = recipes
+        self.all_mask = (1 << len(recipes)) - 1
+        self._weights: Dict[str, Dict[int, float]] = {}      # Wort → Position → Gewicht
+        self._infix_cache: Dict[str, List[str]] = {}
+        categories: Dict[str, List[int]] = {}
+        difficulties: Dict[str, List[int]] = {}
+
+        for position, recipe in enumerate(recipes):
+            if not isinstance(recipe, dict):
+                continue
+            categories.setdefault(recipe.get("category", DEFAULT_CATEGORY), []).append(position)
+            difficulties.setdefault(recipe.get("difficulty"), []).append(position)
+            for field, text in recipe_fields(recipe):
+                weight = FIELD_WEIGHTS[field]
+                for token in tokenize(text):
+                    weights = self._weights.setdefault(token, {})
+                    if weights.get(position, 0.0) < weight:
+                        weights[position] = weight
+
+        # Bitmasken erst am Ende bauen (Wort → Rezepte, Facette → Rezepte)
+        self._postings = {token: mask_from_positions(weights) for token, weights in self._weights.items()}
+        self._categories = {value: mask_from_positions(positions) for value, positions in categories.items()}
+        self._difficulties = {value: mask_from_positions(positions) for value, positions in difficulties.items()}
+        self._vocabulary = sorted(self._postings)
+
+    def __len__(self) -> int:
+        return len(self.recipes)
+
+    def categories(self) -> List[str]:
+        """Alle vorkommenden Kategorien, sortiert."""
+        return sorted(self._categories)
+
+    def _matching_terms(self, token: str) -> List[Tuple[str, float]]:
+        """Wörter des Vokabulars, die zum Suchwort passen, mit Trefferart."""
+        terms = []
+        start = bisect.bisect_left(self._vocabulary, token)
+        end = bisect.bisect_right(self._vocabulary, token + "\uffff")
+        for term in self._vocabulary[start:end]:
+            terms.append((term, MATCH_EXACT if term == token else MATCH_PREFIX))
+        # Wortteile ("tofu" in "räuchertofu") - Scan über das Vokabular, pro Suchwort gemerkt
+        infix = self._infix_cache.get(token)
+        if infix is None:
+            infix = [term for term in self._vocabulary if token in term and not term.startswith(token)]
+            if len(self._infix_cache) >= INFIX_CACHE_SIZE:
+                self._infix_cache.clear()
+            self._infix_cache[token] = infix
+        terms.extend((term, MATCH_INFIX) for term in infix)
+        return terms
+
+    def search_positions(self, query: str = "", category: Optional[str] = None,
+                         difficulty: Optional[str] = None, rank: bool = False) -> List[int]:
+        """Positionen der passenden Rezepte.
+
+        Args:
+            query: Suchtext - alle Wörter müssen vorkommen (als Wort, Wortanfang oder Wortteil)
+            category, difficulty: Facetten-Filter (None = alle)
+            rank: nach Relevanz sortieren statt nach Katalog-Reihenfolge
+
+        Returns:
+            Liste der Positionen im Katalog
+        """
+        mask = self.all_mask
+        if category is not None:
+            mask &= self._categories.get(category, 0)
+        if difficulty is not None:
+            mask &= self._difficulties.get(difficulty, 0)
+
+        tokens = query_tokens(query or "")
+        matches = []
+        for token in tokens:
+            if not mask:
+                break
+            terms = self._matching_terms(token)
+            token_mask = 0
+            for term, _ in terms:
+                token_mask |= self._postings[term]
+            mask &= token_mask
+            matches.append(terms)
+
+        positions = list(iter_bits(mask))
+        if rank and tokens:
+            scores = {position: 0.0 for position in positions}
+            for terms in matches:
+                best: Dict[int, float] = {}
+                for term, factor in terms:
+                    for position, weight in self._weights[term].items():
+                        if position in scores and best.get(position, 0.0) < weight * factor:
+                            best[position] = weight * factor
+                for position, score in best.items():
+                    scores[position] += score
+            positions.sort(key=lambda position: (-scores[position], position))
+        return positions
+
+    def search(self, query: str = "", category: Optional[str] = None,
+               difficulty: Optional[str] = None, rank: bool = False) -> List[dict]:
+        """Wie search_positions, liefert aber die Rezepte selbst."""
+        return [self.recipes[position] for position in self.search_positions(query, category, difficulty, rank)]
@@ -0,0 +1,129 @@
+"""
+Katalog-Statistik für das Sidebar-Dashboard (ohne Streamlit)
+
+Zähler pro Kennzahl (Kategorie, Schwierigkeit, veröffentlicht, ...) und ein
+Max-Heap auf updated_at werden vom RecipeStore bei jedem neuen Stand
+nachgeführt: nur Rezepte, deren Beitrag sich geändert hat, verschieben
+Zähler oder landen neu im Heap. Das Dashboard liest danach nur noch.
+
+Weitere Kennzahlen: einen Eintrag in METRICS ergänzen - sie werden im
+selben Durchlauf mitgezählt.
+"""
+
+import heapq
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+# Kennzahl → Schlüssel eines Rezepts
+METRICS: Dict[str, Callable[[dict], Hashable]] = {
+    "category": lambda recipe: recipe.get("category", "Ohne Kategorie"),
+    "difficulty": lambda recipe: recipe.get("difficulty", "Unbekannt"),
+    "published": lambda recipe: bool(recipe.get("published", True)),
+}
+
+
+class _Newest:
+    """Heap-Eintrag mit umgekehrter Ordnung - heapq ist ein Min-Heap."""
+
+    __slots__ = ("timestamp", "key")
+
+    def __init__(self, timestamp: str, key: str):
+        self.timestamp = timestamp
+        self.key = key
+
+    def __lt__(self, other: "_Newest") -> bool:
+        return self.timestamp > other.timestamp
+
+
+class CatalogStats:
+    """Inkrementell gepflegte Aggregate eines Katalogs (thread-safe)."""
+
+    def __init__(self, metrics: Optional[Dict[str, Callable[[dict], Hashable]]] = None):
+        self.metrics = dict(metrics or METRICS)
+        self.total = 0
+        self.updates = 0  # Rezepte, deren Beitrag sich beim letzten update() geändert hat
+        self._counts: Dict[str, Dict[Hashable, int]] = {name: {} for name in self.metrics}
+        # Rezept-Schlüssel → (Metrik-Schlüssel, Zeitstempel, Titel)
+        self._contributions: Dict[str, Tuple[Tuple[Hashable, ...], Optional[str], str]] = {}
+        self._newest: List[_Newest] = []
+        self._lock = threading.Lock()
+
+    def _contribution(self, recipe: dict) -> Tuple[Tuple[Hashable, ...], Optional[str], str]:
+        keys = tuple(extract(recipe) for extract in self.metrics.values())
+        timestamp = recipe.get("updated_at") or recipe.get("created_at")
+        return keys, str(timestamp) if timestamp else None, recipe.get("title", "Unbekannt")
+
+    def _count(self, keys: Tuple[Hashable, ...], delta: int) -> None:
+        for name, key in zip(self.metrics, keys):
+            counts = self._counts[name]
+            counts[key] = counts.get(key, 0) + delta
+            if counts[key] <= 0:
+                del counts[key]
+
+    def update(self, recipes: Sequence[dict]) -> None:
+        """Gleicht die Aggregate an einen neuen Katalog-Stand an.
+
+        Rezepte werden über ihre ID zugeordnet (ohne ID über die Position);
+        unveränderte Beiträge kosten nur einen Vergleich.
+        """
+        with self._lock:
+            seen = set()
+            changed = 0
+            for position, recipe in enumerate(recipes):
+                if not isinstance(recipe, dict):
+                    continue
+                key = recipe.get("id") or f"#{position}"
+                seen.add(key)
+                contribution = self._contribution(recipe)
+                previous = self._contributions.get(key)
+                if previous == contribution:
+                    continue
+                changed += 1
+                if previous is not None:
+                    self._count(previous[0], -1)
+                self._count(contribution[0], 1)
+                self._contributions[key] = contribution
+                if contribution[1] and (previous is None or previous[1] != contribution[1]):
+                    heapq.heappush(self._newest, _Newest(contribution[1], key))
+            for key in [key for key in self._contributions if key not in seen]:
+                self._count(self._contributions.pop(key)[0], -1)
+                changed += 1
+            self.total = len(self._contributions)
+            self.updates = changed
+            # Heap wächst durch veraltete Einträge - gelegentlich neu aufbauen
+            if len(self._newest) > 2 * self.total + 64:
+                self._newest = [
+                    _Newest(timestamp, key)
+                    for key, (_, timestamp, _) in self._contributions.items() if timestamp
+                ]
+                heapq.heapify(self._newest)
+
+    def counts(self, metric: str) -> Dict[Hashable, int]:
+        """Anzahl Rezepte pro Schlüssel einer Kennzahl (Kopie)."""
+        with self._lock:
+            return dict(self._counts[metric])
+
+    def top(self, metric: str, limit: int = 5) -> List[Tuple[Hashable, int]]:
+        """Häufigste Schlüssel einer Kennzahl, absteigend."""
+        with self._lock:
+            return heapq.nlargest(limit, self._counts[metric].items(), key=lambda item: item[1])
+
+    def values(self, metric: str) -> List[Any]:
+        """Alle vorkommenden Schlüssel einer Kennzahl, sortiert (z.B. für Filter)."""
+        with self._lock:
+            return sorted(self._counts[metric], key=str)
+
+    def most_recent(self) -> Optional[Tuple[str, str]]:
+        """Zuletzt bearbeitetes Rezept als (Titel, Zeitstempel) oder None.
+
+        Veraltete Heap-Einträge (Rezept gelöscht oder erneut bearbeitet)
+        werden dabei verworfen.
+        """
+        with self._lock:
+            while self._newest:
+                entry = self._newest[0]
+                current = self._contributions.get(entry.key)
+                if current is not None and current[1] == entry.timestamp:
+                    return current[2], entry.timestamp
+                heapq.heappop(self._newest)
+            return None
@@ -0,0 +1,237 @@
+"""
+recipes.json lesen und schreiben (ohne Streamlit)
+
+Gemeinsame Helfer für den Admin und die Skripte (nutrition_batch.py,
+translate_all_recipes.py):
+
+- stabile Rezept-IDs, über die Übersetzungen und Screens ein Rezept
+  wiederfinden, auch wenn sich Titel oder Position ändern
+- atomares Speichern mit Wiederherstellungspunkt
+- RecipeStore: hält den geparsten Katalog im Speicher und liest recipes.json
+  nur neu, wenn sich die Datei geändert hat; Rezepte sind über ID oder Slug
+  in O(1) auffindbar
+"""
+
+import copy
+import json
+import os
+import threading
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from atomic_io import atomic_write_bytes
+from generate_sitemap import generate_slug
+from recipe_stats import CatalogStats
+from recipe_history import has_snapshots, record_snapshot
+
+RECIPES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recipes.json")
+RECIPE_ID_LENGTH = 12  # Hex-Zeichen
+
+
+def new_recipe_id() -> str:
+    """Zufällige, kurze ID ("3f9c0a17b2de")."""
+    return uuid.uuid4().hex[:RECIPE_ID_LENGTH]
+
+
+def ensure_recipe_ids(recipes: List[Dict]) -> int:
+    """Vergibt fehlende IDs in place.
+
+    Kopien, die eine ID mitgenommen haben (Duplizieren, Variante), bekommen
+    eine eigene - das erste Rezept mit der ID behält sie.
+
+    Returns:
+        Anzahl neu vergebener IDs
+    """
+    seen = set()
+    assigned = 0
+    for recipe in recipes:
+        recipe_id = recipe.get("id")
+        if not recipe_id or recipe_id in seen:
+            recipe_id = new_recipe_id()
+            while recipe_id in seen:
+                recipe_id = new_recipe_id()
+            recipe["id"] = recipe_id
+            assigned += 1
+        seen.add(recipe_id)
+    return assigned
+
+
+def recipe_slug(recipe: Dict) -> str:
+    """URL-Slug eines Rezepts (eigenes Feld "slug" oder aus dem Titel, wie in der Sitemap)."""
+    return recipe.get("slug") or generate_slug(recipe.get("title", ""))
+
+
+def save_catalog(recipes: List[Dict], path: str = RECIPES_FILE) -> None:
+    """Schreibt recipes.json atomar und legt einen Wiederherstellungspunkt an.
+
+    Fehler der Version History werden nur gemeldet - sie verhindern das
+    Speichern nicht.
+
+    Raises:
+        ChecksumMismatchError: Geschriebene Bytes weichen ab, recipes.json bleibt unverändert
+        OSError: recipes.json konnte nicht geschrieben werden
+    """
+    # Einmalig den bisherigen Stand als Ausgangspunkt sichern
+    # (danach speichert jeder Save nur noch geänderte Rezepte als Blobs)
+    if os.path.exists(path) and not has_snapshots():
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                record_snapshot(json.load(f))
+        except Exception as e:
+            print(f"⚠️ Version History: Ausgangspunkt konnte nicht gesichert werden: {e}")
+    # Atomar (Temp-Datei → fsync → rename), verifiziert über die Prüfsumme der Bytes
+    atomic_write_bytes(path, json.dumps(recipes, ensure_ascii=False, indent=2).encode("utf-8"))
+    try:
+        record_snapshot(recipes)
+    except Exception as e:
+        print(f"⚠️ Version History fehlgeschlagen: {e}")
+
+
+class RecipeStore:
+    """Geparster Katalog, einmal pro Prozess (thread-safe).
+
+    recipes.json wird nur neu gelesen, wenn sich mtime oder Größe geändert
+    haben (z.B. durch ein Skript oder git pull). Eigene Saves übernimmt
+    replace() direkt, ohne die Datei erneut zu parsen. `generation` zählt
+    jeden neuen Stand - abgeleitete Daten (Suchindex, Statistik) können
+    sich daran orientieren.
+
+    Pro Stand gibt es zwei Indizes: ID → Position und Slug → ID. Screens
+    adressieren Rezepte darüber statt über recipes.index(recipe). Die
+    Dashboard-Statistik (CatalogStats) wird bei jedem Stand nachgeführt.
+    """
+
+    def __init__(self, path: str = RECIPES_FILE, assign_ids: bool = False):
+        """
+        Args:
+            path: recipes.json
+            assign_ids: fehlende IDs beim Laden vergeben und die Datei einmalig
+                        mit Wiederherstellungspunkt zurückschreiben (Migration)
+        """
+        self.path = path
+        self.assign_ids = assign_ids
+        self.generation = 0
+        self.loads = 0  # wie oft recipes.json tatsächlich geparst wurde
+        self._recipes: Tuple[Dict, ...] = ()
+        self._positions: Dict[str, int] = {}
+        self._slugs: Dict[str, str] = {}
+        self._derived: Dict[str, Tuple[int, Any]] = {}
+        self._stats = CatalogStats()
+        self._signature: Optional[Tuple[int, int]] = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _refresh(self) -> None:
+        signature = self._file_signature()
+        if self._loaded and signature == self._signature:
+            return
+        recipes = []
+        if signature is not None:
+            with open(self.path, "r", encoding="utf-8") as f:
+                recipes = json.load(f)
+            self.loads += 1
+            if self.assign_ids and ensure_recipe_ids(recipes):
+                save_catalog(recipes, self.path)
+                signature = self._file_signature()
+        self._set(recipes, signature)
+
+    def _set(self, recipes: List[Dict], signature: Optional[Tuple[int, int]]) -> None:
+        self._recipes = tuple(recipes)
+        self._positions = {}
+        self._slugs = {}
+        for position, recipe in enumerate(self._recipes):
+            recipe_id = recipe.get("id")
+            if recipe_id:
+                self._positions.setdefault(recipe_id, position)
+                self._slugs.setdefault(recipe_slug(recipe), recipe_id)
+        self._stats.update(self._recipes)
+        self._signature = signature
+        self._loaded = True
+        self.generation += 1
+
+    def recipes(self) -> Tuple[Dict, ...]:
+        """Aktueller Katalog als Tupel - nur lesen, die Dicts werden geteilt."""
+        with self._lock:
+            self._refresh()
+            return self._recipes
+
+    def positions(self) -> Dict[str, int]:
+        """ID → Position im Katalog (nur lesen)."""
+        with self._lock:
+            self._refresh()
+            return self._positions
+
+    def get(self, recipe_id: str) -> Optional[Dict]:
+        """Rezept zur ID oder None."""
+        with self._lock:
+            self._refresh()
+            position = self._positions.get(recipe_id)
+            return None if position is None else self._recipes[position]
+
+    def id_for_slug(self, slug: str) -> Optional[str]:
+        """Rezept-ID zum URL-Slug oder None."""
+        with self._lock:
+            self._refresh()
+            return self._slugs.get(slug)
+
+    def editable(self) -> List[Dict]:
+        """Liste mit flachen Kopien der Rezepte zum Ändern und Speichern.
+
+        Felder direkt am Rezept dürfen überschrieben werden; verschachtelte
+        Listen (Zutaten, Schritte) vorher mit copy.deepcopy kopieren.
+        """
+        return self.editable_with_positions()[0]
+
+    def editable_with_positions(self) -> Tuple[List[Dict], Dict[str, int]]:
+        """Wie editable(), dazu ID → Position - beides aus demselben Stand.
+
+        Getrennte Aufrufe von editable() und positions() könnten zwischen
+        zwei Ständen liegen (Datei dazwischen geändert) und dann auf
+        falsche Rezepte zeigen.
+        """
+        with self._lock:
+            self._refresh()
+            return [dict(recipe) for recipe in self._recipes], self._positions
+
+    def stats(self) -> CatalogStats:
+        """Zähler und "zuletzt bearbeitet" des aktuellen Stands (nur lesen)."""
+        with self._lock:
+            self._refresh()
+            return self._stats
+
+    def derived(self, name: str, build: Callable[[Tuple[Dict, ...]], Any]) -> Any:
+        """Abgeleitete Daten (z.B. Suchindex), einmal pro Stand gebaut.
+
+        Args:
+            name: Schlüssel der abgeleiteten Daten
+            build: baut sie aus dem Katalog-Tupel (läuft ohne Lock)
+        """
+        with self._lock:
+            self._refresh()
+            generation, recipes = self.generation, self._recipes
+            cached = self._derived.get(name)
+            if cached is not None and cached[0] == generation:
+                return cached[1]
+        value = build(recipes)
+        with self._lock:
+            if self.generation == generation:
+                self._derived[name] = (generation, value)
+        return value
+
+    def replace(self, recipes: List[Dict]) -> None:
+        """Übernimmt einen gerade gespeicherten Stand (ohne erneutes Parsen)."""
+        snapshot = copy.deepcopy(list(recipes))
+        with self._lock:
+            self._set(snapshot, self._file_signature())
+
+    def invalidate(self) -> None:
+        """Erzwingt beim nächsten Zugriff ein Neulesen der Datei."""
+        with self._lock:
+            self._loaded = False
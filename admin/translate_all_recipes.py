@@ -4,21 +4,30 @@ Pre-Translation Script für vegantalia.de
 Übersetzt alle Rezepte in alle unterstützten Sprachen beim Deploy
 """
 
+import argparse
+import copy
+import hashlib
 import json
 import os
 import sys
-import time
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, Optional, Tuple, List
+from typing import Callable, Dict, Any, Optional, Tuple, List
+
+from atomic_io import atomic_write_bytes
+from deepl_client import DeepLClient, DeepLError, DeepLQuotaExceeded
+from recipe_store import ensure_recipe_ids, save_catalog
+from translation_journal import TranslationJournal, open_journal
+from translation_memory import TranslationMemory
 
 # Konstanten
-API_TIMEOUT = 30  # Sekunden
-MAX_RETRIES = 3
-RETRY_DELAY = 2  # Sekunden
-RATE_LIMIT_SLEEP = 0.5  # Sekunden zwischen Requests
-TITLE_SIMILARITY_THRESHOLD = 0.8  # 80% Ähnlichkeit für Fuzzy Matching
+TRANSLATION_CHUNK_RECIPES = 5  # Rezepte pro Block, danach wird gespeichert
+TITLE_SIMILARITY_THRESHOLD = 0.8  # 80% Ähnlichkeit für Fuzzy Matching (nur Übersetzungen ohne ID)
+FINGERPRINT_LENGTH = 16  # Hex-Zeichen pro Quelltext-Fingerprint
+FEATURED_FIELDS = ('featuredWeek', 'featuredMonth', 'featuredSeason')  # werden zuerst übersetzt
 QUOTA_WARNING_THRESHOLD = 80  # Warnung bei 80% Verbrauch
 QUOTA_CRITICAL_THRESHOLD = 95  # Kritisch bei 95% Verbrauch
 
@@ -112,181 +121,221 @@ def check_deepl_quota() -> Optional[int]:
         print(f"⚠️ Quota-Check Fehler: {e}")
         return None
 
-def translate_with_deepl(text: str, target_lang: str, source_lang: str = "DE") -> str:
-    """Übersetzt Text mit DeepL API"""
-    api_key = os.environ.get("DEEPL_API_KEY")
-    if not api_key:
-        print("❌ DEEPL_API_KEY nicht gefunden!")
-        sys.exit(1)
+def recipe_text_paths(recipe: dict) -> List[Tuple[tuple, str]]:
+    """
+    Alle zu übersetzenden Texte eines Rezepts mit ihrem Pfad
     
-    # Free vs Pro API
-    if api_key.endswith(':fx'):
-        base_url = "https://api-free.deepl.com/v2/translate"
-    else:
-        base_url = "https://api.deepl.com/v2/translate"
+    Args:
+        recipe: Rezept-Dictionary mit deutschen Texten
     
-    max_retries = MAX_RETRIES
-    retry_count = 0
+    Returns:
+        Liste von (Pfad, Text), z.B. (("ingredients", 0, "items", 2, "name"), "Salz")
+    """
+    paths = [(("title",), recipe.get('title', ''))]
+    if recipe.get('subtitle'):
+        paths.append((("subtitle",), recipe['subtitle']))
+    
+    for g_idx, group in enumerate(recipe.get('ingredients') or []):
+        paths.append((("ingredients", g_idx, "group"), group.get('group', '')))
+        for i_idx, item in enumerate(group.get('items', [])):
+            paths.append((("ingredients", g_idx, "items", i_idx, "name"), item.get('name', '')))
+    
+    for s_idx, step in enumerate(recipe.get('steps') or []):
+        for sub_idx, substep in enumerate(step.get('substeps', [])):
+            paths.append((("steps", s_idx, "substeps", sub_idx), substep))
+    
+    # Tipps sind in recipes.json ein String, ältere Rezepte haben eine Liste
+    tips = recipe.get('tips')
+    if isinstance(tips, str) and tips.strip():
+        paths.append((("tips",), tips))
+    elif isinstance(tips, list):
+        for t_idx, tip in enumerate(tips):
+            paths.append((("tips", t_idx), tip))
+    
+    return [(path, text) for path, text in paths if isinstance(text, str) and text.strip()]
+
+def set_path(obj: Any, path: tuple, value: Any) -> None:
+    """Setzt einen Wert an einem Pfad aus recipe_text_paths()"""
+    for key in path[:-1]:
+        obj = obj[key]
+    obj[path[-1]] = value
+
+def get_path(obj: Any, path: tuple) -> Any:
+    """Wert an einem Pfad oder None, wenn es ihn nicht (mehr) gibt"""
+    try:
+        for key in path:
+            obj = obj[key]
+        return obj
+    except (KeyError, IndexError, TypeError):
+        return None
+
+def path_key(path: tuple) -> str:
+    """("ingredients", 0, "items", 2, "name") → "ingredients.0.items.2.name" """
+    return ".".join(str(key) for key in path)
+
+def parse_path_key(key: str) -> tuple:
+    return tuple(int(part) if part.isdigit() else part for part in key.split("."))
+
+def text_fingerprint(text: str) -> str:
+    """Kurzer Hash eines Quelltexts - ändert sich der Text, ändert sich der Fingerprint"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:FINGERPRINT_LENGTH]
+
+def is_newer(timestamp: Optional[str], than: Optional[str]) -> bool:
+    """True, wenn ein ISO-Zeitstempel später liegt als ein anderer"""
+    try:
+        return datetime.fromisoformat(timestamp) > datetime.fromisoformat(than)
+    except (TypeError, ValueError):
+        return str(timestamp) > str(than)  # gemischte Formate / Zeitzonen
+
+def legacy_translation_stale(recipe: dict, existing: dict) -> bool:
+    """
+    Ob eine alte Übersetzung ohne Fingerprints nicht mehr zum Rezept passt
     
-    while retry_count < max_retries:
-        try:
-            headers = {
-                "Authorization": f"DeepL-Auth-Key {api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            data = {
-                "text": [text],
-                "target_lang": target_lang.upper(),
-                "source_lang": source_lang.upper()
-            }
-            
-            response = requests.post(base_url, headers=headers, json=data, timeout=API_TIMEOUT)
-            
-            if response.status_code == 200:
-                result = response.json()
-                if result.get("translations"):
-                    return result["translations"][0]["text"]
-            elif response.status_code == 456:
-                print(f"❌ DeepL Quota überschritten!")
-                sys.exit(1)
-            elif response.status_code == 429:
-                # Rate limit - warte länger
-                retry_count += 1
-                wait_time = retry_count * RETRY_DELAY
-                print(f"⚠️ Rate limit erreicht, warte {wait_time}s...")
-                time.sleep(wait_time)
-                continue
-            
-            print(f"⚠️ DeepL Fehler: {response.status_code}")
-            break  # Verlasse Retry-Schleife bei anderem Fehler
-            
-        except requests.exceptions.Timeout:
-            retry_count += 1
-            print(f"⚠️ Timeout (Versuch {retry_count}/{max_retries}), wiederhole...")
-            time.sleep(RETRY_DELAY)
-            continue
-            
-        except Exception as e:
-            retry_count += 1
-            print(f"⚠️ Fehler: {e} (Versuch {retry_count}/{max_retries})")
-            if retry_count < max_retries:
-                time.sleep(RETRY_DELAY)
-                continue
-            break
+    Ohne Fingerprints ist nicht zu erkennen, welche Texte sich geändert
+    haben - wurde das deutsche Rezept nach der Übersetzung bearbeitet (oder
+    fehlt translated_at), gilt sie deshalb als komplett veraltet.
+    """
+    updated_at = recipe.get('updated_at')
+    if not updated_at:
+        return False  # Keine Angabe - wie bisher übernehmen
+    translated_at = existing.get('translated_at')
+    return not translated_at or is_newer(updated_at, translated_at)
+
+def plan_translation(recipe: dict, existing: Optional[dict]) -> Tuple[dict, List[Tuple[tuple, str]]]:
+    """
+    Übernimmt aus einer vorhandenen Übersetzung alle unveränderten Texte
+    
+    Verglichen wird über die Fingerprints der deutschen Quelltexte, die in
+    `source_fingerprints` neben jeder Übersetzung liegen - unabhängig vom
+    Pfad, ein eingefügter Schritt kostet also nur den neuen Schritt.
+    Alte Übersetzungen ohne Fingerprints werden nur übernommen, solange das
+    deutsche Rezept seit der Übersetzung nicht bearbeitet wurde - sonst
+    bekäme finalize_translation() Fingerprints für Texte, die gar nicht zur
+    Übersetzung passen.
+    
+    Args:
+        recipe: Deutsches Rezept
+        existing: Zugeordnete vorhandene Übersetzung oder None
+    
+    Returns:
+        Tuple (Rezept mit übernommenen Übersetzungen - offene Felder noch deutsch,
+        offene Texte als [(Pfad, Text)])
+    """
+    translated = copy.deepcopy(recipe)
+    paths = recipe_text_paths(recipe)
+    fingerprints = existing.get('source_fingerprints') if existing is not None else None
+    if existing is None or (fingerprints is None and legacy_translation_stale(recipe, existing)):
+        return translated, paths
+    translated['translated_at'] = existing.get('translated_at')
+    
+    by_fingerprint = {}
+    for key, fingerprint in (fingerprints or {}).items():
+        value = get_path(existing, parse_path_key(key))
+        if isinstance(value, str) and value.strip():
+            by_fingerprint.setdefault(fingerprint, value)
+    
+    pending = []
+    for path, text in paths:
+        if fingerprints is None:
+            value = get_path(existing, path)
+        else:
+            value = by_fingerprint.get(text_fingerprint(text))
+        if isinstance(value, str) and value.strip():
+            set_path(translated, path, value)
+        else:
+            pending.append((path, text))
+    return translated, pending
+
+def finalize_translation(translated: dict, recipe: dict, target_lang: str, changed: bool) -> dict:
+    """Setzt Fingerprints und Metadaten einer fertigen Übersetzung"""
+    translated['source_fingerprints'] = {
+        path_key(path): text_fingerprint(text) for path, text in recipe_text_paths(recipe)
+    }
+    # Metadaten (original_title für ältere Übersetzungen ohne ID)
+    translated['language'] = target_lang.lower()
+    translated['original_title'] = recipe.get('title', '')
+    translated['translation_source'] = 'deepl'
+    if changed or not translated.get('translated_at'):
+        translated['translated_at'] = datetime.now().isoformat()
+    return translated
+
+def translate_pending(jobs: List[Tuple[dict, List[Tuple[tuple, str]]]], target_lang: str, client: DeepLClient,
+                      on_batch: Optional[Callable[[int, int], None]] = None) -> None:
+    """
+    Übersetzt die offenen Texte mehrerer Rezepte in gebündelten DeepL-Requests
+    
+    Alle offenen Texte werden flach gesammelt, in Batches zu 50 übersetzt
+    (gleiche Texte wie "Salz" nur einmal) und an ihre Pfade zurückgeschrieben.
     
-    # Falls alle Retries fehlschlagen
-    return text  # Fallback
+    Args:
+        jobs: [(Rezept, offene Texte)] aus plan_translation() - wird in place übersetzt
+        target_lang: Zielsprache (z.B. "EN", "ES", "FR")
+        client: DeepLClient
+        on_batch: Fortschritt (fertig, gesamt) nach jedem Request
+    
+    Raises:
+        DeepLQuotaExceeded: Wenn das Kontingent aufgebraucht ist
+    """
+    flat = [(translated, path, text) for translated, pending in jobs for path, text in pending]
+    translations = client.translate([text for _, _, text in flat], target_lang,
+                                    fallback_on_error=True, on_batch=on_batch)
+    for (translated, path, _), text in zip(flat, translations):
+        set_path(translated, path, text)
+
+def translate_recipes(recipes: List[dict], target_lang: str, client: DeepLClient,
+                      on_batch: Optional[Callable[[int, int], None]] = None) -> List[dict]:
+    """
+    Übersetzt mehrere Rezepte komplett (ohne vorhandene Übersetzungen)
+    
+    Returns:
+        Übersetzte Rezepte mit Metadaten (gleiche Reihenfolge)
+    """
+    jobs = [plan_translation(recipe, None) for recipe in recipes]
+    translate_pending(jobs, target_lang, client, on_batch)
+    return [finalize_translation(translated, recipe, target_lang, changed=True)
+            for (translated, _), recipe in zip(jobs, recipes)]
 
-def translate_recipe(recipe: dict, target_lang: str) -> dict:
+def translate_recipe(recipe: dict, target_lang: str, client: Optional[DeepLClient] = None) -> dict:
     """
     Übersetzt ein einzelnes Rezept
     
     Args:
         recipe: Rezept-Dictionary mit deutschen Texten
         target_lang: Zielsprache (z.B. "EN", "ES", "FR")
+        client: DeepLClient (wird sonst angelegt)
     
     Returns:
         Übersetztes Rezept mit Metadaten
     """
-    translated = recipe.copy()
-    
-    # Speichere Original-Titel für Vergleich
-    original_title = recipe.get('title', '')
-    
-    # Zähle Gesamt-Tasks für Progress
-    total_tasks = 1  # Titel
-    if recipe.get('subtitle'): total_tasks += 1
-    if recipe.get('ingredients'):
-        for group in recipe['ingredients']:
-            total_tasks += 1 + len(group.get('items', []))
-    if recipe.get('steps'):
-        for step in recipe['steps']:
-            total_tasks += len(step.get('substeps', []))
-    if recipe.get('tips'): total_tasks += 1
-    
-    current_task = 0
-    
-    def show_progress(label):
-        nonlocal current_task
-        current_task += 1
-        percentage = (current_task / total_tasks * 100) if total_tasks > 0 else 0
-        bar_length = 20
-        filled = int(bar_length * current_task / total_tasks) if total_tasks > 0 else 0
-        bar = '█' * filled + '░' * (bar_length - filled)
-        print(f"\r    [{bar}] {percentage:.0f}% | {label:<40}", end='', flush=True)
-    
-    # Titel
-    show_progress("Titel")
-    translated['title'] = translate_with_deepl(original_title, target_lang)
-    time.sleep(RATE_LIMIT_SLEEP)
-    
-    # Untertitel
-    if recipe.get('subtitle'):
-        show_progress("Untertitel")
-        translated['subtitle'] = translate_with_deepl(recipe['subtitle'], target_lang)
-        time.sleep(RATE_LIMIT_SLEEP)
-    
-    # Zutaten
-    if recipe.get('ingredients'):
-        translated['ingredients'] = []
-        for idx, group in enumerate(recipe['ingredients'], 1):
-            new_group = group.copy()
-            show_progress(f"Zutatengruppe {idx}/{len(recipe['ingredients'])}")
-            new_group['group'] = translate_with_deepl(group.get('group', ''), target_lang)
-            time.sleep(RATE_LIMIT_SLEEP)
-            
-            new_items = []
-            for item_idx, item in enumerate(group.get('items', []), 1):
-                new_item = item.copy()
-                show_progress(f"Zutat {item_idx} (Gruppe {idx})")
-                new_item['name'] = translate_with_deepl(item.get('name', ''), target_lang)
-                time.sleep(RATE_LIMIT_SLEEP)
-                new_items.append(new_item)
-            
-            new_group['items'] = new_items
-            translated['ingredients'].append(new_group)
-    
-    # Zubereitungsschritte
-    if recipe.get('steps'):
-        translated['steps'] = []
-        step_count = sum(len(s.get('substeps', [])) for s in recipe['steps'])
-        current_substep = 0
-        
-        for step in recipe['steps']:
-            new_step = step.copy()
-            new_substeps = []
-            
-            for substep in step.get('substeps', []):
-                current_substep += 1
-                show_progress(f"Schritt {current_substep}/{step_count}")
-                translated_substep = translate_with_deepl(substep, target_lang)
-                time.sleep(RATE_LIMIT_SLEEP)
-                new_substeps.append(translated_substep)
-            
-            new_step['substeps'] = new_substeps
-            translated['steps'].append(new_step)
-    
-    # Tipps
-    if recipe.get('tips'):
-        translated['tips'] = []
-        for tip_idx, tip in enumerate(recipe['tips'], 1):
-            show_progress(f"Tipp {tip_idx}/{len(recipe['tips'])}")
-            translated_tip = translate_with_deepl(tip, target_lang)
-            time.sleep(RATE_LIMIT_SLEEP)
-            translated['tips'].append(translated_tip)
-    
-    print()  # Neue Zeile nach Fortschrittsbalken
+    return translate_recipes([recipe], target_lang, client or DeepLClient())[0]
+
+class LanguageProgress:
+    """Fortschritt aller Sprachen in einer Zeile, thread-safe"""
     
-    # Metadaten (WICHTIG: original_title für Vergleich speichern!)
-    translated['language'] = target_lang.lower()
-    translated['original_title'] = original_title  # Für Incremental Translation
-    translated['translation_source'] = 'deepl'
-    translated['translated_at'] = datetime.now().isoformat()
+    def __init__(self, languages: List[str]):
+        self._lock = threading.Lock()
+        self._state = {lang: (0, 0, "⏳") for lang in languages}
     
-    return translated
+    def update(self, lang: str, done: int, total: int, icon: str = "🔄") -> None:
+        """
+        Setzt den Stand einer Sprache und zeichnet die Zeile neu
+        
+        Args:
+            lang: Sprachcode
+            done, total: übersetzte / zu übersetzende Texte
+            icon: Status (🔄 läuft, ✅ fertig, ❌ Fehler, ⏹️ abgebrochen)
+        """
+        with self._lock:
+            self._state[lang] = (done, total, icon)
+            parts = []
+            for code, (lang_done, lang_total, lang_icon) in self._state.items():
+                bar_length = 8
+                filled = int(bar_length * lang_done / lang_total) if lang_total > 0 else (bar_length if lang_icon == "✅" else 0)
+                bar = '█' * filled + '░' * (bar_length - filled)
+                parts.append(f"{code.upper()} {bar} {lang_icon}")
+            print(f"\r  {' | '.join(parts)}", end='', flush=True)
 
-def load_existing_translations(lang_code: str) -> Tuple[Dict[str, Any], Dict[int, Any]]:
+def load_existing_translations(lang_code: str) -> List[dict]:
     """
     Lädt existierende Übersetzungen (falls vorhanden)
     
@@ -294,45 +343,277 @@ def load_existing_translations(lang_code: str) -> Tuple[Dict[str, Any], Dict[int
         lang_code: Sprachcode (z.B. "en", "es", "fr")
     
     Returns:
-        Tuple mit (dict_by_title, dict_by_index)
+        Liste der übersetzten Rezepte (leer wenn keine Datei)
     """
     output_file = Path(__file__).parent / f"recipes_{lang_code}.json"
     if not output_file.exists():
-        return {}, {}
+        return []
     
     try:
         with open(output_file, 'r', encoding='utf-8') as f:
-            existing = json.load(f)
+            return json.load(f)
+    except Exception as e:
+        print(f"⚠️ Fehler beim Laden existierender Übersetzungen: {e}")
+        return []
+
+def match_existing_translations(recipes: List[dict], lang_code: str) -> List[Optional[dict]]:
+    """
+    Ordnet vorhandene Übersetzungen den deutschen Rezepten zu
+    
+    Zuerst über die stabile Rezept-ID. Übersetzungen aus der Zeit vor den IDs
+    werden wie bisher über original_title bzw. die Position gefunden.
+    
+    Args:
+        recipes: Deutsche Rezepte (mit IDs)
+        lang_code: Sprachcode (z.B. "en")
+    
+    Returns:
+        Vorhandene Übersetzung oder None, in Rezept-Reihenfolge
+    """
+    existing = load_existing_translations(lang_code)
+    by_id = {recipe['id']: recipe for recipe in existing if recipe.get('id')}
+    
+    # Nur für alte Übersetzungen ohne ID: zwei Indices nach Titel UND nach Position
+    by_title = {}
+    by_index = {}
+    for idx, recipe in enumerate(existing):
+        if recipe.get('id'):
+            continue
+        original = recipe.get('original_title', recipe.get('title', ''))
+        by_title[original.strip()] = recipe
+        by_index[idx] = recipe
+    
+    matches = []
+    for idx, recipe in enumerate(recipes):
+        if recipe.get('id') in by_id:
+            matches.append(by_id[recipe['id']])
+            continue
         
-        # Zwei Indices: nach Titel UND nach Position
-        by_title = {}
-        by_index = {}
+        title_normalized = recipe.get('title', 'Unbekannt').strip()
+        existing_translation = None
         
-        for idx, recipe in enumerate(existing):
-            # Index nach Titel (normalisiert)
-            original = recipe.get('original_title', recipe.get('title', ''))
-            original_normalized = original.strip()
-            by_title[original_normalized] = recipe
+        if title_normalized in by_title:
+            # Perfektes Match: Titel stimmt überein
+            existing_translation = by_title[title_normalized]
+        elif idx in by_index:
+            # Fallback: Rezept an gleicher Position (wahrscheinlich dasselbe, Titel nur leicht geändert)
+            # Akzeptiere es, wenn mindestens 80% der Zeichen übereinstimmen
+            existing_recipe = by_index[idx]
+            old_title = existing_recipe.get('original_title', '').strip()
+            
+            # Einfacher Ähnlichkeitscheck: Wie viele Zeichen sind gleich?
+            title_chars = set(title_normalized.lower())
+            old_chars = set(old_title.lower())
+            common_chars = title_chars & old_chars
+            all_chars = title_chars | old_chars
             
-            # Index nach Position (Fallback falls Titel geändert wurde)
-            by_index[idx] = recipe
+            if len(all_chars) > 0:
+                similarity = len(common_chars) / len(all_chars)
+                
+                # Wenn >TITLE_SIMILARITY_THRESHOLD ähnlich ODER nur wenige Zeichen unterschiedlich
+                if similarity > TITLE_SIMILARITY_THRESHOLD or abs(len(title_normalized) - len(old_title)) < 3:
+                    existing_translation = existing_recipe
         
-        return by_title, by_index
-    except Exception as e:
-        print(f"⚠️ Fehler beim Laden existierender Übersetzungen: {e}")
-        return {}, {}
+        matches.append(existing_translation)
+    
+    return matches
+
+def save_translations(lang_code: str, translated_recipes: List[Optional[dict]]) -> Path:
+    """
+    Schreibt recipes_{lang}.json atomar
+    
+    Noch nicht übersetzte neue Rezepte (None) werden ausgelassen - beim
+    nächsten Lauf geht es mit ihnen weiter.
+    """
+    output_file = Path(__file__).parent / f"recipes_{lang_code}.json"
+    done = [recipe for recipe in translated_recipes if recipe is not None]
+    atomic_write_bytes(str(output_file), json.dumps(done, ensure_ascii=False, indent=2).encode('utf-8'))
+    return output_file
+
+def translate_language(lang_code: str, deepl_code: str, recipes: List[dict], client: DeepLClient,
+                       progress: LanguageProgress, stop: threading.Event,
+                       allowed: Optional[set] = None) -> Dict[str, Any]:
+    """
+    Übersetzt alle neuen und geänderten Texte einer Sprache (läuft in einem Worker-Thread)
+    
+    Wichtige Rezepte zuerst (recipe_priority). Nach jedem Block von
+    TRANSLATION_CHUNK_RECIPES Rezepten wird gespeichert, damit ein Abbruch
+    (Quota, Absturz) keine bezahlten Übersetzungen kostet. Bis ein geändertes
+    Rezept fertig ist, bleibt seine alte Übersetzung stehen.
+    
+    Args:
+        allowed: Positionen der Rezepte, die in diesem Lauf übersetzt werden
+            dürfen (Budget, siehe select_within_budget) - None = alle
+    
+    Returns:
+        dict mit new, updated, reused, deferred, texts, error
+    """
+    existing = match_existing_translations(recipes, lang_code)
+    
+    translated_recipes = []
+    work = []  # (Position, Rezept, Übersetzung, offene Texte)
+    result = {"new": 0, "updated": 0, "reused": 0, "deferred": 0, "texts": 0, "error": None}
+    for idx, (recipe, old) in enumerate(zip(recipes, existing)):
+        translated, pending = plan_translation(recipe, old)
+        if pending:
+            translated_recipes.append(old)
+            if allowed is None or idx in allowed:
+                work.append((idx, recipe, translated, pending))
+            else:
+                result["deferred"] += 1
+        else:
+            translated_recipes.append(finalize_translation(translated, recipe, deepl_code, changed=False))
+            result["reused"] += 1
+    work.sort(key=lambda job: recipe_priority(job[1]))
+    
+    total_texts = sum(len(pending) for *_, pending in work)
+    texts_done = 0
+    progress.update(lang_code, 0, total_texts)
+    
+    for start in range(0, len(work), TRANSLATION_CHUNK_RECIPES):
+        if stop.is_set():
+            progress.update(lang_code, texts_done, total_texts, "⏹️")
+            result["error"] = "abgebrochen"
+            break
+        chunk = work[start:start + TRANSLATION_CHUNK_RECIPES]
+        chunk_texts = sum(len(pending) for *_, pending in chunk)
+        
+        def on_batch(done, total, offset=texts_done, size=chunk_texts):
+            progress.update(lang_code, offset + int(size * done / total), total_texts)
+        
+        try:
+            translate_pending([(translated, pending) for _, _, translated, pending in chunk],
+                              deepl_code, client, on_batch=on_batch)
+        except DeepLQuotaExceeded as e:
+            stop.set()
+            progress.update(lang_code, texts_done, total_texts, "❌")
+            result["error"] = str(e)
+            break
+        except Exception as e:
+            progress.update(lang_code, texts_done, total_texts, "❌")
+            result["error"] = str(e)
+            break
+        
+        for idx, recipe, translated, _ in chunk:
+            result["updated" if translated_recipes[idx] is not None else "new"] += 1
+            translated_recipes[idx] = finalize_translation(translated, recipe, deepl_code, changed=True)
+        texts_done += chunk_texts
+        result["texts"] = texts_done
+        save_translations(lang_code, translated_recipes)
+    else:
+        progress.update(lang_code, total_texts, total_texts, "✅")
+        save_translations(lang_code, translated_recipes)
+    
+    return result
+
+def recipe_priority(recipe: dict) -> int:
+    """0 = hervorgehoben (Woche/Monat/Saison), 1 = veröffentlicht, 2 = Entwurf"""
+    if any(recipe.get(field) for field in FEATURED_FIELDS):
+        return 0
+    return 1 if recipe.get('published', True) else 2
+
+def plan_run(recipes: List[dict], memory: Optional[TranslationMemory] = None,
+             journal: Optional[TranslationJournal] = None) -> List[Dict[str, Any]]:
+    """
+    Berechnet, was ein Lauf kosten wird - ohne DeepL-Aufrufe
+    
+    Pro Sprache und Rezept die offenen Texte (wie translate_language sie
+    schicken würde). Gezählt werden die Zeichen, die DeepL berechnet: Texte
+    aus Checkpoint-Journal oder Translation Memory und Wiederholungen
+    innerhalb einer Sprache kosten nichts.
+    
+    Returns:
+        Liste von {lang, index, title, priority, texts, cost}, wichtigste zuerst
+    """
+    units = []
+    for lang_order, lang_code in enumerate(TARGET_LANGUAGES):
+        existing = match_existing_translations(recipes, lang_code)
+        for idx, (recipe, old) in enumerate(zip(recipes, existing)):
+            _, pending = plan_translation(recipe, old)
+            if pending:
+                units.append({
+                    "lang": lang_code,
+                    "index": idx,
+                    "title": recipe.get('title', ''),
+                    "priority": recipe_priority(recipe),
+                    "texts": [text for _, text in pending],
+                    "order": lang_order,
+                })
+    units.sort(key=lambda unit: (unit["priority"], unit["index"], unit["order"]))
+    
+    free = {}
+    for lang_code, deepl_code in TARGET_LANGUAGES.items():
+        texts = [text for unit in units if unit["lang"] == lang_code for text in unit["texts"]]
+        free[lang_code] = set()
+        for store in (memory, journal):
+            if store is not None and texts:
+                free[lang_code] |= store.known(texts, deepl_code)
+    seen = {lang_code: set() for lang_code in TARGET_LANGUAGES}
+    for unit in units:
+        lang_seen = seen[unit["lang"]]
+        lang_free = free.get(unit["lang"], set())
+        new_texts = [text for text in dict.fromkeys(unit["texts"]) if text not in lang_seen and text not in lang_free]
+        unit["cost"] = sum(len(text) for text in new_texts)
+        lang_seen.update(new_texts)
+        del unit["order"]
+    return units
+
+def select_within_budget(units: List[Dict[str, Any]], budget: Optional[int]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Nimmt Rezepte in Prioritäts-Reihenfolge, bis das Budget erschöpft ist
+    
+    Passt ein Rezept nicht mehr hinein, ist Schluss - auch wenn kleinere,
+    weniger wichtige noch passen würden.
+    
+    Returns:
+        Tuple (diesen Lauf übersetzen, auf später verschoben)
+    """
+    if budget is None:
+        return units, []
+    spent = 0
+    for position, unit in enumerate(units):
+        if spent + unit["cost"] > budget:
+            return units[:position], units[position:]
+        spent += unit["cost"]
+    return units, []
+
+def print_plan(units: List[Dict[str, Any]], selected: List[Dict[str, Any]], budget: Optional[int]) -> None:
+    """Kosten pro Sprache und was ins Budget passt"""
+    print("🧮 Geplante Übersetzungen:")
+    for lang_code in TARGET_LANGUAGES:
+        lang_units = [unit for unit in units if unit["lang"] == lang_code]
+        cost = sum(unit["cost"] for unit in lang_units)
+        texts = sum(len(unit["texts"]) for unit in lang_units)
+        print(f"   {lang_code.upper()}: {len(lang_units)} Rezept(e), {texts} Texte, {cost:,} Zeichen")
+    total = sum(unit["cost"] for unit in units)
+    print(f"   Gesamt: {total:,} Zeichen")
+    if budget is not None:
+        selected_cost = sum(unit["cost"] for unit in selected)
+        print(f"💰 Budget {budget:,} Zeichen: {len(selected)}/{len(units)} Rezept-Übersetzungen "
+              f"({selected_cost:,} Zeichen) in diesem Lauf")
+        for unit in units[len(selected):][:10]:
+            print(f"   ⏭️ {unit['lang'].upper()} {unit['title'][:40]} ({unit['cost']:,} Zeichen)")
+        if len(units) - len(selected) > 10:
+            print(f"   … und {len(units) - len(selected) - 10} weitere")
 
 def main() -> None:
     """Hauptfunktion - Übersetzt alle Rezepte in alle Zielsprachen"""
+    parser = argparse.ArgumentParser(description="Übersetzt alle Rezepte in alle Zielsprachen")
+    parser.add_argument("--dry-run", action="store_true", help="Nur Kosten pro Sprache berechnen, nichts übersetzen")
+    parser.add_argument("--budget", type=int, help="Höchstens so viele Zeichen verbrauchen (wichtige Rezepte zuerst)")
+    args = parser.parse_args()
+    
     print("🌍 Incremental Translation Script für vegantalia.de")
     print("=" * 50)
     
     # Lade .env
     load_env()
     
-    # Prüfe DeepL Quota VOR der Übersetzung
+    # Prüfe DeepL Quota VOR der Übersetzung (Dry-Run geht auch ohne Key)
     print()
-    available_chars = check_deepl_quota()
+    available_chars = None
+    if not args.dry_run or os.getenv('DEEPL_API_KEY'):
+        available_chars = check_deepl_quota()
     print()
     
     # Lade deutsche Rezepte
@@ -345,89 +626,86 @@ def main() -> None:
         recipes = json.load(f)
     
     print(f"📚 {len(recipes)} Rezepte geladen")
+    
+    # Stabile IDs: Übersetzungen finden ihr Rezept darüber wieder
+    assigned = ensure_recipe_ids(recipes)
+    if assigned and not args.dry_run:
+        save_catalog(recipes, str(recipes_file))
+        print(f"🆔 {assigned} Rezept(e) mit neuer ID in recipes.json gespeichert")
     print()
     
-    # Übersetze in alle Sprachen
-    total_languages = len(TARGET_LANGUAGES)
+    # Kosten planen: Budget ist das kleinere von --budget und dem freien Kontingent
+    memory = TranslationMemory()
+    journal = open_journal()
+    units = plan_run(recipes, memory, journal)
+    budget = args.budget
+    if available_chars is not None:
+        budget = available_chars if budget is None else min(budget, available_chars)
+    selected, deferred = select_within_budget(units, budget)
+    print_plan(units, selected, budget)
+    print()
     
-    for lang_idx, (lang_code, deepl_code) in enumerate(TARGET_LANGUAGES.items(), 1):
-        print(f"🌐 Übersetze nach {lang_code.upper()} ({deepl_code})... [{lang_idx}/{total_languages}]")
-        
-        # Lade existierende Übersetzungen (zwei Indices)
-        existing_by_title, existing_by_index = load_existing_translations(lang_code)
-        print(f"  📦 {len(existing_by_title)} existierende Übersetzungen gefunden")
-        
-        translated_recipes = []
-        new_count = 0
-        reused_count = 0
-        
-        total_recipes = len(recipes)
-        
-        for idx, recipe in enumerate(recipes, 1):
-            title = recipe.get('title', 'Unbekannt')
-            title_normalized = title.strip()
-            
-            # Progress Bar
-            percentage = (idx / total_recipes) * 100
-            bar_length = 30
-            filled = int(bar_length * idx / total_recipes)
-            bar = '█' * filled + '░' * (bar_length - filled)
-            
-            # Matching-Strategie: Erst nach Titel, dann nach Index (idx-1 weil 0-basiert)
-            existing_translation = None
-            status_icon = "🆕"  # Default
-            
-            if title_normalized in existing_by_title:
-                # Perfektes Match: Titel stimmt überein
-                existing_translation = existing_by_title[title_normalized]
-                status_icon = "♻️"
-            elif (idx - 1) in existing_by_index:
-                # Fallback: Rezept an gleicher Position (wahrscheinlich dasselbe, Titel nur leicht geändert)
-                # Akzeptiere es, wenn mindestens 80% der Zeichen übereinstimmen
-                existing_recipe = existing_by_index[idx - 1]
-                old_title = existing_recipe.get('original_title', '').strip()
-                
-                # Einfacher Ähnlichkeitscheck: Wie viele Zeichen sind gleich?
-                title_chars = set(title_normalized.lower())
-                old_chars = set(old_title.lower())
-                common_chars = title_chars & old_chars
-                all_chars = title_chars | old_chars
-                
-                if len(all_chars) > 0:
-                    similarity = len(common_chars) / len(all_chars)
-                    
-                    # Wenn >TITLE_SIMILARITY_THRESHOLD ähnlich ODER nur wenige Zeichen unterschiedlich
-                    if similarity > TITLE_SIMILARITY_THRESHOLD or abs(len(title_normalized) - len(old_title)) < 3:
-                        existing_translation = existing_recipe
-                        status_icon = "♻️"
-            
-            if existing_translation:
-                # Update original_title falls es sich geändert hat
-                existing_translation['original_title'] = title
-                translated_recipes.append(existing_translation)
-                reused_count += 1
-            else:
-                translated = translate_recipe(recipe, deepl_code)
-                translated_recipes.append(translated)
-                new_count += 1
-            
-            # Progress Bar ausgeben (überschreibt vorherige Zeile)
-            print(f"\r  [{bar}] {percentage:.0f}% | [{idx}/{total_recipes}] {title[:30]:<30} {status_icon}", end='', flush=True)
-        
-        # Nach der Schleife: Neue Zeile
-        print()
-        
-        # Speichere übersetztes JSON
-        output_file = Path(__file__).parent / f"recipes_{lang_code}.json"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(translated_recipes, f, ensure_ascii=False, indent=2)
-        
-        print(f"✅ Gespeichert: {output_file.name}")
-        print(f"   📊 {new_count} neu übersetzt, {reused_count} wiederverwendet")
+    if args.dry_run:
+        print("🔍 Dry-Run: nichts übersetzt")
+        return
+    if not units:
+        print("♻️ Alle Übersetzungen sind aktuell")
+    
+    allowed = {lang_code: set() for lang_code in TARGET_LANGUAGES}
+    for unit in selected:
+        allowed[unit["lang"]].add(unit["index"])
+    
+    # Ein Client für alle Sprachen: Keep-Alive, gemeinsames Rate-Limit und Translation Memory
+    try:
+        client = DeepLClient(memory=memory, journal=journal)
+    except DeepLError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    
+    # Alle Sprachen parallel, ein gemeinsamer Token-Bucket im Client
+    print(f"🌐 Übersetze nach {', '.join(code.upper() for code in TARGET_LANGUAGES)}...")
+    progress = LanguageProgress(list(TARGET_LANGUAGES))
+    stop = threading.Event()
+    with ThreadPoolExecutor(max_workers=len(TARGET_LANGUAGES)) as pool:
+        futures = {
+            lang_code: pool.submit(translate_language, lang_code, deepl_code, recipes, client, progress, stop,
+                                   allowed[lang_code])
+            for lang_code, deepl_code in TARGET_LANGUAGES.items()
+        }
+        results = {lang_code: future.result() for lang_code, future in futures.items()}
+    print()
+    print()
+    
+    for lang_code, result in results.items():
+        icon = "❌" if result["error"] else "✅"
+        print(f"{icon} recipes_{lang_code}.json: {result['new']} neu, {result['updated']} aktualisiert "
+              f"({result['texts']} Texte), {result['reused']} unverändert, {result['deferred']} verschoben")
+        if result["error"]:
+            print(f"   ⚠️ {result['error']} - Fortschritt gespeichert, erneut starten zum Fortsetzen")
+    print()
+    
+    # Checkpoint nur behalten, solange noch etwas offen ist
+    if stop.is_set() or deferred or any(result["error"] for result in results.values()):
+        journal.close()
+        print(f"💾 Checkpoint: {len(journal)} Übersetzungen in {Path(journal.path).name} - "
+              f"der nächste Lauf übernimmt sie ohne DeepL-Kosten")
+    else:
+        journal.discard()
+    if journal.resumed:
+        print(f"♻️ {journal.resumed} Übersetzungen aus dem Checkpoint übernommen")
+    
+    if stop.is_set():
+        print("❌ DeepL Quota überschritten - Lauf abgebrochen")
+        sys.exit(1)
+    if deferred:
+        print(f"⏭️ {len(deferred)} Rezept-Übersetzung(en) passen nicht ins Budget - "
+              f"fertige sind gespeichert, der nächste Lauf macht dort weiter")
         print()
     
     print("=" * 50)
     print("🎉 Alle Übersetzungen abgeschlossen!")
+    print(f"📡 {client.requests_sent} DeepL-Requests, {client.characters_sent:,} Zeichen")
+    print(memory.summary())
     print()
     print("Generierte Dateien:")
     for lang_code in TARGET_LANGUAGES.keys():
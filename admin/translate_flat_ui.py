@@ -8,6 +8,8 @@ import os
 import time
 from pathlib import Path
 
+from translation_memory import shared_memory
+
 try:
     import deepl
 except ImportError:
@@ -58,6 +60,8 @@ def main():
     total_keys = len(german_strings)
     print(f"📚 {total_keys} deutsche Strings geladen\n")
     
+    memory = shared_memory()
+    
     # Übersetze für jede Sprache
     for lang_code, deepl_code in LANGUAGES.items():
         print(f"🌐 Übersetze nach {lang_code.upper()} ({deepl_code})...")
@@ -69,9 +73,16 @@ def main():
             current += 1
             show_progress(current, total_keys, f"| {key[:20]}...")
             
+            # Translation Memory zuerst - kostet keine Zeichen
+            remembered = memory.get(german_text, deepl_code)
+            if remembered is not None:
+                translations[key] = remembered
+                continue
+            
             try:
                 result = translator.translate_text(german_text, target_lang=deepl_code)
                 translations[key] = result.text
+                memory.set(german_text, result.text, deepl_code)
                 time.sleep(0.1)  # Rate limiting
             except Exception as e:
                 print(f"\n  ❌ Fehler bei {key}: {e}")
@@ -96,6 +107,7 @@ def main():
     except:
         pass
     
+    print(memory.summary())
     print("\n✅ Übersetzung abgeschlossen!")
 
 if __name__ == "__main__":
@@ -4,14 +4,25 @@ UI Translation Script für vegantalia.de
 Übersetzt UI-Elemente (Buttons, Labels, etc.) aus ui-translations.json
 """
 
+import argparse
+import copy
 import os
 import sys
 import json
-import time
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+from atomic_io import atomic_write_bytes
+from deepl_client import DeepLClient, DeepLError, DeepLQuotaExceeded
+from translation_journal import open_journal
+from translation_memory import shared_memory
+
+# Eigenes Checkpoint-Journal, damit sich UI- und Rezept-Läufe nicht gegenseitig aufräumen
+JOURNAL_PATH = Path(__file__).parent / "translation_checkpoint_ui.jsonl"
 
 # Zielsprachen (wie bei Rezepten)
 TARGET_LANGUAGES = {
@@ -37,62 +48,6 @@ def load_env() -> None:
                 key, value = line.split('=', 1)
                 os.environ[key] = value
 
-def translate_with_deepl(text: str, target_lang: str, source_lang: str = "DE") -> str:
-    """
-    Übersetzt Text mit DeepL API
-    
-    Args:
-        text: Zu übersetzender Text
-        target_lang: Zielsprache (z.B. "EN", "ES", "FR")
-        source_lang: Quellsprache (Standard: "DE")
-    
-    Returns:
-        Übersetzter Text oder Originaltext bei Fehler
-    
-    Raises:
-        ValueError: Wenn text leer oder kein String
-        Exception: Wenn DeepL Quota erreicht
-    """
-    # Input-Validierung
-    if not text or not isinstance(text, str) or not text.strip():
-        return text
-    
-    api_key = os.getenv('DEEPL_API_KEY')
-    if not api_key:
-        raise ValueError("DEEPL_API_KEY nicht in .env gefunden!")
-    
-    # Free API hat :fx suffix
-    base_url = 'https://api-free.deepl.com/v2/translate' if api_key.endswith(':fx') else 'https://api.deepl.com/v2/translate'
-    
-    headers = {
-        'Authorization': f'DeepL-Auth-Key {api_key}',
-        'Content-Type': 'application/json',
-    }
-    
-    data = {
-        'text': [text],
-        'target_lang': target_lang,
-        'source_lang': source_lang,
-    }
-    
-    try:
-        response = requests.post(base_url, headers=headers, json=data, timeout=15)
-        
-        if response.status_code == 200:
-            result = response.json()
-            if result.get('translations'):
-                return result['translations'][0]['text']
-        elif response.status_code == 456:
-            raise Exception("DeepL Quota erreicht!")
-        else:
-            print(f"⚠️ DeepL Fehler {response.status_code}: {response.text}")
-    except Exception as e:
-        if "Quota erreicht" in str(e):
-            raise  # Re-raise um Script zu stoppen
-        print(f"⚠️ Übersetzung fehlgeschlagen: {e}")
-    
-    return text  # Fallback: Original zurückgeben
-
 def count_strings(obj: Any) -> int:
     """
     Zählt alle zu übersetzenden Strings
@@ -112,7 +67,7 @@ def count_strings(obj: Any) -> int:
     return count
 
 class TranslationProgress:
-    """Verwaltet den Übersetzungsfortschritt thread-safe"""
+    """Verwaltet den Übersetzungsfortschritt thread-safe (auch über mehrere Sprachen)"""
     def __init__(self, total: int):
         """
         Initialisiert Progress Tracker
@@ -122,16 +77,21 @@ class TranslationProgress:
         """
         self.count = 0
         self.total = total
+        self._lock = threading.Lock()
     
-    def increment(self) -> int:
+    def increment(self, amount: int = 1) -> int:
         """
         Erhöht den Zähler und gibt den aktuellen Wert zurück
         
+        Args:
+            amount: Anzahl neu übersetzter Strings
+        
         Returns:
             Aktueller Zählerstand
         """
-        self.count += 1
-        return self.count
+        with self._lock:
+            self.count += amount
+            return self.count
     
     def get_percentage(self) -> float:
         """Berechnet den Fortschritt in Prozent"""
@@ -146,45 +106,79 @@ class TranslationProgress:
         Args:
             label: Optionales Label für die aktuelle Übersetzung
         """
-        percentage = self.get_percentage()
-        bar_length = 30
-        filled = int(bar_length * self.count / self.total) if self.total > 0 else 0
-        bar = '█' * filled + '░' * (bar_length - filled)
-        
-        # Progress Bar
-        label_truncated = label[:40] if label else ""
-        print(f"\r  [{bar}] {percentage:.0f}% | {self.count}/{self.total} | {label_truncated:<40}", end='', flush=True)
+        with self._lock:
+            percentage = self.get_percentage()
+            bar_length = 30
+            filled = int(bar_length * self.count / self.total) if self.total > 0 else 0
+            bar = '█' * filled + '░' * (bar_length - filled)
+            
+            # Progress Bar
+            label_truncated = label[:40] if label else ""
+            print(f"\r  [{bar}] {percentage:.0f}% | {self.count}/{self.total} | {label_truncated:<40}", end='', flush=True)
 
-def translate_dict(obj: Any, target_lang: str, progress: TranslationProgress, path: str = "") -> Any:
+def collect_strings(obj: Any, path: Tuple[str, ...] = ()) -> List[Tuple[Tuple[str, ...], str]]:
     """
-    Rekursiv alle String-Werte in einem dict übersetzen
+    Sammelt alle nicht-leeren String-Blätter eines verschachtelten dicts
     
     Args:
-        obj: Dictionary oder String zum Übersetzen
-        target_lang: Zielsprache (z.B. "EN-US", "ES", "FR")
-        progress: TranslationProgress Instanz für Fortschrittsanzeige
-        path: Aktueller Pfad im Dictionary (für Debug-Ausgabe)
+        obj: Dictionary oder beliebiger Wert
+        path: Aktueller Pfad (Tupel der Keys)
     
     Returns:
-        Übersetztes Dictionary oder String
+        Liste von (Pfad, Text) in Dictionary-Reihenfolge
     """
     if isinstance(obj, dict):
-        translated = {}
+        leaves = []
         for key, value in obj.items():
-            new_path = f"{path}.{key}" if path else key
-            translated[key] = translate_dict(value, target_lang, progress, new_path)
-        return translated
-    elif isinstance(obj, str):
-        # Übersetze nur wenn Text vorhanden
-        if obj.strip():
-            progress.increment()
-            progress.show_progress(path)
-            translated = translate_with_deepl(obj, target_lang)
-            time.sleep(0.25)  # Rate limiting
-            return translated
-        return obj
-    else:
-        return obj
+            leaves.extend(collect_strings(value, path + (key,)))
+        return leaves
+    if isinstance(obj, str) and obj.strip():
+        return [(path, obj)]
+    return []
+
+def translate_dict(obj: Any, target_lang: str, progress: TranslationProgress, client: DeepLClient,
+                   label: str = "") -> Any:
+    """
+    Übersetzt alle String-Werte in einem dict - gebündelt statt einzeln
+    
+    Alle Blätter gehen gesammelt an DeepLClient (bis zu 50 Texte pro Request,
+    gemeinsames Rate-Limit, Translation Memory und Checkpoint-Journal).
+    
+    Args:
+        obj: Dictionary (z.B. Ergebnis von find_missing_keys)
+        target_lang: Zielsprache (z.B. "EN", "ES", "FR")
+        progress: TranslationProgress Instanz für Fortschrittsanzeige
+        client: DeepLClient, den sich alle Sprachen teilen
+        label: Anzeige in der Fortschrittszeile (z.B. Sprachcode)
+    
+    Returns:
+        Übersetztes Dictionary mit derselben Struktur
+    
+    Raises:
+        DeepLQuotaExceeded: Kontingent aufgebraucht
+    """
+    leaves = collect_strings(obj)
+    reported = 0
+    
+    def on_batch(done: int, total: int) -> None:
+        nonlocal reported
+        progress.increment(done - reported)
+        reported = done
+        progress.show_progress(label)
+    
+    translations = client.translate([text for _, text in leaves], target_lang,
+                                    fallback_on_error=True, on_batch=on_batch)
+    # Gleiche Texte zählt der Client nur einmal - Rest nachtragen
+    progress.increment(len(leaves) - reported)
+    progress.show_progress(label)
+    
+    translated = copy.deepcopy(obj)
+    for (path, _), text in zip(leaves, translations):
+        node = translated
+        for key in path[:-1]:
+            node = node[key]
+        node[path[-1]] = text
+    return translated
 
 def check_deepl_quota() -> Optional[int]:
     """
@@ -304,8 +298,50 @@ def merge_dicts(base_dict: Dict[str, Any], new_dict: Dict[str, Any]) -> Dict[str
     
     return result
 
+def save_ui_translations(lang_code: str, translations: Dict[str, Any]) -> Path:
+    """Speichert ui-translations-{lang}.json atomar (FLAT Struktur, kein {lang_code: {...}})"""
+    output_file = Path(__file__).parent.parent / "src" / "lib" / f"ui-translations-{lang_code}.json"
+    atomic_write_bytes(str(output_file), json.dumps(translations, ensure_ascii=False, indent=2).encode("utf-8"))
+    return output_file
+
+def translate_language(lang_code: str, deepl_code: str, missing_strings: Dict[str, Any],
+                       existing_translations: Dict[str, Any], client: DeepLClient,
+                       progress: TranslationProgress, stop: threading.Event) -> Optional[str]:
+    """
+    Übersetzt die fehlenden Strings einer Sprache und merged sie in die Datei
+    
+    Args:
+        lang_code: Sprachcode ("en", "es", ...)
+        deepl_code: DeepL-Zielsprache
+        missing_strings: Ergebnis von find_missing_keys
+        existing_translations: bisherige Übersetzungen der Sprache
+        client: geteilter DeepLClient
+        progress: geteilter Fortschritt aller Sprachen
+        stop: wird bei Quota-Ende gesetzt, damit andere Sprachen nicht mehr anfangen
+    
+    Returns:
+        Fehlermeldung oder None
+    """
+    if stop.is_set():
+        return "nicht gestartet (Quota)"
+    try:
+        newly_translated = translate_dict(missing_strings, deepl_code, progress, client, label=lang_code.upper())
+    except DeepLQuotaExceeded as e:
+        stop.set()
+        return str(e)
+    except DeepLError as e:
+        return str(e)
+    
+    # Merge mit existierenden Übersetzungen
+    save_ui_translations(lang_code, merge_dicts(existing_translations, newly_translated))
+    return None
+
 def main() -> None:
     """Hauptfunktion - Übersetzt UI-Strings in alle Zielsprachen"""
+    parser = argparse.ArgumentParser(description="Übersetzt UI-Strings in alle Zielsprachen")
+    parser.add_argument("--parallel", action="store_true", help="Alle Sprachen gleichzeitig übersetzen")
+    args = parser.parse_args()
+    
     print("🌍 UI Translation Script für vegantalia.de")
     print("=" * 50)
     
@@ -333,50 +369,69 @@ def main() -> None:
     print(f"📚 UI-Texte geladen (Deutsch)")
     print()
     
-    # Übersetze in alle Sprachen
+    # Fehlende Strings pro Sprache vorab sammeln - ergibt den Gesamtfortschritt
+    total_count = count_strings(de_texts)
+    work = {}
     for lang_code, deepl_code in TARGET_LANGUAGES.items():
-        print(f"🌐 Übersetze UI nach {lang_code.upper()} ({deepl_code})...")
-        
-        # Lade existierende Übersetzungen
         existing_translations = load_existing_translations(lang_code)
-        
-        # Finde fehlende/neue Strings
         missing_strings = find_missing_keys(de_texts, existing_translations)
-        
+        existing_count = count_strings(existing_translations)
+        missing_count = count_strings(missing_strings)
         if not missing_strings:
-            print(f"  ♻️ Alle Strings bereits übersetzt - nichts zu tun")
-            print()
+            print(f"♻️ {lang_code.upper()}: Alle Strings bereits übersetzt - nichts zu tun")
             continue
-        
-        # Zähle wie viele Strings fehlen
-        missing_count = count_strings(missing_strings)
-        existing_count = count_strings(existing_translations)
-        total_count = count_strings(de_texts)
-        
-        print(f"  📊 Status: {existing_count}/{total_count} bereits übersetzt")
-        print(f"  🆕 {missing_count} neue/geänderte Strings zu übersetzen")
-        
-        # Erstelle Progress Tracker
-        progress = TranslationProgress(missing_count)
-        
-        # Übersetze nur die fehlenden Strings
-        newly_translated = translate_dict(missing_strings, deepl_code, progress)
+        print(f"🌐 {lang_code.upper()} ({deepl_code}): {existing_count}/{total_count} bereits übersetzt, "
+              f"{missing_count} neue/geänderte Strings")
+        work[lang_code] = (deepl_code, missing_strings, existing_translations, existing_count, missing_count)
+    print()
+    
+    # Fertige Übersetzungen landen sofort im Journal - ein Abbruch kostet nichts
+    journal = open_journal(str(JOURNAL_PATH))
+    try:
+        client = DeepLClient(memory=shared_memory(), journal=journal)
+    except DeepLError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    
+    progress = TranslationProgress(sum(item[4] for item in work.values()))
+    stop = threading.Event()
+    errors: Dict[str, Optional[str]] = {}
+    if work:
+        mode = "parallel" if args.parallel else "nacheinander"
+        print(f"🌐 Übersetze UI nach {', '.join(code.upper() for code in work)} ({mode})...")
+        with ThreadPoolExecutor(max_workers=len(work) if args.parallel else 1) as pool:
+            futures = {
+                lang_code: pool.submit(translate_language, lang_code, deepl_code, missing_strings,
+                                       existing_translations, client, progress, stop)
+                for lang_code, (deepl_code, missing_strings, existing_translations, _, _) in work.items()
+            }
+            errors = {lang_code: future.result() for lang_code, future in futures.items()}
         print()  # Neue Zeile nach Progress Bar
-        
-        # Merge mit existierenden Übersetzungen
-        complete_translations = merge_dicts(existing_translations, newly_translated)
-        
-        # FLAT Struktur: Direkt die Keys speichern, NICHT {lang_code: {...}}
-        # Speichere
-        output_file = Path(__file__).parent.parent / "src" / "lib" / f"ui-translations-{lang_code}.json"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(complete_translations, f, ensure_ascii=False, indent=2)
-        
-        print(f"✅ Gespeichert: {output_file.name} ({existing_count} wiederverwendet + {missing_count} neu)")
         print()
     
+    for lang_code, error in errors.items():
+        _, _, _, existing_count, missing_count = work[lang_code]
+        if error:
+            print(f"❌ ui-translations-{lang_code}.json: {error}")
+        else:
+            print(f"✅ Gespeichert: ui-translations-{lang_code}.json "
+                  f"({existing_count} wiederverwendet + {missing_count} neu)")
+    print()
+    
+    # Checkpoint nur behalten, solange noch etwas offen ist
+    if journal.resumed:
+        print(f"♻️ {journal.resumed} Übersetzungen aus dem Checkpoint übernommen")
+    if any(errors.values()):
+        journal.close()
+        print(f"💾 Checkpoint: {len(journal)} Übersetzungen in {JOURNAL_PATH.name} - "
+              f"der nächste Lauf übernimmt sie ohne DeepL-Kosten")
+        sys.exit(1)
+    journal.discard()
+    
     print("=" * 50)
     print("🎉 Alle UI-Übersetzungen abgeschlossen!")
+    print(f"📡 {client.requests_sent} DeepL-Requests, {client.characters_sent:,} Zeichen")
+    print(shared_memory().summary())
     print()
     print("Generierte Dateien:")
     for lang_code in TARGET_LANGUAGES.keys():
@@ -0,0 +1,103 @@
+"""
+Checkpoint-Journal für lange Übersetzungsläufe
+
+Jeder fertige DeepL-Batch wird sofort als JSON-Zeilen an eine Datei
+angehängt und per fsync auf die Platte gebracht. Bricht ein Lauf ab
+(Timeout, Quota, Strg+C), liest der nächste Lauf das Journal ein und
+übernimmt alle bereits bezahlten Übersetzungen, ohne DeepL zu fragen. Nach
+einem vollständigen Lauf wird das Journal gelöscht.
+
+Eine halb geschriebene letzte Zeile (Absturz mitten im Schreiben) wird beim
+Einlesen übersprungen.
+"""
+
+import json
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+DEFAULT_JOURNAL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "translation_checkpoint.jsonl")
+
+
+class TranslationJournal:
+    """Append-only Journal fertiger Übersetzungen (thread-safe)."""
+
+    def __init__(self, path: str = DEFAULT_JOURNAL_PATH):
+        self.path = path
+        self.resumed = 0   # Texte, die aus dem Journal übernommen wurden
+        self._entries: Dict[Tuple[str, str], Dict[str, str]] = {}
+        self._lock = threading.Lock()
+        self._load()
+        self._file = None
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    key = (entry["s"], entry["t"])
+                    self._entries.setdefault(key, {})[entry["src"]] = entry["dst"]
+                except (ValueError, KeyError, TypeError):
+                    continue
+
+    def __len__(self) -> int:
+        return sum(len(texts) for texts in self._entries.values())
+
+    def lookup(self, texts, target_lang: str, source_lang: str = "DE") -> Dict[str, str]:
+        """Übersetzungen aus früheren, abgebrochenen Läufen.
+
+        Returns:
+            dict Quelltext → Übersetzung (nur Treffer)
+        """
+        with self._lock:
+            known = self._entries.get((source_lang.upper(), target_lang.upper()), {})
+            found = {text: known[text] for text in texts if text in known}
+            self.resumed += len(found)
+        return found
+
+    def known(self, texts, target_lang: str, source_lang: str = "DE") -> set:
+        """Welche Texte im Journal stehen - ohne Statistik (für Kostenschätzungen)."""
+        with self._lock:
+            known = self._entries.get((source_lang.upper(), target_lang.upper()), {})
+            return {text for text in texts if text in known}
+
+    def record(self, translations: Dict[str, str], target_lang: str, source_lang: str = "DE") -> None:
+        """Hängt einen fertigen Batch an und schreibt ihn sofort auf die Platte."""
+        key = (source_lang.upper(), target_lang.upper())
+        lines = "".join(
+            json.dumps({"s": key[0], "t": key[1], "src": text, "dst": translation}, ensure_ascii=False) + "\n"
+            for text, translation in translations.items()
+        )
+        if not lines:
+            return
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(lines)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._entries.setdefault(key, {}).update(translations)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def discard(self) -> None:
+        """Lauf vollständig - Journal wird nicht mehr gebraucht."""
+        self.close()
+        with self._lock:
+            self._entries.clear()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+def open_journal(path: Optional[str] = None) -> TranslationJournal:
+    """Öffnet das Journal und meldet, wenn ein abgebrochener Lauf fortgesetzt wird."""
+    journal = TranslationJournal(path or DEFAULT_JOURNAL_PATH)
+    if len(journal):
+        print(f"♻️ Checkpoint gefunden: {len(journal)} Übersetzungen aus einem abgebrochenen Lauf")
+    return journal
@@ -0,0 +1,177 @@
+"""
+Translation Memory für alle DeepL-Aufrufe
+
+Jede Übersetzung wird unter (Hash des Quelltexts, Quellsprache, Zielsprache)
+in einer SQLite-Datei abgelegt. Gleiche Texte - "Salz" in jedem Rezept,
+Gruppen wie "Basis" oder "Dressing", unveränderte UI-Strings - gehen so nur
+einmal an DeepL. Alle Übersetzungsskripte und der Admin nutzen dieselbe
+Datei.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "translation_memory.sqlite3")
+DEEPL_MONTHLY_QUOTA = 500_000  # Zeichen im Free-Tier
+
+
+def text_hash(text: str) -> str:
+    """SHA-256 des Quelltexts (NFC, sonst unverändert - Übersetzungen sind exakt)."""
+    return hashlib.sha256(unicodedata.normalize("NFC", text).encode("utf-8")).hexdigest()
+
+
+class TranslationMemory:
+    """SQLite-Speicher für Übersetzungen mit Treffer-Statistik (thread-safe)."""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self.characters_saved = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS translations (
+                   hash TEXT NOT NULL,
+                   source_lang TEXT NOT NULL,
+                   target_lang TEXT NOT NULL,
+                   source TEXT NOT NULL,
+                   translation TEXT NOT NULL,
+                   created_at REAL NOT NULL,
+                   hit_count INTEGER NOT NULL DEFAULT 0,
+                   PRIMARY KEY (hash, source_lang, target_lang)
+               )"""
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _langs(target_lang: str, source_lang: str) -> Tuple[str, str]:
+        return source_lang.upper(), target_lang.upper()
+
+    def get(self, text: str, target_lang: str, source_lang: str = "DE") -> Optional[str]:
+        """Gespeicherte Übersetzung oder None."""
+        return self.get_many([text], target_lang, source_lang).get(text)
+
+    def get_many(self, texts: Iterable[str], target_lang: str, source_lang: str = "DE") -> Dict[str, str]:
+        """Schlägt mehrere Texte auf einmal nach.
+
+        Returns:
+            dict Quelltext → Übersetzung (nur Treffer)
+        """
+        source_lang, target_lang = self._langs(target_lang, source_lang)
+        by_hash = {text_hash(text): text for text in dict.fromkeys(texts)}
+        found: Dict[str, str] = {}
+        with self._lock:
+            hashes = list(by_hash)
+            for start in range(0, len(hashes), 500):  # SQLite-Limit für Parameter
+                chunk = hashes[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT hash, translation FROM translations WHERE source_lang = ? AND target_lang = ? "
+                    f"AND hash IN ({','.join('?' * len(chunk))})",
+                    (source_lang, target_lang, *chunk),
+                ).fetchall()
+                for digest, translation in rows:
+                    found[by_hash[digest]] = translation
+            if found:
+                self._conn.executemany(
+                    "UPDATE translations SET hit_count = hit_count + 1 "
+                    "WHERE hash = ? AND source_lang = ? AND target_lang = ?",
+                    [(text_hash(text), source_lang, target_lang) for text in found],
+                )
+                self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(by_hash) - len(found)
+            self.characters_saved += sum(len(text) for text in found)
+        return found
+
+    def known(self, texts: Iterable[str], target_lang: str, source_lang: str = "DE") -> set:
+        """Welche Texte schon übersetzt vorliegen - ohne Statistik (für Kostenschätzungen)."""
+        source_lang, target_lang = self._langs(target_lang, source_lang)
+        by_hash = {text_hash(text): text for text in dict.fromkeys(texts)}
+        known = set()
+        with self._lock:
+            hashes = list(by_hash)
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT hash FROM translations WHERE source_lang = ? AND target_lang = ? "
+                    f"AND hash IN ({','.join('?' * len(chunk))})",
+                    (source_lang, target_lang, *chunk),
+                ).fetchall()
+                known.update(by_hash[digest] for (digest,) in rows)
+        return known
+
+    def set(self, text: str, translation: str, target_lang: str, source_lang: str = "DE") -> None:
+        """Merkt sich eine Übersetzung."""
+        self.set_many({text: translation}, target_lang, source_lang)
+
+    def set_many(self, translations: Dict[str, str], target_lang: str, source_lang: str = "DE") -> None:
+        """Merkt sich mehrere Übersetzungen (Quelltext → Übersetzung)."""
+        source_lang, target_lang = self._langs(target_lang, source_lang)
+        now = time.time()
+        rows = [
+            (text_hash(text), source_lang, target_lang, text, translation, now)
+            for text, translation in translations.items()
+            if text and translation
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO translations (hash, source_lang, target_lang, source, translation, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Treffer seit Start, gesparte Zeichen und Größe der Datei."""
+        with self._lock:
+            entries, lifetime_saved = self._conn.execute(
+                "SELECT COUNT(*), SUM(hit_count * LENGTH(source)) FROM translations"
+            ).fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total * 100) if total else 0.0,
+            "characters_saved": self.characters_saved,
+            "quota_saved": self.characters_saved / DEEPL_MONTHLY_QUOTA * 100,
+            "lifetime_characters_saved": lifetime_saved or 0,
+            "entries": entries,
+        }
+
+    def summary(self) -> str:
+        """Eine Zeile für Skripte und Admin."""
+        stats = self.stats()
+        return (
+            f"🧠 Translation Memory: {stats['hits']} Treffer ({stats['hit_rate']:.0f}%), "
+            f"{stats['characters_saved']:,} Zeichen gespart "
+            f"({stats['quota_saved']:.1f}% von {DEEPL_MONTHLY_QUOTA:,})"
+        )
+
+    def clear(self) -> None:
+        """Leert die Translation Memory komplett."""
+        with self._lock:
+            self._conn.execute("DELETE FROM translations")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+            self.characters_saved = 0
+
+
+_shared_memory: Optional[TranslationMemory] = None
+_shared_lock = threading.Lock()
+
+
+def shared_memory() -> TranslationMemory:
+    """Eine Instanz pro Prozess (für die Skripte; der Admin nutzt st.cache_resource)."""
+    global _shared_memory
+    with _shared_lock:
+        if _shared_memory is None:
+            _shared_memory = TranslationMemory()
+        return _shared_memory
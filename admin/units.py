@@ -0,0 +1,292 @@
+"""
+Einheiten-Umrechnung für die Nährwertberechnung
+
+Alle Mengenangaben werden über Tabellen in Gramm umgerechnet:
+
+    UNITS          Einheit → Art (Gewicht / Volumen / Stück / vernachlässigbar) + Basiswert
+    DENSITIES      Zutat → Dichte in g/ml für Volumenangaben (Öl, Mehl, Sirup, ...)
+    PIECE_WEIGHTS  Stück-Einheit + Zutat → Gramm (1 Kartoffel, 1 Scheibe Brot, ...)
+
+Neue Einheiten oder Korrekturen gehören in die Tabellen, nicht in den Code.
+Gerechnet wird in Blöcken: convert_many() rechnet alle Zeilen eines Rezepts
+um (Faktor einmal pro Einheit und Zutat, über Rezepte teilbar), danach
+verrechnet nutrient_totals() sie mit den Nährwerten.
+"""
+
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from ingredient_matcher import fold_name, tokenize
+
+NUTRIENT_KEYS = ("kcal", "protein", "carbs", "fat", "fiber")
+
+WEIGHT = "weight"          # Basiswert = Gramm pro Einheit
+VOLUME = "volume"          # Basiswert = Milliliter pro Einheit (× Dichte)
+PIECE = "piece"            # Gramm aus PIECE_WEIGHTS (zutatenabhängig)
+NEGLIGIBLE = "negligible"  # Prise, Spritzer, ... → 0 g
+
+# Kanonische Einheit: (Art, Basiswert, Anzeige, Schreibweisen)
+UNITS = {
+    "g": (WEIGHT, 1, "g", ("g", "gramm", "gr")),
+    "kg": (WEIGHT, 1000, "kg", ("kg", "kilo", "kilogramm")),
+    "mg": (WEIGHT, 0.001, "mg", ("mg", "milligramm")),
+    "pfund": (WEIGHT, 500, "Pfund", ("pfund",)),
+    "oz": (WEIGHT, 28.35, "oz", ("oz", "unze", "unzen", "ounce")),
+    "lb": (WEIGHT, 453.6, "lb", ("lb", "pound", "pounds")),
+    "handvoll": (WEIGHT, 40, "Handvoll", ("handvoll", "hand voll")),
+    "dose": (WEIGHT, 400, "Dose(n)", ("dose", "dosen")),
+    "packung": (WEIGHT, 250, "Packung(en)", ("packung", "pkg", "pack")),
+    "bund": (WEIGHT, 100, "Bund", ("bund", "bündel")),
+    "riegel": (WEIGHT, 100, "Riegel", ("riegel",)),
+    "blatt": (WEIGHT, 1, "Blatt/Blätter", ("blatt", "blätter")),
+    "msp": (WEIGHT, 2, "Msp", ("msp", "messerspitze", "messerspitzen")),
+
+    "ml": (VOLUME, 1, "ml", ("ml", "milliliter")),
+    "cl": (VOLUME, 10, "cl", ("cl", "centiliter")),
+    "dl": (VOLUME, 100, "dl", ("dl", "deciliter")),
+    "l": (VOLUME, 1000, "l", ("l", "liter")),
+    "el": (VOLUME, 15, "EL", ("el", "esslöffel", "essl", "eßlöffel", "tbsp", "essloffel")),
+    "tl": (VOLUME, 5, "TL", ("tl", "teelöffel", "teel", "tsp", "teeloffel")),
+    "tasse": (VOLUME, 240, "Tasse(n)", ("tasse", "tassen", "cup", "cups", "becher")),
+    "glas": (VOLUME, 200, "Glas", ("glas", "gläser")),
+
+    "stück": (PIECE, 0, "Stück", ("stück", "stk", "st", "x", "")),
+    "scheibe": (PIECE, 0, "Scheibe(n)", ("scheibe", "scheiben")),
+    "würfel": (PIECE, 0, "Würfel", ("würfel",)),
+    "stange": (PIECE, 0, "Stange(n)", ("stange", "stangen")),
+    "knolle": (PIECE, 0, "Knolle(n)", ("knolle", "knollen")),
+    "kopf": (PIECE, 0, "Kopf", ("kopf", "köpfe")),
+    "zehe": (PIECE, 0, "Zehe(n)", ("zehe", "zehen")),
+
+    "prise": (NEGLIGIBLE, 0, "Prise", (
+        "prise", "prisen", "spritzer", "schuss", "etwas", "wenig", "nach belieben",
+        "nach geschmack", "belieben", "geschmack",
+    )),
+}
+
+# Dichte in g/ml - erster passender Eintrag gewinnt, sonst 1.0 (Wasser)
+DENSITIES = (
+    ("öl", 0.92),
+    ("mehl", 0.55),
+    ("stärke", 0.6),
+    ("haferflocken", 0.4),
+    ("zucker", 0.85),
+    ("kakao", 0.45),
+    ("salz", 1.2),
+    ("honig", 1.4),
+    ("sirup", 1.33),
+    ("dicksaft", 1.35),
+    ("reis", 0.85),
+    ("linsen", 0.8),
+    ("milch", 1.03),
+    ("mus", 1.05),
+)
+
+# Gramm pro Stück: (Stichwort in der Zutat, Gramm, Anzeige) - None = Standard
+PIECE_WEIGHTS = {
+    "stück": (
+        ("kartoffel", 150, "Kartoffel(n)"),
+        ("zwiebel", 100, "Zwiebel(n)"),
+        ("knoblauch", 5, "Zehe(n)"),
+        ("zehe", 5, "Zehe(n)"),
+        ("tomate", 150, "Tomate(n)"),
+        ("paprika", 180, "Paprika"),
+        ("karotte", 80, "Karotte(n)"),
+        ("möhre", 80, "Möhre(n)"),
+        ("zucchini", 200, "Zucchini"),
+        ("aubergine", 250, "Aubergine(n)"),
+        ("avocado", 150, "Avocado(s)"),
+        ("banane", 120, "Banane(n)"),
+        ("apfel", 180, "Apfel/Äpfel"),
+        ("zitrone", 100, "Zitrone(n)"),
+        ("ei", 60, "Ei(er)"),
+        ("eier", 60, "Ei(er)"),
+        (None, None, None),  # unbekannt → Menge als Gramm
+    ),
+    "scheibe": (
+        ("brot", 30, "Scheibe(n) Brot"),
+        ("toast", 30, "Scheibe(n) Brot"),
+        ("käse", 20, "Scheibe(n)"),
+        ("wurst", 20, "Scheibe(n)"),
+        (None, 25, "Scheibe(n)"),
+    ),
+    "würfel": (
+        ("hefe", 42, "Würfel Hefe"),
+        (None, 10, "Würfel"),
+    ),
+    "stange": (
+        ("lauch", 150, "Stange(n) Lauch"),
+        ("porree", 150, "Stange(n) Lauch"),
+        ("sellerie", 40, "Stange(n) Sellerie"),
+        (None, 100, "Stange(n)"),
+    ),
+    "knolle": (
+        ("knoblauch", 40, "Knolle(n) Knoblauch"),
+        ("ingwer", 50, "Knolle(n) Ingwer"),
+        (None, 100, "Knolle(n)"),
+    ),
+    "kopf": (
+        ("salat", 200, "Kopf Salat"),
+        ("kohl", 600, "Kopf Kohl"),
+        (None, 300, "Kopf"),
+    ),
+    "zehe": (
+        (None, 5, "Zehe(n)"),
+    ),
+}
+
+# Vorberechnet: Schreibweise → kanonische Einheit
+_ALIASES = {alias: canonical for canonical, (_, _, _, aliases) in UNITS.items() for alias in aliases}
+_DENSITIES = tuple((fold_name(keyword), density) for keyword, density in DENSITIES)
+_PIECE_WEIGHTS = {
+    unit: tuple((fold_name(keyword) if keyword else None, grams, label) for keyword, grams, label in rows)
+    for unit, rows in PIECE_WEIGHTS.items()
+}
+
+
+class Conversion(NamedTuple):
+    grams: float
+    kind: Optional[str]   # Art der Einheit, None = unbekannt
+    note: str             # Anzeigetext ("📏 2 EL = ~28g"), leer bei Gewichtsangaben
+
+
+def _contains(tokens: List[str], keyword: str) -> bool:
+    """Stichwort als Wort oder Teil eines Kompositums.
+
+    Kurze Stichwörter nur als Grundwort am Ende ("olivenöl" enthält "öl"),
+    "ei" nur als ganzes Wort - sonst wäre "Brei" ein Ei.
+    """
+    if len(keyword) < 3:
+        return keyword in tokens
+    if len(keyword) < 4:
+        return any(token.endswith(keyword) for token in tokens)
+    return any(keyword in token for token in tokens)
+
+
+def normalize_unit(unit: Optional[str]) -> Optional[str]:
+    """Kanonische Einheit ("Esslöffel" → "el") oder None wenn unbekannt."""
+    return _ALIASES.get((unit or "").lower().strip())
+
+
+def density_for(name: str) -> float:
+    """Dichte einer Zutat in g/ml (1.0 wenn nicht in DENSITIES)."""
+    tokens = tokenize(fold_name(name))
+    for keyword, density in _DENSITIES:
+        if _contains(tokens, keyword):
+            return density
+    return 1.0
+
+
+def unit_factor(unit: Optional[str], name: str) -> Tuple[float, Optional[str], Optional[str], float]:
+    """Gramm pro 1 Einheit für eine Zutat - der tabellengetriebene Kern.
+
+    Returns:
+        Tuple (gramm_pro_einheit, art, anzeige, dichte) - art None = unbekannte
+        Einheit, anzeige None = Stückgewicht unbekannt (beides: Menge gilt als Gramm)
+    """
+    canonical = normalize_unit(unit)
+    if canonical is None:
+        return 1.0, None, None, 1.0
+
+    kind, base, label, _ = UNITS[canonical]
+    if kind == NEGLIGIBLE:
+        return 0.0, kind, label, 1.0
+    if kind == WEIGHT:
+        return float(base), kind, label, 1.0
+    if kind == VOLUME:
+        density = density_for(name)
+        return base * density, kind, label, density
+
+    tokens = tokenize(fold_name(name))
+    for keyword, grams_per_piece, piece_label in _PIECE_WEIGHTS[canonical]:
+        if keyword is None or _contains(tokens, keyword):
+            if grams_per_piece is None:
+                return 1.0, kind, None, 1.0
+            return float(grams_per_piece), kind, piece_label, 1.0
+    return 1.0, kind, None, 1.0
+
+
+def describe_conversion(amount: float, unit: Optional[str],
+                        factor: Tuple[float, Optional[str], Optional[str], float]) -> Conversion:
+    """Conversion inkl. Anzeigetext aus einem bereits bestimmten unit_factor()."""
+    grams_per_unit, kind, label, density = factor
+    grams = amount * grams_per_unit
+
+    if kind is None:
+        return Conversion(grams, kind, f"⚠️ Unbekannte Einheit '{unit}' - nehme {amount}g an")
+    if label is None:
+        return Conversion(grams, kind, f"⚠️ Einheit unklar '{unit}' - nehme {amount}g an")
+    if kind == NEGLIGIBLE:
+        return Conversion(grams, kind, f"💨 {amount} {unit} = vernachlässigbar")
+    if label in ("g", "kg", "mg") or (label in ("ml", "cl", "dl", "l") and density == 1.0):
+        return Conversion(grams, kind, "")
+
+    density_hint = f" (Dichte {density:g})" if density != 1.0 else ""
+    return Conversion(grams, kind, f"📏 {amount} {label} = ~{grams:g}g{density_hint}")
+
+
+def convert_to_grams(amount: float, unit: Optional[str], name: str) -> Conversion:
+    """Rechnet eine Mengenangabe in Gramm um.
+
+    Args:
+        amount: Menge (bereits als Zahl)
+        unit: Einheit wie im Rezept ("EL", "Dose", "" ...)
+        name: Zutatenname (für Dichte und Stückgewicht)
+
+    Returns:
+        Conversion(grams, kind, note)
+    """
+    return describe_conversion(amount, unit, unit_factor(unit, name))
+
+
+FactorCache = Dict[Tuple[Optional[str], str], Tuple[float, Optional[str], Optional[str], float]]
+
+
+def convert_many(items: Iterable[Tuple[float, Optional[str], str]],
+                 factors: Optional[FactorCache] = None) -> List[float]:
+    """Rechnet viele (Menge, Einheit, Zutat)-Tripel auf einmal in Gramm um.
+
+    Der Umrechnungsfaktor wird pro (Einheit, Zutat) nur einmal bestimmt - bei
+    einer Neuberechnung des ganzen Katalogs wiederholen sich die meisten.
+    Anzeigetexte entstehen hier keine (siehe describe_conversion).
+
+    Args:
+        items: (Menge, Einheit, Zutat)
+        factors: (Einheit, Zutat) → unit_factor(), wird ergänzt - über mehrere
+            Aufrufe geteilt, gilt "einmal pro Einheit und Zutat" für den ganzen Katalog
+    """
+    if factors is None:
+        factors = {}
+    grams = []
+    for amount, unit, name in items:
+        key = (unit, name)
+        factor = factors.get(key)
+        if factor is None:
+            factor = factors[key] = unit_factor(unit, name)
+        grams.append(amount * factor[0])
+    return grams
+
+
+def nutrient_totals(grams: Sequence[float], per_100g: Sequence[Optional[Dict[str, float]]]
+                    ) -> Tuple[List[Dict[str, int]], Dict[str, int]]:
+    """Mengen × Nährwertmatrix (pro 100 g) in einem Durchlauf.
+
+    Args:
+        grams: Gramm pro Zutat
+        per_100g: Nährwerte pro 100 g je Zutat (None = überspringen)
+
+    Returns:
+        Tuple (Nährwerte je Zutat, Summe) - je Zutat auf ganze Zahlen abgerundet
+        wie bisher in der UI
+    """
+    rows = []
+    total = {key: 0 for key in NUTRIENT_KEYS}
+    for g, nutr in zip(grams, per_100g):
+        if nutr is None:
+            rows.append({key: 0 for key in NUTRIENT_KEYS})
+            continue
+        factor = g / 100.0
+        added = {key: int((nutr.get(key) or 0) * factor) for key in NUTRIENT_KEYS}
+        for key in NUTRIENT_KEYS:
+            total[key] += added[key]
+        rows.append(added)
+    return rows, total